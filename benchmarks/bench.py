@@ -0,0 +1,188 @@
+import argparse
+import json
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+if __package__:
+    from .corpus import CORPORA, generate
+else:
+    from corpus import CORPORA, generate
+
+from formdt import Config, format_markdown
+from formdt.config import WRAP_MODES
+from formdt.notebook import format_notebook_bytes
+
+# Throughput metrics regress when they drop, memory when it grows.
+HIGHER_IS_BETTER = {"mb_per_s": True, "lines_per_s": True, "peak_rss_mb": False}
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+def measure(
+    name: str,
+    scale: float = 1.0,
+    repeat: int = 5,
+    wrap_mode: str = "greedy",
+    display_width: bool = False,
+) -> dict:
+    corpus = generate(name, scale)
+    # The paragraph corpus is one block far above max_block_length, which
+    # would otherwise be passed through untouched instead of wrapped.
+    config = Config(
+        wrap_mode=wrap_mode,
+        display_width=display_width,
+        max_block_length=sys.maxsize,
+        max_token_length=sys.maxsize,
+    )
+    if isinstance(corpus, bytes):
+        data = corpus
+
+        def target():
+            format_notebook_bytes(corpus, config, all_markdown=True)
+
+    else:
+        data = corpus.encode()
+
+        def target():
+            format_markdown(corpus, config)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        target()
+        best = min(best, time.perf_counter() - start)
+
+    lines = data.count(b"\n") + 1
+    return {
+        "bytes": len(data),
+        "lines": lines,
+        "seconds": best,
+        "mb_per_s": len(data) / best / 1e6,
+        "lines_per_s": lines / best,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run(
+    names: list[str],
+    scale: float = 1.0,
+    repeat: int = 5,
+    wrap_mode: str = "greedy",
+    display_width: bool = False,
+) -> dict:
+    results = {}
+    for name in names:
+        # A fresh interpreter per corpus keeps peak RSS from carrying over.
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+            future = pool.submit(measure, name, scale, repeat, wrap_mode, display_width)
+            results[name] = future.result()
+    return {
+        "python": platform.python_version(),
+        "scale": scale,
+        "wrap_mode": wrap_mode,
+        "display_width": display_width,
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, before in baseline["results"].items():
+        after = current["results"].get(name)
+        if after is None:
+            continue
+        for metric, higher_is_better in HIGHER_IS_BETTER.items():
+            change = (after[metric] - before[metric]) / before[metric]
+            if not higher_is_better:
+                change = -change
+            if change < -threshold:
+                regressions.append(
+                    f"{name}.{metric}: {before[metric]:,.2f} -> "
+                    f"{after[metric]:,.2f} ({change:+.1%})"
+                )
+    return regressions
+
+
+def _print_results(report: dict) -> None:
+    print(
+        f"{'corpus':<10} {'MB':>8} {'lines':>10} {'MB/s':>8} {'lines/s':>12} {'RSS MB':>8}"
+    )
+    for name, result in report["results"].items():
+        print(
+            f"{name:<10} {result['bytes'] / 1e6:>8.2f} {result['lines']:>10,} "
+            f"{result['mb_per_s']:>8.2f} {result['lines_per_s']:>12,.0f} "
+            f"{result['peak_rss_mb']:>8.1f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark formdt on synthetic corpora"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument(
+        "corpora", nargs="*", metavar="corpus", help=f"One of {', '.join(CORPORA)}"
+    )
+    run_parser.add_argument("--scale", type=float, default=1.0)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--wrap-mode", choices=WRAP_MODES, default="greedy")
+    run_parser.add_argument(
+        "--display-width",
+        action="store_true",
+        help="Measure lines in terminal columns",
+    )
+    run_parser.add_argument("-o", "--output", type=Path, help="Save results as JSON")
+
+    compare_parser = commands.add_parser(
+        "compare", help="Fail if current results regress against a baseline"
+    )
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed relative regression per metric (default: 0.1)",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        unknown = set(args.corpora) - set(CORPORA)
+        if unknown:
+            parser.error(f"unknown corpus: {', '.join(sorted(unknown))}")
+        report = run(
+            args.corpora or list(CORPORA),
+            args.scale,
+            args.repeat,
+            args.wrap_mode,
+            args.display_width,
+        )
+        _print_results(report)
+        if args.output:
+            args.output.write_text(json.dumps(report, indent=2) + "\n")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+    regressions = compare(baseline, current, args.threshold)
+    for line in regressions:
+        print(f"Regression: {line}")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import json
+import random
+
+WORDS = (
+    "the formatter wraps long lines of prose at a configured width while keeping "
+    "links code fences math blocks headings and list items intact so that "
+    "documentation stays readable in plain text editors and diffs"
+).split()
+
+# Words in Chinese, Japanese and Korean, full-width forms and emoji, for text
+# where display width and character count differ.
+WIDE_WORDS = (
+    "格式化 文档 段落 换行 宽度 日本語 テキスト 折り返し 設定 한국어 문서 줄바꿈 "
+    "ＡＢＣ １２３ 😀 🚀 ✅ 📄"
+).split()
+
+
+def _sentence(rng: random.Random, low: int = 8, high: int = 16) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def prose(paragraphs: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    blocks = []
+    for _ in range(paragraphs):
+        lines = [_sentence(rng) for _ in range(rng.randint(3, 12))]
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def paragraph(words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def lists(items: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = []
+    depth = 0
+    for i in range(items):
+        depth = max(0, min(8, depth + rng.choice((-1, 0, 1))))
+        marker = rng.choice(("-", "*", "+", f"{i % 9 + 1}."))
+        lines.append("  " * depth + f"{marker} {_sentence(rng, 10, 30)}")
+    return "\n".join(lines)
+
+
+def links(paragraphs: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    blocks = []
+    for _ in range(paragraphs):
+        words = []
+        for _ in range(rng.randint(30, 80)):
+            roll = rng.random()
+            if roll < 0.15:
+                path = "/".join(rng.choices(WORDS, k=rng.randint(1, 4)))
+                bang = "!" if rng.random() < 0.2 else ""
+                words.append(
+                    f"{bang}[{_sentence(rng, 1, 4)}](https://example.com/{path})"
+                )
+            elif roll < 0.25:
+                words.append(f"$$x_{rng.randint(0, 9)} + {_sentence(rng, 1, 3)}$$")
+            else:
+                words.append(rng.choice(WORDS))
+        blocks.append(" ".join(words))
+    return "\n\n".join(blocks)
+
+
+def fences(blocks: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(blocks):
+        parts.append(_sentence(rng))
+        code = [f"    {_sentence(rng, 2, 10)}" for _ in range(rng.randint(2, 20))]
+        if rng.random() < 0.2:
+            parts.append("$$\n" + "\n".join(code) + "\n$$")
+        else:
+            parts.append("```python\n" + "\n".join(code) + "\n```")
+    return "\n\n".join(parts)
+
+
+def callouts(blocks: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(blocks):
+        depth = rng.randint(1, 4)
+        quote = ">" * depth
+        lines = []
+        if rng.random() < 0.3:
+            lines.append(f"{quote} [!{rng.choice(('note', 'tip', 'warning'))}]")
+        lines.extend(f"{quote} {_sentence(rng)}" for _ in range(rng.randint(2, 8)))
+        parts.append("\n".join(lines))
+    return "\n\n".join(parts)
+
+
+def mixed(paragraphs: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    blocks = []
+    for _ in range(paragraphs):
+        lines = []
+        for _ in range(rng.randint(3, 12)):
+            words = rng.choices(WORDS, k=rng.randint(4, 8))
+            words += rng.choices(WIDE_WORDS, k=rng.randint(4, 8))
+            rng.shuffle(words)
+            lines.append(" ".join(words))
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def notebook(cells: int, output_size: int = 200_000, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+    image = "".join(rng.choices(alphabet, k=output_size))
+    notebook_cells = []
+    for i in range(cells):
+        if i % 2 == 0:
+            text = prose(1, seed + i)
+            notebook_cells.append(
+                {
+                    "cell_type": "markdown",
+                    "metadata": {},
+                    "source": text.splitlines(keepends=True),
+                }
+            )
+        else:
+            notebook_cells.append(
+                {
+                    "cell_type": "code",
+                    "execution_count": i,
+                    "metadata": {},
+                    "outputs": [
+                        {
+                            "data": {"image/png": image, "text/plain": ["<Figure>"]},
+                            "metadata": {},
+                            "output_type": "display_data",
+                        }
+                    ],
+                    "source": ["plot()"],
+                }
+            )
+    document = {
+        "cells": notebook_cells,
+        "metadata": {},
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
+    return (json.dumps(document, indent=1) + "\n").encode()
+
+
+# name -> (generator, size at scale 1.0)
+CORPORA = {
+    "prose": (prose, 5000),
+    "paragraph": (paragraph, 100_000),
+    "lists": (lists, 20000),
+    "links": (links, 3000),
+    "fences": (fences, 2000),
+    "callouts": (callouts, 5000),
+    "mixed": (mixed, 5000),
+    "notebook": (notebook, 60),
+}
+
+
+def generate(name: str, scale: float = 1.0, seed: int = 0) -> str | bytes:
+    generator, size = CORPORA[name]
+    return generator(max(1, int(size * scale)), seed=seed)
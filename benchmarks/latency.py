@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from formdt.aio import CHUNK_SIZE, AsyncFormatter
+
+if __package__:
+    from .corpus import paragraph, prose
+else:
+    from corpus import paragraph, prose
+
+
+async def measure(
+    chunk_size: int,
+    huge: int = 2,
+    small: int = 500,
+    interval: float = 0.002,
+    scale: float = 0.5,
+) -> dict:
+    # Latency of small requests arriving at a steady rate while a few huge
+    # documents are being formatted on the same formatter.
+    large_text = prose(max(1, int(5000 * scale)))
+    small_texts = [paragraph(60, seed=i) for i in range(small)]
+    latencies = []
+
+    async def request(text: str) -> None:
+        start = time.perf_counter()
+        await formatter.format(text)
+        latencies.append(time.perf_counter() - start)
+
+    async with AsyncFormatter(chunk_size=chunk_size) as formatter:
+        start = time.perf_counter()
+        large = [asyncio.create_task(formatter.format(large_text)) for _ in range(huge)]
+        requests = []
+        for text in small_texts:
+            requests.append(asyncio.create_task(request(text)))
+            await asyncio.sleep(interval)
+        await asyncio.gather(*requests)
+        await asyncio.gather(*large)
+        seconds = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "max_ms": max(latencies) * 1000,
+        "seconds": seconds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Small-request latency next to huge documents in formdt.aio"
+    )
+    parser.add_argument("--huge", type=int, default=2)
+    parser.add_argument("--small", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=0.002)
+    parser.add_argument("--scale", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{'chunking':<10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'total s':>8}")
+    for name, chunk_size in (("blocks", CHUNK_SIZE), ("none", sys.maxsize)):
+        result = asyncio.run(
+            measure(chunk_size, args.huge, args.small, args.interval, args.scale)
+        )
+        print(
+            f"{name:<10} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+            f"{result['max_ms']:>8.2f} {result['seconds']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
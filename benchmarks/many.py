@@ -0,0 +1,42 @@
+import argparse
+import time
+
+from formdt import Config, format_many, format_markdown
+from formdt.runner import default_jobs
+
+if __package__:
+    from .corpus import prose
+else:
+    from corpus import prose
+
+
+def snippets(count: int, seed: int = 0) -> list[str]:
+    return [prose(1, seed + i) for i in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Items per second for format_many against a format_markdown loop"
+    )
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[default_jobs()])
+    args = parser.parse_args()
+
+    texts = snippets(args.items)
+    config = Config()
+    runs = {"loop": lambda: [format_markdown(text, config) for text in texts]}
+    for workers in args.workers:
+        runs[f"workers={workers}"] = lambda w=workers: list(
+            format_many(texts, config, workers=w)
+        )
+
+    print(f"{'run':<12} {'items/s':>12}")
+    for name, fn in runs.items():
+        start = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - start
+        print(f"{name:<12} {len(texts) / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import math
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import replace
+
+from formdt import Config, format_markdown, is_formatted
+
+if __package__:
+    from .corpus import paragraph
+else:
+    from corpus import paragraph
+
+# Inputs built to defeat the formatter's shortcuts: unclosed spans that a
+# regex would rescan from every opening character, blocks that never end,
+# and paragraphs with no blank line to split them.
+ADVERSARIAL: dict[str, Callable[[int], str]] = {
+    "brackets": lambda n: "[" * n,
+    "images": lambda n: "![" * (n // 2),
+    "open_links": lambda n: "[a](b " * (n // 6),
+    "open_math": lambda n: "x $$a " * (n // 6),
+    "unclosed_fence": lambda n: "```\n" + "[a b\n" * (n // 5),
+    "unclosed_math": lambda n: "$$\n" + "$a b\n" * (n // 5),
+    "no_blank_lines": lambda n: "\n".join(
+        paragraph(10, seed=i) for i in range(n // 70)
+    ),
+    "one_line": lambda n: paragraph(n // 6) + " [",
+    "callouts": lambda n: "\n".join(">" * 50 + " [a b" for _ in range(n // 56)),
+    "list_markers": lambda n: "1" * n,
+}
+# Without limits every block is wrapped however large it grows, so the
+# growth measured is that of the algorithms rather than of the fallback.
+UNLIMITED = Config(max_block_length=sys.maxsize, max_token_length=sys.maxsize)
+RUNS = {
+    "greedy": lambda text: format_markdown(text, UNLIMITED),
+    "optimal": lambda text: format_markdown(
+        text, replace(UNLIMITED, wrap_mode="optimal")
+    ),
+    "check": lambda text: is_formatted(text, UNLIMITED),
+}
+
+
+def measure(name: str, run: str, size: int, repeat: int = 3) -> float:
+    text = ADVERSARIAL[name](size)
+    fn = RUNS[run]
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def growth(name: str, run: str, size: int, factor: int = 8, repeat: int = 3) -> float:
+    # The exponent k in time ~ n^k between size and factor * size: about 1
+    # for linear work, 2 for quadratic.
+    small = measure(name, run, size, repeat)
+    large = measure(name, run, size * factor, repeat)
+    return math.log(max(large, 1e-9) / max(small, 1e-9), factor)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="How formdt's running time grows on adversarial inputs"
+    )
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--factor", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'input':<16} {'run':<8} {'small s':>8} {'large s':>8} {'exponent':>8}")
+    for name in ADVERSARIAL:
+        for run in RUNS:
+            small = measure(name, run, args.size)
+            large = measure(name, run, args.size * args.factor)
+            exponent = math.log(max(large, 1e-9) / max(small, 1e-9), args.factor)
+            print(f"{name:<16} {run:<8} {small:>8.4f} {large:>8.4f} {exponent:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import hashlib
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from formdt import Config
+from formdt.runner import Options, run
+from formdt.shard import FILE_COST, assign
+
+if __package__:
+    from .corpus import prose
+else:
+    from corpus import prose
+
+
+def write_tree(directory: Path, files: int, seed: int = 0) -> list[Path]:
+    # Sizes follow a heavy tail, as in real docs trees: mostly short pages
+    # and a few long references.
+    rng = random.Random(seed)
+    paths = []
+    for i in range(files):
+        path = directory / f"{i:05}.md"
+        path.write_text(prose(min(400, int(rng.paretovariate(1.2))), seed=i) + "\n")
+        paths.append(path)
+    return paths
+
+
+def hashed(paths: list[Path], count: int) -> list[list[Path]]:
+    # Partitioning by path hash alone, for comparison.
+    shards: list[list[Path]] = [[] for _ in range(count)]
+    for path in paths:
+        key = hashlib.blake2b(path.as_posix().encode(), digest_size=8).digest()
+        shards[int.from_bytes(key) % count].append(path)
+    return shards
+
+
+def imbalance(shards: list[list[Path]]) -> float:
+    # Largest shard over the mean, in work units; 1.0 is a perfect split.
+    loads = [sum(p.stat().st_size + FILE_COST for p in part) for part in shards]
+    return max(loads) * len(loads) / sum(loads)
+
+
+def slowest(shards: list[list[Path]], repeat: int) -> float:
+    # Shards run one after another here, standing in for separate nodes.
+    options = Options(check=True)
+    config = Config()
+    times = []
+    for part in shards:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in run(part, config, options, jobs=1):
+                pass
+            best = min(best, time.perf_counter() - start)
+        times.append(best)
+    return max(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Wall-clock time of a sharded check as the node count grows"
+    )
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_tree(Path(directory), args.files)
+        base = slowest([paths], args.repeat)
+        print(
+            f"{'shards':>6} {'slowest s':>10} {'speedup':>8} "
+            f"{'imbalance':>10} {'hash only':>10}"
+        )
+        for count in args.shards:
+            seconds = slowest(assign(paths, count), args.repeat)
+            print(
+                f"{count:>6} {seconds:>10.4f} {base / seconds:>8.2f} "
+                f"{imbalance(assign(paths, count)):>10.3f} "
+                f"{imbalance(hashed(paths, count)):>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import time
+
+from formdt import Config, format_markdown
+
+if __package__:
+    from .corpus import mixed, prose
+else:
+    from corpus import mixed, prose
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Cost of display-width wrapping on English and mixed-script text"
+    )
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpora = {"english": prose(args.paragraphs), "mixed": mixed(args.paragraphs)}
+    print(f"{'corpus':<8} {'chars s':>8} {'display s':>10} {'ratio':>6}")
+    for name, text in corpora.items():
+        times = {
+            display: min(
+                _timed(text, Config(display_width=display)) for _ in range(args.repeat)
+            )
+            for display in (False, True)
+        }
+        print(
+            f"{name:<8} {times[False]:>8.4f} {times[True]:>10.4f} "
+            f"{times[True] / times[False]:>6.2f}"
+        )
+
+
+def _timed(text: str, config: Config) -> float:
+    start = time.perf_counter()
+    format_markdown(text, config)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import time
+
+from formdt.formatter import WRAPPERS, _tokenize
+
+if __package__:
+    from .corpus import paragraph
+else:
+    from corpus import paragraph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare greedy and optimal wrapping on growing paragraphs"
+    )
+    parser.add_argument(
+        "--words", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--line-length", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'words':>10} {'greedy s':>10} {'optimal s':>10} {'ratio':>6}")
+    for words in args.words:
+        tokens = _tokenize(paragraph(words))
+        times = {
+            mode: min(
+                _timed(wrap, tokens, args.line_length) for _ in range(args.repeat)
+            )
+            for mode, wrap in WRAPPERS.items()
+        }
+        print(
+            f"{words:>10,} {times['greedy']:>10.4f} {times['optimal']:>10.4f} "
+            f"{times['optimal'] / times['greedy']:>6.1f}"
+        )
+
+
+def _timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
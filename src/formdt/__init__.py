@@ -1,4 +1,46 @@
-from .formatter import format_markdown
-from .config import load_config, Config
+from importlib import import_module
 
-__all__ = ["format_markdown", "load_config", "Config"]
+# Each name is imported from its module on first use, so that the CLI and
+# the daemon client can import a submodule without loading the formatter.
+_EXPORTS = {
+    "format_markdown": "formatter",
+    "format_markdown_stream": "formatter",
+    "format_many": "batch",
+    "format_markdown_range": "ranges",
+    "is_formatted": "verify",
+    "parse": "document",
+    "render": "document",
+    "Document": "document",
+    "ParagraphMemo": "memo",
+    "Edit": "ranges",
+    "load_config": "config",
+    "Config": "config",
+}
+
+__all__ = [
+    "format_markdown",
+    "format_markdown_stream",
+    "format_many",
+    "format_markdown_range",
+    "is_formatted",
+    "parse",
+    "render",
+    "Document",
+    "ParagraphMemo",
+    "Edit",
+    "load_config",
+    "Config",
+]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_EXPORTS])
@@ -0,0 +1,161 @@
+import asyncio
+from collections.abc import Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from weakref import WeakKeyDictionary
+
+from .config import Config
+from .formatter import format_markdown
+from .ranges import split_segments
+
+CHUNK_SIZE = 64 * 1024
+MAX_PENDING = 8
+MAX_QUEUED = 1024
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    # Groups blank-line segments into chunks of about size characters. Each
+    # chunk starts a fresh block, so formatting them one by one and joining
+    # the results gives the same output as formatting the whole text.
+    chunks = []
+    current: list[str] = []
+    length = 0
+    for segment in split_segments(text):
+        if current and length + len(segment) > size:
+            chunks.append("\n".join(current))
+            current = []
+            length = 0
+        current.append(segment)
+        length += len(segment) + 1
+    chunks.append("\n".join(current))
+    return chunks
+
+
+class AsyncFormatter:
+    # Runs the formatter on an executor so the event loop never blocks.
+    # At most max_pending chunks are on the executor at once; further ones
+    # wait for a slot, and once max_queued are waiting, new requests fail
+    # with asyncio.QueueFull instead of piling up. Large documents are
+    # submitted one chunk at a time, so small requests that arrive meanwhile
+    # take their turn between chunks rather than after the whole document.
+    def __init__(
+        self,
+        config: Config | None = None,
+        executor: Executor | None = None,
+        max_pending: int = MAX_PENDING,
+        max_queued: int = MAX_QUEUED,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        self.config = config or Config()
+        self.owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(thread_name_prefix="formdt")
+        self.max_pending = max_pending
+        self.max_queued = max_queued
+        self.chunk_size = chunk_size
+        self.slots = asyncio.Semaphore(max_pending)
+        self.queued = 0
+
+    async def format(
+        self, text: str, config: Config | None = None, timeout: float | None = None
+    ) -> str:
+        config = config or self.config
+        async with asyncio.timeout(timeout):
+            if len(text) <= self.chunk_size:
+                return await self._submit(text, config)
+            formatted = []
+            for chunk in _chunks(text, self.chunk_size):
+                formatted.append(await self._submit(chunk, config))
+            return "\n".join(formatted)
+
+    async def format_many(
+        self,
+        texts: Iterable[str],
+        config: Config | None = None,
+        timeout: float | None = None,
+    ) -> list[str]:
+        # A fixed set of workers pulls from texts, so a batch of any size
+        # never holds more than max_pending slots and never overflows the
+        # queue. The timeout covers the whole batch.
+        texts = list(texts)
+        results = [""] * len(texts)
+        items = iter(enumerate(texts))
+
+        async def worker() -> None:
+            for i, text in items:
+                results[i] = await self.format(text, config)
+
+        async with asyncio.timeout(timeout):
+            workers = [
+                asyncio.ensure_future(worker())
+                for _ in range(min(self.max_pending, len(texts)))
+            ]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+        return results
+
+    async def _submit(self, text: str, config: Config) -> str:
+        if self.slots.locked() and self.queued >= self.max_queued:
+            raise asyncio.QueueFull(f"more than {self.max_queued} requests queued")
+        self.queued += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.queued -= 1
+
+        # The slot is only freed once the executor is done with the chunk,
+        # even if the caller was cancelled or timed out while it ran.
+        loop = asyncio.get_running_loop()
+        try:
+            future = self.executor.submit(format_markdown, text, config)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self._release(loop))
+        return await asyncio.wrap_future(future)
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self.slots.release)
+        except RuntimeError:
+            pass  # the loop has closed
+
+    def close(self) -> None:
+        if self.owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> "AsyncFormatter":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+# One default formatter per event loop, since asyncio primitives belong to
+# the loop they are first used on. They share a single thread pool.
+_formatters: WeakKeyDictionary = WeakKeyDictionary()
+_executor: ThreadPoolExecutor | None = None
+
+
+def _default() -> AsyncFormatter:
+    global _executor
+    loop = asyncio.get_running_loop()
+    formatter = _formatters.get(loop)
+    if formatter is None:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(thread_name_prefix="formdt")
+        formatter = _formatters[loop] = AsyncFormatter(executor=_executor)
+    return formatter
+
+
+async def format_markdown_async(
+    text: str, config: Config | None = None, timeout: float | None = None
+) -> str:
+    return await _default().format(text, config, timeout)
+
+
+async def format_many_async(
+    texts: Iterable[str], config: Config | None = None, timeout: float | None = None
+) -> list[str]:
+    return await _default().format_many(texts, config, timeout)
@@ -0,0 +1,56 @@
+from collections import deque
+from collections.abc import Iterable, Iterator
+
+from .config import Config
+from .formatter import format_markdown
+
+CHUNK_ITEMS = 1024
+CHUNK_CHARS = 256 * 1024
+CHUNKS_PER_WORKER = 2
+
+
+def _chunks(texts: Iterable[str]) -> Iterator[list[str]]:
+    # Many small texts travel to a worker together, so pickling and task
+    # overhead are paid per chunk rather than per text.
+    chunk = []
+    size = 0
+    for text in texts:
+        chunk.append(text)
+        size += len(text)
+        if len(chunk) >= CHUNK_ITEMS or size >= CHUNK_CHARS:
+            yield chunk
+            chunk = []
+            size = 0
+    if chunk:
+        yield chunk
+
+
+def _format_chunk(texts: list[str], config: Config) -> list[str]:
+    return [format_markdown(text, config) for text in texts]
+
+
+def format_many(
+    texts: Iterable[str], config: Config | None = None, workers: int | None = None
+) -> Iterator[str]:
+    # Yields each text formatted, in input order. texts is consumed lazily,
+    # so it can be a database cursor; with workers > 1 at most a few chunks
+    # per worker are in flight at once.
+    if config is None:
+        config = Config()
+    if workers is None or workers <= 1:
+        for text in texts:
+            yield format_markdown(text, config)
+        return
+
+    # Imported here: multiprocessing is slow to import and most users of
+    # the package never start a pool.
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in _chunks(texts):
+            pending.append(executor.submit(_format_chunk, chunk, config))
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import cache
+from pathlib import Path
+from typing import NamedTuple
+
+from .config import Config
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+MAX_ENTRIES = 200_000
+
+
+@cache
+def _version() -> str:
+    # Looked up on first use: importlib.metadata is slow to import, and runs
+    # with --no-cache never need it.
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("formdt")
+    except PackageNotFoundError:  # pragma: no cover - running from a source tree
+        return "unknown"
+
+
+class FileData(NamedTuple):
+    st_size: int
+    st_mtime: float
+    digest: str
+    seen: float
+    config: str = ""
+
+
+def get_cache_dir() -> Path:
+    env = os.environ.get("FORMDT_CACHE_DIR")
+    if env:
+        return Path(env) / _version()
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "formdt" / _version()
+
+
+def digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def fingerprint(*extra: object) -> str:
+    key = repr((_version(), extra))
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+@contextmanager
+def _locked(path: Path):
+    if fcntl is None:  # pragma: no cover - Windows
+        yield
+        return
+    with open(path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class Cache:
+    def __init__(self, path: Path, entries: dict[str, FileData] | None = None):
+        self.path = path
+        self.entries = entries or {}
+        self.updates: dict[str, FileData] = {}
+
+    @classmethod
+    def read(cls, key: str, cache_dir: Path | None = None) -> "Cache":
+        path = (cache_dir or get_cache_dir()) / f"cache.{key}.pickle"
+        return cls(path, _load(path))
+
+    def is_formatted(self, path: Path, config: Config) -> bool:
+        entry = self.entries.get(str(path.resolve()))
+        if entry is None or entry.config != config.fingerprint:
+            return False
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        if st.st_size != entry.st_size:
+            return False
+        if st.st_mtime != entry.st_mtime:
+            try:
+                if digest(path.read_bytes()) != entry.digest:
+                    return False
+            except OSError:
+                return False
+            self.mark(path, entry.digest, config)
+        return True
+
+    def mark(self, path: Path, file_digest: str, config: Config) -> None:
+        try:
+            st = path.stat()
+        except OSError:
+            return
+        self.updates[str(path.resolve())] = FileData(
+            st.st_size, st.st_mtime, file_digest, time.time(), config.fingerprint
+        )
+
+    def write(self) -> None:
+        if not self.updates:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _locked(self.path.with_suffix(".lock")):
+            # Merge with whatever other runs wrote since we read the cache.
+            entries = _load(self.path)
+            entries.update(self.updates)
+            if len(entries) > MAX_ENTRIES:
+                newest = sorted(entries.items(), key=lambda item: item[1].seen)
+                entries = dict(newest[-MAX_ENTRIES:])
+            with tempfile.NamedTemporaryFile(dir=self.path.parent, delete=False) as f:
+                pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, self.path)
+        self.entries = entries
+        self.updates = {}
+
+
+def _load(path: Path) -> dict[str, FileData]:
+    try:
+        with open(path, "rb") as f:
+            entries = pickle.load(f)
+    except (
+        OSError,
+        pickle.UnpicklingError,
+        EOFError,
+        AttributeError,
+        TypeError,
+        ValueError,
+    ):
+        return {}
+    return entries if isinstance(entries, dict) else {}
@@ -1,10 +1,19 @@
+from __future__ import annotations
+
 import argparse
+import json
+import os
 import sys
 from pathlib import Path
 
-from .config import load_config
-from .formatter import format_markdown
-from .notebook import format_notebook, write_notebook
+# Formatting through a running daemon needs only daemon.py, so the formatter,
+# configuration and runner are imported once it is clear they are needed.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .config import Config, ConfigResolver
+    from .runner import FileResult
+    from .stats import Stats
+    from .watch import Session
 
 
 def parse_cells(value: str) -> list[int]:
@@ -19,12 +28,32 @@ def parse_cells(value: str) -> list[int]:
     return cells
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["daemon"]:
+        from .server import main as serve
+
+        return serve(argv[1:])
+    if argv[:1] == ["lsp"]:
+        from .lsp import main as lsp
+
+        return lsp(argv[1:])
+    if argv[:1] == ["merge-reports"]:
+        from .shard import main as merge_reports
+
+        return merge_reports(argv[1:])
+
     parser = argparse.ArgumentParser(
         prog="formdt", description="Format markdown files with configurable line length"
     )
     parser.add_argument(
-        "file", type=Path, help="Markdown or Jupyter notebook file to format"
+        "paths",
+        type=Path,
+        nargs="*",
+        metavar="path",
+        help="Markdown or Jupyter notebook files, directories to search, or - for "
+        "stdin. With --staged or --changed-since, limits the files considered",
     )
     parser.add_argument(
         "-l",
@@ -32,12 +61,54 @@ def main() -> int:
         type=int,
         help="Override line length (default: from .formdt or 80)",
     )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with status 1 if any file would change; stops reading a file at "
+        "its first difference",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Print a unified diff of the changes instead of the formatted output",
+    )
+    parser.add_argument(
+        "--report",
+        choices=["jsonl", "json"],
+        help="jsonl emits one JSON record per file with its status, timing and byte "
+        "counts; json writes the records, run summary and shard as one document "
+        "for formdt merge-reports",
+    )
+    parser.add_argument(
+        "--report-file",
+        type=Path,
+        metavar="FILE",
+        help="Write the --report records to FILE instead of stdout",
+    )
+    parser.add_argument(
+        "--wrap-mode",
+        metavar="{greedy,optimal}",
+        help="greedy fills each line in turn; optimal balances line lengths "
+        "across the paragraph (default: from .formdt or greedy)",
+    )
+    parser.add_argument(
+        "--display-width",
+        action="store_true",
+        help="Measure lines in terminal columns, counting wide East Asian "
+        "characters and emoji as two",
+    )
     parser.add_argument(
         "-w",
         "--write",
         action="store_true",
         help="Write changes back to file (default: print to stdout)",
     )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Format the files, then keep formatting them as they are saved; "
+        "implies --write",
+    )
     parser.add_argument(
         "-c",
         "--cells",
@@ -50,40 +121,327 @@ def main() -> int:
         action="store_true",
         help="Format all markdown cells. Notebook only.",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of worker processes (default: all CPUs)",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="Format only files changed since the git revision REF",
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="Format only files with staged changes, reading their staged contents",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Format only the I-th of N parts of the files, split by size the same "
+        "way on every machine",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Format every file, ignoring the cache of already formatted files",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Format in this process even if a formdt daemon is running",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print time and counts per pipeline stage and block type to stderr",
+    )
+    parser.add_argument(
+        "--stats-json",
+        type=Path,
+        metavar="FILE",
+        help="Write the same statistics as --profile to FILE as JSON",
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="Do not print the run summary to stderr",
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    git_mode = args.staged or args.changed_since is not None
+    if not args.paths and not git_mode:
+        parser.error("the following arguments are required: path")
+    if args.write and (args.check or args.diff):
+        parser.error("--write cannot be combined with --check or --diff")
+    if args.watch and (args.check or args.diff or git_mode or Path("-") in args.paths):
+        parser.error(
+            "--watch cannot be combined with --check, --diff, --staged, "
+            "--changed-since or stdin"
+        )
+    if args.shard is not None and (
+        args.staged or args.watch or Path("-") in args.paths
+    ):
+        parser.error("--shard cannot be combined with --staged, --watch or stdin")
+    if args.report and Path("-") in args.paths:
+        parser.error("--report cannot be combined with stdin")
 
-    config = load_config()
+    overrides = {}
     if args.line_length:
-        config.line_length = args.line_length
+        overrides["line_length"] = args.line_length
+    if args.wrap_mode:
+        overrides["wrap_mode"] = args.wrap_mode
+    if args.display_width:
+        overrides["display_width"] = True
+
+    stdin = None
+    if _use_daemon(args):
+        from . import daemon
+
+        path = args.paths[0]
+        if path == Path("-"):
+            stdin = sys.stdin.read()
+            formatted = daemon.format_via_daemon(stdin, overrides, directory=Path.cwd())
+            if formatted is not None:
+                sys.stdout.write(formatted)
+                return 0
+        else:
+            try:
+                text = path.read_text()
+            except (OSError, ValueError):
+                text = None
+            if text is not None:
+                formatted = daemon.format_via_daemon(
+                    text, overrides, directory=path.parent
+                )
+                if formatted is not None:
+                    print(formatted)
+                    return 0
+
+    from contextlib import nullcontext
+
+    from .config import ConfigResolver
+    from .stats import Stats, collect
+
+    shard = None
+    if args.shard is not None:
+        from .shard import parse_shard
 
-    if not args.file.exists():
-        print(f"Error: File not found: {args.file}", file=sys.stderr)
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError:
+            parser.error(f"argument --shard: invalid value: {args.shard!r}")
+
+    try:
+        resolver = ConfigResolver(**overrides)
+        resolver.for_directory(Path.cwd())
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Error: invalid configuration: {e}", file=sys.stderr)
         return 1
 
-    if args.file.suffix == ".ipynb":
-        cells = parse_cells(args.cells) if args.cells else None
-        notebook = format_notebook(
-            args.file, config, cells=cells, all_markdown=args.markdown
-        )
+    profile = args.profile or args.stats_json is not None
+    stats = Stats()
+    with collect(stats) if profile else nullcontext():
+        status = _format_paths(args, resolver, profile, stats, shard, stdin)
+    if args.profile:
+        print(stats, file=sys.stderr)
+    if args.stats_json is not None:
+        args.stats_json.write_text(json.dumps(stats.as_dict(), indent=2) + "\n")
+    return status
 
-        if args.write:
-            write_notebook(notebook, args.file)
-        else:
-            import json
 
-            print(json.dumps(notebook, indent=1, ensure_ascii=False))
-    else:
-        content = args.file.read_text()
-        formatted = format_markdown(content, config)
+def _use_daemon(args: argparse.Namespace) -> bool:
+    # Only formatting stdin or a single markdown file to stdout goes through
+    # the daemon; everything else needs the runner.
+    if (
+        args.no_daemon
+        or args.profile
+        or args.stats_json is not None
+        or args.staged
+        or args.changed_since is not None
+        or args.shard is not None
+        or args.check
+        or args.diff
+        or args.report
+        or args.write
+        or args.watch
+        or len(args.paths) != 1
+    ):
+        return False
+    path = args.paths[0]
+    if path != Path("-") and (path.suffix == ".ipynb" or not path.is_file()):
+        return False
+    from .daemon import get_socket_path
+
+    return get_socket_path().exists()
+
+
+def _format_paths(
+    args: argparse.Namespace,
+    resolver: ConfigResolver,
+    profile: bool,
+    stats: Stats,
+    shard: tuple[int, int] | None,
+    stdin: str | None,
+) -> int:
+    # stdin holds standard input when the daemon already read it and failed.
+    if args.paths == [Path("-")]:
+        from .formatter import format_markdown, format_markdown_stream
+
+        config = resolver.for_directory(Path.cwd())
+        if args.check or args.diff:
+            return _check_stdin(sys.stdin.read(), config, args.check, args.diff)
+        if stdin is not None:
+            sys.stdout.write(format_markdown(stdin, config))
+            return 0
+        for i, line in enumerate(format_markdown_stream(sys.stdin, config)):
+            sys.stdout.write("\n" + line if i else line)
+        return 0
+
+    from .cache import Cache, fingerprint
+    from .discovery import iter_files
+    from .runner import Options, Summary, run
+
+    git_mode = args.staged or args.changed_since is not None
+    options = Options(
+        write=args.write or args.watch,
+        cells=parse_cells(args.cells) if args.cells else None,
+        all_markdown=args.markdown,
+        profile=profile,
+        check=args.check,
+        diff=args.diff,
+    )
+    cache = None
+    if not args.no_cache and not args.staged:
+        cache = Cache.read(fingerprint(options.cells, options.all_markdown))
+
+    if git_mode:
+        from . import git
 
-        if args.write:
-            args.file.write_text(formatted)
+        try:
+            root = git.repository_root()
+            names = git.changed_files(args.changed_since, args.staged, args.paths)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        if args.staged:
+            results = git.format_staged(names, root, resolver, options)
         else:
-            print(formatted)
+            paths = [Path(os.path.relpath(root / name)) for name in names]
+    else:
+        paths = list(iter_files(args.paths))
+    if not args.staged:
+        if shard is not None:
+            from .shard import select
+
+            paths = select(paths, *shard)
+        single = len(paths) == 1 and args.report is None
+        if single and not (options.write or args.check or args.diff):
+            # A single file is printed as it is formatted, not held whole.
+            options.output = sys.stdout
+        results = run(paths, resolver, options, jobs=args.jobs, cache=cache)
+
+    report = None
+    if args.report is not None:
+        report = open(args.report_file, "w") if args.report_file else sys.stdout
+
+    session = None
+    if args.watch:
+        from .watch import Session
 
+        session = Session(resolver, options)
+    summary = Summary()
+    records = []
+    would_change = False
+    try:
+        for result in results:
+            summary.add(result)
+            if session is not None and result.digest is not None:
+                session.known[result.path] = result.digest
+            if result.stats is not None:
+                stats.merge(result.stats)
+            would_change = would_change or result.changed
+            if args.report == "jsonl":
+                report.write(json.dumps(report_record(result)) + "\n")
+            elif report is not None:
+                records.append(report_record(result))
+            if result.error is not None:
+                print(f"Error: {result.error}", file=sys.stderr)
+            elif result.output is not None and report is not sys.stdout:
+                print(result.output)
+        summary.finish()
+        if args.report == "json":
+            from .shard import build_report
+
+            document = build_report(summary, records, shard or (1, 1), args.check)
+            report.write(json.dumps(document, indent=2) + "\n")
+    finally:
+        if report is not None and report is not sys.stdout:
+            report.close()
+
+    if not args.quiet:
+        print(summary, file=sys.stderr)
+    if session is not None:
+        return _watch(args.paths, session, args.quiet)
+
+    if summary.errors or (args.check and would_change):
+        return 1
     return 0
 
 
+def _check_stdin(text: str, config: Config, check: bool, diff: bool) -> int:
+    from .formatter import format_markdown
+    from .ranges import unified_diff
+    from .verify import is_formatted
+
+    if not diff:
+        return 0 if is_formatted(text, config) else 1
+    formatted = format_markdown(text, config)
+    if formatted == text:
+        return 0
+    print(unified_diff(text.split("\n"), formatted.split("\n"), "-"))
+    return 1 if check else 0
+
+
+def _watch(paths: list[Path], session: Session, quiet: bool) -> int:
+    from .watch import watch
+
+    def report(result: FileResult) -> None:
+        if result.error is not None:
+            print(f"Error: {result.error}", file=sys.stderr)
+        elif result.changed and not quiet:
+            print(f"formatted {result.path}", file=sys.stderr)
+
+    try:
+        watch(paths, session, report)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def report_record(result: FileResult) -> dict:
+    if result.error is not None:
+        status = "error"
+    elif result.changed:
+        status = "changed"
+    elif result.cached:
+        status = "cached"
+    else:
+        status = "unchanged"
+    record = {
+        "path": str(result.path),
+        "status": status,
+        "seconds": round(result.seconds, 6),
+        "bytes_in": result.bytes_in,
+        "bytes_out": result.bytes_out,
+    }
+    if result.error is not None:
+        record["error"] = result.error
+    return record
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -1,21 +1,110 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, fields, replace
 from pathlib import Path
+import hashlib
 import json
+import tomllib
+
+
+WRAP_MODES = ("greedy", "optimal")
+MAX_BLOCK_LENGTH = 100_000
+MAX_TOKEN_LENGTH = 4096
+CONFIG_FILE = ".formdt"
+PYPROJECT_FILE = "pyproject.toml"
 
 
 @dataclass
 class Config:
     line_length: int = 80
+    wrap_mode: str = "greedy"
+    # Measure lines in terminal columns, with wide East Asian characters and
+    # emoji counting as two, rather than in characters.
+    display_width: bool = False
+    # Paragraphs and list items longer than this are passed through as
+    # they are, and links or inline math longer than max_token_length are
+    # broken at their spaces like prose, which bounds the work and memory
+    # per block on untrusted input.
+    max_block_length: int = MAX_BLOCK_LENGTH
+    max_token_length: int = MAX_TOKEN_LENGTH
+
+    def __post_init__(self) -> None:
+        if self.wrap_mode not in WRAP_MODES:
+            raise ValueError(
+                f"wrap_mode must be one of {', '.join(WRAP_MODES)}, "
+                f"not {self.wrap_mode!r}"
+            )
+
+    @property
+    def fingerprint(self) -> str:
+        # Stable across processes and runs, unlike hash().
+        key = repr(sorted(asdict(self).items()))
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def _from_mapping(data: dict) -> Config:
+    known = {field.name for field in fields(Config)}
+    values = {key.replace("-", "_"): value for key, value in data.items()}
+    return Config(**{key: value for key, value in values.items() if key in known})
+
+
+def _read_pyproject(path: Path) -> Config | None:
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    table = data.get("tool", {}).get("formdt")
+    return None if table is None else _from_mapping(table)
+
+
+def _read_directory(directory: Path) -> Config | None:
+    config_file = directory / CONFIG_FILE
+    if config_file.is_file():
+        return load_config(config_file)
+    pyproject = directory / PYPROJECT_FILE
+    if pyproject.is_file():
+        return _read_pyproject(pyproject)
+    return None
+
+
+class ConfigResolver:
+    # Finds the nearest .formdt or pyproject.toml [tool.formdt] above each
+    # path. Every directory on the way is memoized, so a run reads each
+    # directory at most once however many files it holds.
+    def __init__(self, **overrides):
+        self.overrides = overrides
+        self.directories: dict[Path, Config] = {}
+
+    def for_path(self, path: Path) -> Config:
+        return self.for_directory(path.absolute().parent)
+
+    def for_directory(self, directory: Path) -> Config:
+        directory = directory.absolute()
+        visited = []
+        config = None
+        for current in (directory, *directory.parents):
+            config = self.directories.get(current)
+            if config is not None:
+                break
+            visited.append(current)
+            config = _read_directory(current)
+            if config is not None:
+                config = replace(config, **self.overrides)
+                break
+        if config is None:
+            config = Config(**self.overrides)
+        for current in visited:
+            self.directories[current] = config
+        return config
 
 
 def load_config(path: Path | None = None) -> Config:
     if path is None:
-        path = Path.cwd() / ".formdt"
+        return ConfigResolver().for_directory(Path.cwd())
 
     if not path.exists():
         return Config()
 
+    if path.name == PYPROJECT_FILE:
+        return _read_pyproject(path) or Config()
+
     with open(path) as f:
         data = json.load(f)
 
-    return Config(line_length=data.get("line_length", 80))
+    return _from_mapping(data)
@@ -0,0 +1,76 @@
+import json
+import os
+import socket
+import stat
+from pathlib import Path
+
+# The client half of the daemon. The CLI tries it before importing anything
+# else, so it only imports what talking to the socket needs; the server,
+# which imports the formatter, lives in server.py.
+
+CONNECT_TIMEOUT = 0.05
+
+
+def get_socket_path() -> Path:
+    env = os.environ.get("FORMDT_SOCKET")
+    if env:
+        return Path(env)
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return Path(runtime) / "formdt.sock"
+    # The shared temporary directory gets a private directory of its own,
+    # which the server creates with mode 0700.
+    import tempfile
+
+    return Path(tempfile.gettempdir()) / f"formdt-{os.getuid()}" / "formdt.sock"
+
+
+def is_private(path: Path) -> bool:
+    # Whether path is a socket only this user can reach; any other socket
+    # may belong to someone who would read the text sent to it.
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISSOCK(info.st_mode)
+        and info.st_uid == os.getuid()
+        and not info.st_mode & 0o077
+    )
+
+
+def request(payload: dict, path: Path | None = None) -> dict | None:
+    path = path or get_socket_path()
+    if not is_private(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(path))
+            sock.settimeout(None)
+            with sock.makefile("rwb") as f:
+                f.write(json.dumps(payload).encode() + b"\n")
+                f.flush()
+                response = f.readline()
+    except OSError:
+        return None
+    if not response:
+        return None
+    return json.loads(response)
+
+
+def format_via_daemon(
+    text: str,
+    config: dict | None = None,
+    path: Path | None = None,
+    directory: Path | None = None,
+) -> str | None:
+    # config holds fields to override; they apply over the configuration the
+    # daemon finds for directory, or over its own without one.
+    payload = {"text": text, "config": config or {}}
+    if directory is not None:
+        payload["directory"] = str(directory.absolute())
+    response = request(payload, path)
+    if response is None or "text" not in response:
+        return None
+    return response["text"]
@@ -0,0 +1,191 @@
+import os
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+SUFFIXES = (".md", ".ipynb")
+SKIP_DIRS = frozenset({".git", ".hg", ".svn", "node_modules"})
+
+
+class IgnoreRule:
+    __slots__ = ("base", "regex", "negate", "dir_only", "anchored")
+
+    def __init__(self, base: str, pattern: str):
+        self.base = base
+        self.negate = pattern.startswith("!")
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        self.anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+        self.regex = re.compile(translate(pattern))
+
+    def matches(self, path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not path.startswith(self.base + "/"):
+                return False
+            path = path[len(self.base) + 1 :]
+        if self.anchored:
+            return self.regex.match(path) is not None
+        return self.regex.match(path.rsplit("/", 1)[-1]) is not None
+
+
+def translate(pattern: str) -> str:
+    # A gitignore glob as a regex. Unlike fnmatch, *, ? and [...] never match
+    # a slash; only ** as a whole path segment crosses directories.
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/"):
+            if i + 2 == n:
+                parts.append(".*")
+                i += 2
+                continue
+            if pattern[i + 2] == "/":
+                parts.append("(?:.*/)?")
+                i += 3
+                continue
+        if c == "*":
+            parts.append("[^/]*")
+            while i < n and pattern[i] == "*":
+                i += 1
+            continue
+        if c == "?":
+            parts.append("[^/]")
+        elif c == "[":
+            end = i + 1
+            if end < n and pattern[end] in "!^":
+                end += 1
+            if end < n and pattern[end] == "]":
+                end += 1
+            end = pattern.find("]", end)
+            if end < 0:
+                parts.append(re.escape(c))
+            else:
+                body = re.sub(r"([&~|\[])", r"\\\1", pattern[i + 1 : end])
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                parts.append(f"(?!/)[{body}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return "(?s:" + "".join(parts) + r")\Z"
+
+
+def parse_gitignore(path: Path, base: str = "") -> list[IgnoreRule]:
+    try:
+        text = path.read_text()
+    except OSError:
+        return []
+
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        rules.append(IgnoreRule(base, line))
+    return rules
+
+
+def is_ignored(rules: list[IgnoreRule], path: str, is_dir: bool) -> bool:
+    ignored = False
+    for rule in rules:
+        if rule.negate == ignored and rule.matches(path, is_dir):
+            ignored = not rule.negate
+    return ignored
+
+
+def _find_git_root(directory: Path) -> Path | None:
+    for candidate in (directory, *directory.parents):
+        if (candidate / ".git").exists():
+            return candidate
+    return None
+
+
+def _inherited_rules(directory: Path) -> tuple[str, list[IgnoreRule]]:
+    root = _find_git_root(directory) or directory
+    relative = directory.relative_to(root)
+
+    rules = parse_gitignore(root / ".gitignore")
+    current = root
+    for part in relative.parts:
+        current = current / part
+        base = current.relative_to(root).as_posix()
+        rules.extend(parse_gitignore(current / ".gitignore", base))
+    return "" if relative == Path(".") else relative.as_posix(), rules
+
+
+def _walk(
+    directory: str, prefix: str, rules: list[IgnoreRule], directories: bool = False
+) -> Iterator[Path]:
+    # Yields the markdown files under directory, or with directories set,
+    # directory itself and every subdirectory that would be searched.
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return
+
+    if directories:
+        yield Path(directory)
+    subdirs = []
+    for entry in entries:
+        relative = prefix + entry.name
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name in SKIP_DIRS or is_ignored(rules, relative, True):
+                continue
+            subdirs.append((entry.path, relative))
+        elif directories:
+            continue
+        elif entry.name.endswith(SUFFIXES) and entry.is_file():
+            if not is_ignored(rules, relative, False):
+                yield Path(entry.path)
+
+    for path, relative in subdirs:
+        own = parse_gitignore(Path(path) / ".gitignore", relative)
+        yield from _walk(
+            path, relative + "/", rules + own if own else rules, directories
+        )
+
+
+def iter_files(paths: Iterable[Path]) -> Iterator[Path]:
+    seen = set()
+    for path in paths:
+        if path.is_dir():
+            relative, rules = _inherited_rules(path.resolve())
+            prefix = relative + "/" if relative else ""
+            for found in _walk(str(path), prefix, rules):
+                if found not in seen:
+                    seen.add(found)
+                    yield found
+        elif path not in seen:
+            seen.add(path)
+            yield path
+
+
+def iter_directories(paths: Iterable[Path]) -> Iterator[Path]:
+    for path in paths:
+        if path.is_dir():
+            relative, rules = _inherited_rules(path.resolve())
+            prefix = relative + "/" if relative else ""
+            yield from _walk(str(path), prefix, rules, directories=True)
+
+
+def is_excluded(path: Path, is_dir: bool = False) -> bool:
+    # Whether searching a directory above path would leave it out.
+    if is_dir:
+        if path.name in SKIP_DIRS:
+            return True
+    elif not path.name.endswith(SUFFIXES):
+        return True
+    relative, rules = _inherited_rules(path.absolute().parent.resolve())
+    prefix = relative + "/" if relative else ""
+    return is_ignored(rules, prefix + path.name, is_dir)
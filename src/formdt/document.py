@@ -0,0 +1,86 @@
+from collections.abc import Iterator
+
+from .config import Config
+from .formatter import WRAPPERS, _tokenize
+from .lexer import VERBATIM, Kind, lex_blocks
+from .width import token_widths
+
+_KINDS = list(Kind)
+
+
+class Document:
+    # Blocks are stored column-wise: a kind byte, a prefix and a text per
+    # block. A verbatim block's text is its lines and a wrapped block's its
+    # tokens, either joined by newlines, which no token can contain. That keeps
+    # one string per block instead of one per token, and a Document made of
+    # builtins pickles compactly, so it can be cached between runs.
+    __slots__ = ("kinds", "prefixes", "texts")
+
+    def __init__(self, kinds: bytes, prefixes: list[str], texts: list[str]):
+        self.kinds = kinds
+        self.prefixes = prefixes
+        self.texts = texts
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Document):
+            return NotImplemented
+        return (
+            self.kinds == other.kinds
+            and self.prefixes == other.prefixes
+            and self.texts == other.texts
+        )
+
+    def __repr__(self) -> str:
+        return f"Document({len(self)} blocks)"
+
+
+def parse(text: str, config: Config | None = None) -> Document:
+    # Only config's block and token limits matter here, as they decide
+    # which blocks are wrapped at all; render takes the rest.
+    if config is None:
+        config = Config()
+
+    kinds = bytearray()
+    prefixes = []
+    texts = []
+    for block in lex_blocks(text.split("\n"), config.max_block_length):
+        kinds.append(block.kind)
+        prefixes.append(block.prefix)
+        if block.kind in VERBATIM:
+            texts.append(block.text)
+        else:
+            texts.append("\n".join(_tokenize(block.text, config.max_token_length)))
+    return Document(bytes(kinds), prefixes, texts)
+
+
+def render(document: Document, config: Config | None = None) -> str:
+    return "\n".join(render_lines(document, config))
+
+
+def render_lines(document: Document, config: Config | None = None) -> Iterator[str]:
+    if config is None:
+        config = Config()
+
+    wrap = WRAPPERS[config.wrap_mode]
+    for kind, prefix, text in zip(document.kinds, document.prefixes, document.texts):
+        kind = _KINDS[kind]
+        if kind in VERBATIM:
+            yield text
+            continue
+
+        tokens = text.split("\n") if text else []
+        widths = None
+        if config.display_width and not text.isascii():
+            widths = token_widths(tokens)
+        wrapped_lines = wrap(tokens, config.line_length - len(prefix), widths)
+        if kind is Kind.LIST:
+            indent = " " * len(prefix)
+            yield prefix + wrapped_lines[0]
+            for wrapped_line in wrapped_lines[1:]:
+                yield indent + wrapped_line
+        else:
+            for wrapped_line in wrapped_lines:
+                yield prefix + wrapped_line
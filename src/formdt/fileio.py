@@ -0,0 +1,56 @@
+import os
+import stat
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import BinaryIO
+
+
+@contextmanager
+def replacing(path: Path) -> Iterator[BinaryIO]:
+    # Yields a temporary file beside path with the same permission bits.
+    # commit() moves it over path in one rename, so readers see either the
+    # old or the new contents; if it is not committed it is removed. A
+    # symlink is written through: its target is replaced, not the link.
+    path = _target(path)
+    mode = stat.S_IMODE(path.stat().st_mode)
+    f = tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f".{path.name}.", delete=False
+    )
+    try:
+        os.chmod(f.name, mode)
+        yield f
+    finally:
+        f.close()
+        with suppress(FileNotFoundError):
+            os.unlink(f.name)
+
+
+def commit(f: BinaryIO, path: Path) -> None:
+    f.close()
+    os.replace(f.name, _target(path))
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    if not path.exists():
+        path.write_bytes(data)
+        return
+    with replacing(path) as f:
+        f.write(data)
+        commit(f, path)
+
+
+def _target(path: Path) -> Path:
+    return Path(os.path.realpath(path))
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    # Leaves the file, and its mtime, alone when it already holds data.
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    atomic_write(path, data)
+    return True
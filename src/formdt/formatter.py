@@ -1,117 +1,158 @@
 import re
+import time
+from bisect import bisect_right
+from collections.abc import Callable, Iterable, Iterator
+from itertools import accumulate, repeat
+from operator import add
 
-from .config import Config
+from . import stats as _stats
+from .config import MAX_TOKEN_LENGTH, Config
+from .lexer import VERBATIM, Block, Kind, lex_blocks
+from .linebreak import wrap_optimal
+from .memo import ParagraphMemo
+from .width import token_widths
 
-LINK_PATTERN = re.compile(r"!?\[([^\]]*)\]\(([^)]+)\)")
+LINK_PATTERN = re.compile(r"!?\[[^\]]*\]\([^)]+\)")
 INLINE_MATH_PATTERN = re.compile(r"\$\$[^\$]+\$\$")
-LIST_PATTERN = re.compile(r"^(\s*)([-*+]|\d+\.)\s")
-HEADING_PATTERN = re.compile(r"^#{1,6}\s")
-CODE_FENCE_PATTERN = re.compile(r"^```")
-MATH_BLOCK_PATTERN = re.compile(r"^\$\$")
-CALLOUT_PATTERN = re.compile(r"^(>+)\s?")
-ADMONITION_PATTERN = re.compile(r"^(>+)\s*\[!(\w+)\]")
+# A token is a run of non-space characters in which links and inline math
+# are atomic, so their inner spaces never become break points.
+TOKEN_PATTERN = re.compile(
+    rf"(?:[^\s\[!$]+|{LINK_PATTERN.pattern}|{INLINE_MATH_PATTERN.pattern}|\S)+"
+)
+SPAN_START = re.compile(r"\[|\$\$")
+# An opening bracket followed by another, or by the end, before any closing
+# one. TOKEN_PATTERN searches for the closing bracket again from each.
+UNCLOSED_BRACKET = re.compile(r"\[[^\[\]]*+(?:\[|\Z)")
 
 
-def format_markdown(text: str, config: Config | None = None) -> str:
-    if config is None:
-        config = Config()
+def format_markdown(
+    text: str, config: Config | None = None, memo: ParagraphMemo | None = None
+) -> str:
+    return "\n".join(format_markdown_stream(text.split("\n"), config, memo))
 
-    lines = text.split("\n")
-    result = []
-    i = 0
-
-    while i < len(lines):
-        line = lines[i]
-
-        if CODE_FENCE_PATTERN.match(line):
-            result.append(line)
-            i += 1
-            while i < len(lines) and not CODE_FENCE_PATTERN.match(lines[i]):
-                result.append(lines[i])
-                i += 1
-            if i < len(lines):
-                result.append(lines[i])
-                i += 1
-            continue
 
-        if MATH_BLOCK_PATTERN.match(line.strip()):
-            result.append(line)
-            i += 1
-            while i < len(lines) and not MATH_BLOCK_PATTERN.match(lines[i].strip()):
-                result.append(lines[i])
-                i += 1
-            if i < len(lines):
-                result.append(lines[i])
-                i += 1
-            continue
+def format_markdown_stream(
+    lines: Iterable[str],
+    config: Config | None = None,
+    memo: ParagraphMemo | None = None,
+) -> Iterator[str]:
+    if config is None:
+        config = Config()
 
-        if HEADING_PATTERN.match(line) or line.strip() == "":
-            result.append(line)
-            i += 1
-            continue
+    wrap = WRAPPERS[config.wrap_mode]
+    stats = _stats.current()
+    if stats is not None:
+        lines = stats.counted("lines", lines)
+        blocks = stats.timed("lex", lex_blocks(lines, config.max_block_length))
+    else:
+        blocks = lex_blocks(lines, config.max_block_length)
 
-        list_match = LIST_PATTERN.match(line)
-        if list_match:
-            list_prefix = list_match.group(0)
-            indent = " " * len(list_prefix)
-            content = line[list_match.end() :]
+    for block in blocks:
+        if stats is not None:
+            stats.count(f"blocks.{block.kind.name.lower()}")
+        if block.kind in VERBATIM:
+            yield block.text
+        elif block.kind is Kind.LIST:
+            indent = " " * len(block.prefix)
             effective_length = config.line_length - len(indent)
-            wrapped = _wrap_paragraph(content, effective_length)
-            wrapped_lines = wrapped.split("\n")
-            result.append(list_prefix + wrapped_lines[0])
+            wrapped_lines = _wrap_block(
+                block, effective_length, config, wrap, stats, memo
+            )
+            yield block.prefix + wrapped_lines[0]
             for wrapped_line in wrapped_lines[1:]:
-                result.append(indent + wrapped_line)
-            i += 1
-            continue
+                yield indent + wrapped_line
+        else:
+            effective_length = config.line_length - len(block.prefix)
+            for wrapped_line in _wrap_block(
+                block, effective_length, config, wrap, stats, memo
+            ):
+                yield block.prefix + wrapped_line
 
-        admonition_match = ADMONITION_PATTERN.match(line)
-        if admonition_match:
-            result.append(line)
-            i += 1
-            continue
 
-        callout_match = CALLOUT_PATTERN.match(line)
-        callout_prefix = ""
-        if callout_match:
-            callout_prefix = callout_match.group(1) + " "
-            line = line[callout_match.end() :]
-
-        para_lines = [line]
-        i += 1
-        while i < len(lines):
-            next_line = lines[i]
-            if (
-                next_line.strip() == ""
-                or HEADING_PATTERN.match(next_line)
-                or LIST_PATTERN.match(next_line)
-                or CODE_FENCE_PATTERN.match(next_line)
-                or MATH_BLOCK_PATTERN.match(next_line.strip())
-            ):
-                break
-            if callout_prefix and CALLOUT_PATTERN.match(next_line):
-                next_callout = CALLOUT_PATTERN.match(next_line)
-                next_line = next_line[next_callout.end() :]
-            para_lines.append(next_line)
-            i += 1
-
-        paragraph = " ".join(para_lines)
-        effective_length = config.line_length - len(callout_prefix)
-        wrapped = _wrap_paragraph(paragraph, effective_length)
-        if callout_prefix:
-            wrapped = "\n".join(
-                callout_prefix + wrapped_line for wrapped_line in wrapped.split("\n")
-            )
-        result.append(wrapped)
+def _wrap_block(
+    block: Block,
+    line_length: int,
+    config: Config,
+    wrap: Callable[[list[str], int, list[int] | None], list[str]],
+    stats: _stats.Stats | None,
+    memo: ParagraphMemo | None = None,
+) -> list[str]:
+    if memo is not None:
+        key = (
+            block.text,
+            line_length,
+            config.wrap_mode,
+            config.max_token_length,
+            config.display_width,
+        )
+        wrapped_lines = memo.get(key)
+        if wrapped_lines is None:
+            wrapped_lines = _wrap_block(block, line_length, config, wrap, stats)
+            memo.put(key, wrapped_lines)
+        return wrapped_lines
+
+    # Widths are only needed where they can differ from lengths.
+    measured = config.display_width and not block.text.isascii()
+    if stats is None:
+        tokens = _tokenize(block.text, config.max_token_length)
+        return wrap(tokens, line_length, token_widths(tokens) if measured else None)
+
+    start = time.perf_counter()
+    tokens = _tokenize(block.text, config.max_token_length)
+    widths = token_widths(tokens) if measured else None
+    middle = time.perf_counter()
+    wrapped_lines = wrap(tokens, line_length, widths)
+    end = time.perf_counter()
 
-    return "\n".join(result)
+    stats.seconds["tokenize"] += middle - start
+    stats.seconds["wrap"] += end - middle
+    stats.seconds[f"blocks.{block.kind.name.lower()}"] += end - start
+    stats.count("tokens", len(tokens))
+    return wrapped_lines
 
 
-def _wrap_paragraph(paragraph: str, line_length: int) -> str:
-    tokens = _tokenize_with_links(paragraph)
+def _wrap_greedy(
+    tokens: list[str], line_length: int, widths: list[int] | None = None
+) -> list[str]:
+    if widths is not None:
+        return _wrap_widths(tokens, line_length, widths)
 
-    if not tokens:
-        return ""
+    # When no token holds a space, each line ends at the last space within
+    # reach in the joined text, found in C rather than token by token.
+    text = " ".join(tokens)
+    if text.count(" ") != len(tokens) - 1:
+        return _wrap_tokens(tokens, line_length)
 
+    wrapped_lines = []
+    start = 0
+    reach = max(line_length, 0) + 1
+    while len(text) - start > line_length:
+        cut = text.rfind(" ", start, start + reach)
+        if cut < 0:
+            cut = text.find(" ", start)
+            if cut < 0:
+                break
+        wrapped_lines.append(text[start:cut])
+        start = cut + 1
+    wrapped_lines.append(text[start:])
+    return wrapped_lines
+
+
+def _wrap_widths(tokens: list[str], line_length: int, widths: list[int]) -> list[str]:
+    # offsets[i] is the width of tokens[:i] with a space after each token,
+    # so each line's last token is found by bisection.
+    offsets = list(accumulate(map(add, widths, repeat(1)), initial=0))
+    wrapped_lines = []
+    start = 0
+    while start < len(tokens):
+        end = bisect_right(offsets, offsets[start] + line_length + 1, start + 1) - 1
+        end = max(end, start + 1)
+        wrapped_lines.append(" ".join(tokens[start:end]))
+        start = end
+    return wrapped_lines or [""]
+
+
+def _wrap_tokens(tokens: list[str], line_length: int) -> list[str]:
     wrapped_lines = []
     current_line = []
     current_length = 0
@@ -119,7 +160,7 @@ def _wrap_paragraph(paragraph: str, line_length: int) -> str:
     for token in tokens:
         token_length = len(token)
 
-        if current_length == 0:
+        if not current_line:
             current_line.append(token)
             current_length = token_length
         elif current_length + 1 + token_length <= line_length:
@@ -130,35 +171,87 @@ def _wrap_paragraph(paragraph: str, line_length: int) -> str:
             current_line = [token]
             current_length = token_length
 
-    if current_line:
-        wrapped_lines.append(" ".join(current_line))
+    wrapped_lines.append(" ".join(current_line))
+    return wrapped_lines
 
-    return "\n".join(wrapped_lines)
 
+def _tokenize(text: str, max_token_length: int = MAX_TOKEN_LENGTH) -> list[str]:
+    # Plain prose needs no scanning: str.split splits on exactly the
+    # whitespace that TOKEN_PATTERN treats as a separator.
+    if "[" not in text and "$$" not in text:
+        return text.split()
+    # TOKEN_PATTERN is faster unless unclosed brackets or link targets would
+    # make it rescan the text, and it can only differ from the scanner when
+    # a span might exceed max_token_length.
+    if (
+        len(text) <= max_token_length
+        and text.rfind("](") < text.rfind(")")
+        and UNCLOSED_BRACKET.search(text) is None
+    ):
+        return TOKEN_PATTERN.findall(text)
+    return _scan_tokens(text, max_token_length)
 
-def _tokenize_with_links(text: str) -> list[str]:
-    tokens = []
-    last_end = 0
 
-    # Find all special patterns (links and inline math)
-    patterns = []
-    for match in LINK_PATTERN.finditer(text):
-        patterns.append((match.start(), match.end(), match.group(0)))
-    for match in INLINE_MATH_PATTERN.finditer(text):
-        patterns.append((match.start(), match.end(), match.group(0)))
+def _scan_tokens(text: str, max_token_length: int) -> list[str]:
+    # Finds the same tokens as TOKEN_PATTERN in linear time. The regex looks
+    # for the closing bracket afresh at every opening one, so a long run of
+    # unclosed brackets is quadratic; here each closing character is found
+    # once and reused until the scan passes it. Spans longer than
+    # max_token_length are not atomic.
+    found = {}
 
-    # Sort by start position
-    patterns.sort(key=lambda x: x[0])
+    def find(char: str, start: int) -> int:
+        position = found.get(char, -2)
+        if position == -1 or position >= start:
+            return position
+        position = found[char] = text.find(char, start)
+        return position
 
-    for start, end, matched_text in patterns:
-        before = text[last_end:start]
-        if before:
-            tokens.extend(before.split())
-        tokens.append(matched_text)
-        last_end = end
+    tokens = []
+    joined = False  # whether the next piece continues the last token
+    plain = 0
+    position = 0
+    while match := SPAN_START.search(text, position):
+        position = match.start()
+        end = -1
+        if text[position] == "[":
+            start = position - 1 if text[position - 1 : position] == "!" else position
+            close = find("]", position + 1)
+            if close >= 0 and text.startswith("(", close + 1):
+                paren = find(")", close + 2)
+                if paren > close + 2:
+                    end = paren + 1
+        else:
+            start = position
+            dollar = find("$", position + 2)
+            if dollar > position + 2 and text.startswith("$", dollar + 1):
+                end = dollar + 2
+        if end < 0 or end - start > max_token_length:
+            position += 1
+            continue
 
-    after = text[last_end:]
-    if after:
-        tokens.extend(after.split())
+        joined = _extend(tokens, text[plain:start], joined)
+        if joined:
+            tokens[-1] += text[start:end]
+        else:
+            tokens.append(text[start:end])
+        joined = True
+        plain = position = end
 
+    _extend(tokens, text[plain:], joined)
     return tokens
+
+
+def _extend(tokens: list[str], piece: str, joined: bool) -> bool:
+    if not piece:
+        return joined
+    words = piece.split()
+    if joined and words and not piece[0].isspace():
+        tokens[-1] += words[0]
+        tokens.extend(words[1:])
+    else:
+        tokens.extend(words)
+    return not piece[-1].isspace()
+
+
+WRAPPERS = {"greedy": _wrap_greedy, "optimal": wrap_optimal}
@@ -0,0 +1,119 @@
+import os
+import subprocess
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from .config import Config, ConfigResolver
+from .discovery import SUFFIXES
+from .runner import FileResult, Options, format_file
+
+
+def _git(args: list[str], cwd: Path | None = None) -> bytes:
+    try:
+        completed = subprocess.run(
+            ["git", *args], cwd=cwd, capture_output=True, check=False
+        )
+    except FileNotFoundError:
+        raise RuntimeError("git is not installed") from None
+    if completed.returncode != 0:
+        message = completed.stderr.decode(errors="replace").strip()
+        raise RuntimeError(message or f"git {args[0]} failed")
+    return completed.stdout
+
+
+def repository_root(cwd: Path | None = None) -> Path:
+    return Path(_git(["rev-parse", "--show-toplevel"], cwd).decode().strip())
+
+
+def changed_files(
+    since: str | None = None,
+    staged: bool = False,
+    paths: Iterable[Path] = (),
+    cwd: Path | None = None,
+) -> list[str]:
+    # Repository-relative names of changed markdown and notebook files, from
+    # a single git diff. Deleted files are left out.
+    args = ["diff", "--name-only", "-z", "--no-renames", "--diff-filter=d"]
+    if staged:
+        args.append("--cached")
+    if since is not None:
+        args.append(since)
+    args.append("--")
+    args.extend(str(path) for path in paths)
+
+    names = _git(args, cwd).decode().split("\0")
+    return [name for name in names if name.endswith(SUFFIXES)]
+
+
+class BlobReader:
+    # One long-lived `git cat-file --batch` process serves every read.
+    def __init__(self, cwd: Path | None = None):
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def read(self, name: str) -> bytes | None:
+        # name is any object name, e.g. ":path" for the staged version.
+        if "\n" in name:
+            return None
+        self.process.stdin.write(name.encode() + b"\n")
+        self.process.stdin.flush()
+        # "<oid> <type> <size>", or "<name> missing" where name may itself
+        # contain spaces, so the size is what tells them apart.
+        header = self.process.stdout.readline().split()
+        if len(header) != 3 or not header[2].isdigit():
+            return None
+        size = int(header[2])
+        data = self.process.stdout.read(size)
+        self.process.stdout.read(1)
+        return data
+
+    def close(self) -> None:
+        self.process.stdin.close()
+        self.process.wait()
+        self.process.stdout.close()
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def format_staged(
+    names: list[str], root: Path, config: Config | ConfigResolver, options: Options
+) -> Iterator[FileResult]:
+    # Formats the staged contents of each file. Writing is only safe when the
+    # working tree file has no unstaged changes, since those would be lost.
+    read_only = Options(
+        cells=options.cells, all_markdown=options.all_markdown, profile=options.profile
+    )
+    with BlobReader(root) as blobs:
+        for name in names:
+            path = Path(os.path.relpath(root / name))
+            file_config = config
+            if isinstance(config, ConfigResolver):
+                file_config = config.for_path(path)
+            data = blobs.read(":" + name)
+            if data is None:
+                yield FileResult(path, error=f"{path}: not in the index")
+                continue
+            if not options.write or _matches_working_tree(path, data):
+                yield format_file(path, file_config, options, data)
+                continue
+
+            result = format_file(path, file_config, read_only, data)
+            result.output = None
+            if result.changed and result.error is None:
+                result.error = f"{path}: has unstaged changes, not written"
+            yield result
+
+
+def _matches_working_tree(path: Path, data: bytes) -> bool:
+    try:
+        return path.read_bytes() == data
+    except OSError:
+        return False
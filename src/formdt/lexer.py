@@ -0,0 +1,158 @@
+import re
+from collections.abc import Iterable, Iterator
+from enum import IntEnum
+from typing import NamedTuple
+
+from .config import MAX_BLOCK_LENGTH
+
+LIST_PATTERN = re.compile(r"^(\s*)([-*+]|\d+\.)\s")
+HEADING_PATTERN = re.compile(r"^#{1,6}\s")
+CALLOUT_PATTERN = re.compile(r"^(>+)\s?")
+ADMONITION_PATTERN = re.compile(r"^(>+)\s*\[!(\w+)\]")
+
+
+class Kind(IntEnum):
+    BLANK = 0
+    TEXT = 1
+    HEADING = 2
+    FENCE = 3
+    MATH = 4
+    LIST = 5
+    CALLOUT = 6
+    ADMONITION = 7
+    # A line of a paragraph or list item too long to wrap, kept as it is.
+    RAW = 8
+
+
+# Line kinds that end a paragraph when they follow one of its lines.
+PARAGRAPH_BREAKS = frozenset(
+    {Kind.BLANK, Kind.HEADING, Kind.LIST, Kind.FENCE, Kind.MATH}
+)
+VERBATIM = frozenset(
+    {Kind.BLANK, Kind.HEADING, Kind.FENCE, Kind.MATH, Kind.ADMONITION, Kind.RAW}
+)
+
+
+class Block(NamedTuple):
+    kind: Kind
+    text: str
+    prefix: str = ""
+
+
+def classify(line: str) -> Kind:
+    stripped = line.lstrip()
+    if not stripped:
+        return Kind.BLANK
+
+    first = stripped[0]
+    if first == "`":
+        return Kind.FENCE if line.startswith("```") else Kind.TEXT
+    if first == "$":
+        return Kind.MATH if stripped.startswith("$$") else Kind.TEXT
+    if first == "#":
+        return Kind.HEADING if HEADING_PATTERN.match(line) else Kind.TEXT
+    if first == ">":
+        if line[0] != ">":
+            return Kind.TEXT
+        return Kind.ADMONITION if ADMONITION_PATTERN.match(line) else Kind.CALLOUT
+    if first in "-*+" or first.isdigit():
+        return Kind.LIST if LIST_PATTERN.match(line) else Kind.TEXT
+    return Kind.TEXT
+
+
+def split_lines(lines: Iterable[str]) -> Iterator[str]:
+    ends_with_newline = False
+    for line in lines:
+        ends_with_newline = line.endswith("\n")
+        yield line[:-1] if ends_with_newline else line
+    if ends_with_newline:
+        yield ""
+
+
+def lex_blocks(
+    lines: Iterable[str], max_block_length: int = MAX_BLOCK_LENGTH
+) -> Iterator[Block]:
+    # Every line is classified once and held at most until its paragraph
+    # ends or grows past max_block_length, so lexing is linear in the input
+    # and a paragraph with no blank lines never needs more than that much
+    # memory.
+    lines = split_lines(lines)
+    line = next(lines, None)
+    kind = None if line is None else classify(line)
+
+    while line is not None:
+        if kind is Kind.FENCE or kind is Kind.MATH:
+            yield from _verbatim_run(kind, line, lines, max_block_length)
+        elif kind in VERBATIM:
+            yield Block(kind, line)
+        elif kind is Kind.LIST:
+            prefix = LIST_PATTERN.match(line).group(0)
+            if len(line) - len(prefix) > max_block_length:
+                yield Block(Kind.RAW, line)
+            else:
+                yield Block(kind, line[len(prefix) :], prefix)
+        else:
+            block_kind = kind
+            prefix = ""
+            originals = para_lines = [line]
+            if kind is Kind.CALLOUT:
+                match = CALLOUT_PATTERN.match(line)
+                prefix = match.group(1) + " "
+                para_lines = [line[match.end() :]]
+
+            size = len(para_lines[0])
+            line = None
+            if size <= max_block_length:
+                for next_line in lines:
+                    next_kind = classify(next_line)
+                    if next_kind in PARAGRAPH_BREAKS:
+                        line, kind = next_line, next_kind
+                        break
+                    if prefix:
+                        originals.append(next_line)
+                        if next_line.startswith(">"):
+                            match = CALLOUT_PATTERN.match(next_line)
+                            next_line = next_line[match.end() :]
+                    para_lines.append(next_line)
+                    size += 1 + len(next_line)
+                    if size > max_block_length:
+                        break
+
+            if size <= max_block_length:
+                yield Block(block_kind, " ".join(para_lines), prefix)
+                continue
+
+            for original in originals:
+                yield Block(Kind.RAW, original)
+            for line in lines:
+                kind = classify(line)
+                if kind in PARAGRAPH_BREAKS:
+                    break
+                yield Block(Kind.RAW, line)
+            else:
+                line = None
+            continue
+
+        line = next(lines, None)
+        kind = None if line is None else classify(line)
+
+
+def _verbatim_run(
+    kind: Kind, first: str, lines: Iterator[str], max_block_length: int
+) -> Iterator[Block]:
+    # A fence or math block is passed through as one block of its lines
+    # joined by newlines, split into pieces of about max_block_length so an
+    # unclosed one is never held whole.
+    fence = kind is Kind.FENCE
+    run = [first]
+    size = len(first)
+    for line in lines:
+        if size > max_block_length:
+            yield Block(kind, "\n".join(run))
+            run = []
+            size = -1
+        run.append(line)
+        size += 1 + len(line)
+        if line.startswith("```") if fence else line.lstrip().startswith("$$"):
+            break
+    yield Block(kind, "\n".join(run))
@@ -0,0 +1,120 @@
+from bisect import bisect_left, bisect_right
+
+# Minimum-raggedness line breaking. A paragraph of n tokens is split so that
+# the sum of squared trailing space over every line but the last is minimal.
+# Overflowing a line costs more than any amount of raggedness, so a line is
+# only ever wider than line_length when it holds a single long token.
+#
+# The cost of a line depends only on its width and is convex in it, so the
+# cost matrix is Monge: once a later break point beats an earlier one for
+# some line end, it beats it for every line end after that. The candidates
+# therefore form a queue in which each owns an interval of line ends, and
+# the point where a new candidate takes over is found by binary search. This
+# is O(n log k) for k tokens per line, instead of the O(n^2) textbook DP.
+
+
+def wrap_optimal(
+    tokens: list[str], line_length: int, widths: list[int] | None = None
+) -> list[str]:
+    n = len(tokens)
+    if n <= 1:
+        return [" ".join(tokens)]
+    # A prefix wider than the line leaves no room at all; treating that as a
+    # single column keeps overflow the costliest choice, one token per line.
+    line_length = max(line_length, 1)
+
+    # offsets[i] is the width of tokens[:i] with a space after each token.
+    if widths is None:
+        widths = list(map(len, tokens))
+    offsets = [0] * (n + 1)
+    for i, width in enumerate(widths):
+        offsets[i + 1] = offsets[i] + width + 1
+    overflow = (line_length + 1) ** 2 * (n + 1)
+    limit = line_length + 1
+
+    def score(i: int, j: int) -> int:
+        # Cost of breaks up to i plus a line of tokens[i:j].
+        slack = limit - offsets[j] + offsets[i]
+        return best[i] + (slack * slack if slack >= 0 else -slack * overflow)
+
+    best = [0] * (n + 1)
+    previous = [0] * (n + 1)
+    candidates = [0]
+    starts = [1]
+    head = 0
+
+    for j in range(1, n):
+        while head + 1 < len(candidates) and starts[head + 1] <= j:
+            head += 1
+        i = candidates[head]
+        best[j] = score(i, j)
+        previous[j] = i
+
+        # j takes over from the last candidate at the first line end where
+        # it is at least as good; drop candidates it beats outright.
+        while len(candidates) > head:
+            start = starts[-1] if starts[-1] > j else j + 1
+            if score(j, start) > score(candidates[-1], start):
+                break
+            candidates.pop()
+            starts.pop()
+        if len(candidates) == head:
+            candidates.append(j)
+            starts.append(j + 1)
+            continue
+
+        # While both lines fit, j beats last once offsets[x] reaches a
+        # threshold that follows from expanding the squared costs. Past the
+        # point where last overflows, fall back to a binary search; once j
+        # overflows too their costs differ by a constant, so j never wins.
+        last = candidates[-1]
+        low = (starts[-1] if starts[-1] > j else j + 1) + 1
+        high = bisect_right(offsets, offsets[j] + limit, j)
+        if high >= n:
+            high = n - 1
+        if low > high:
+            continue
+        a = offsets[j]
+        b = offsets[last]
+        numerator = 2 * (a - b) * limit + a * a - b * b - best[last] + best[j]
+        threshold = -(-numerator // (2 * (a - b)))
+        x = bisect_left(offsets, threshold, low, high + 1)
+        if x <= high and offsets[x] - b <= limit:
+            candidates.append(j)
+            starts.append(x)
+            continue
+
+        low = max(low, bisect_right(offsets, b + limit, low))
+        if low > high:
+            continue
+        if score(j, low) > score(last, low):
+            if score(j, high) > score(last, high):
+                continue
+        else:
+            high = low
+        while low < high:
+            middle = (low + high) // 2
+            if score(j, middle) <= score(last, middle):
+                high = middle
+            else:
+                low = middle + 1
+        candidates.append(j)
+        starts.append(low)
+
+    # The last line costs nothing as long as it fits.
+    end = n - 1
+    end_cost = best[end] + max(0, widths[end] - line_length) * overflow
+    for i in range(n - 2, -1, -1):
+        if offsets[n] - offsets[i] - 1 > line_length:
+            break
+        if best[i] < end_cost:
+            end, end_cost = i, best[i]
+
+    lines = [" ".join(tokens[end:])]
+    j = end
+    while j > 0:
+        i = previous[j]
+        lines.append(" ".join(tokens[i:j]))
+        j = i
+    lines.reverse()
+    return lines
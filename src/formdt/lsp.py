@@ -0,0 +1,267 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import BinaryIO
+from urllib.parse import unquote, urlparse
+
+from .config import Config, ConfigResolver
+from .ranges import Edit, SegmentCache, diff_lines, format_markdown_range
+
+INCREMENTAL_SYNC = 2
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+LOG_ERROR = 1
+# What a handler raises on malformed params, an unknown document or a
+# configuration it cannot read; anything else is a bug and ends the server.
+HANDLER_ERRORS = (KeyError, TypeError, ValueError, IndexError, OSError)
+
+
+def read_message(stream: BinaryIO) -> dict | None:
+    length = None
+    while True:
+        header = stream.readline()
+        if not header:
+            return None
+        header = header.strip()
+        if not header:
+            break
+        name, _, value = header.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    if length is None:
+        return None
+    return json.loads(stream.read(length))
+
+
+def write_message(stream: BinaryIO, message: dict) -> None:
+    body = json.dumps(message, ensure_ascii=False).encode()
+    stream.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    stream.flush()
+
+
+def _utf16_length(text: str) -> int:
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _to_index(line: str, character: int) -> int:
+    if line.isascii():
+        return min(character, len(line))
+    units = 0
+    for i, char in enumerate(line):
+        if units >= character:
+            return i
+        units += 2 if ord(char) > 0xFFFF else 1
+    return len(line)
+
+
+class Document:
+    def __init__(self, text: str):
+        self.lines = text.split("\n")
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def apply_change(self, change: dict) -> None:
+        if "range" not in change:
+            self.lines = change["text"].split("\n")
+            return
+
+        start, end = change["range"]["start"], change["range"]["end"]
+        last = len(self.lines) - 1
+        start_line = min(start["line"], last)
+        end_line = min(end["line"], last)
+        head = self.lines[start_line]
+        tail = self.lines[end_line]
+        head = head[: _to_index(head, start["character"])]
+        tail = tail[_to_index(tail, end["character"]) :]
+        if end["line"] > last:
+            tail = ""
+        self.lines[start_line : end_line + 1] = (head + change["text"] + tail).split(
+            "\n"
+        )
+
+    def text_edit(self, edit: Edit) -> dict:
+        lines = self.lines
+        if edit.end_line < len(lines):
+            start = {"line": edit.start_line, "character": 0}
+            end = {"line": edit.end_line, "character": 0}
+            new_text = "".join(line + "\n" for line in edit.lines)
+        elif edit.start_line > 0:
+            previous = edit.start_line - 1
+            start = {"line": previous, "character": _utf16_length(lines[previous])}
+            end = {"line": len(lines) - 1, "character": _utf16_length(lines[-1])}
+            new_text = "".join("\n" + line for line in edit.lines)
+        else:
+            start = {"line": 0, "character": 0}
+            end = {"line": len(lines) - 1, "character": _utf16_length(lines[-1])}
+            new_text = "\n".join(edit.lines)
+        return {"range": {"start": start, "end": end}, "newText": new_text}
+
+
+class LanguageServer:
+    def __init__(
+        self, reader: BinaryIO, writer: BinaryIO, config: Config | None = None
+    ):
+        self.reader = reader
+        self.writer = writer
+        self.config = config
+        self.resolver = ConfigResolver()
+        self.root: Path | None = None
+        self.documents: dict[str, Document] = {}
+        self.segments = SegmentCache()
+        self.shutdown_requested = False
+
+    def run(self) -> int:
+        while True:
+            try:
+                message = read_message(self.reader)
+            except ValueError as e:
+                # Bad JSON, bad UTF-8 or a bad Content-Length. The body, if
+                # any, has been consumed, so the next message can be read.
+                self.respond(None, error=(PARSE_ERROR, str(e)))
+                continue
+            if message is None:
+                return 1
+            if not isinstance(message, dict):
+                self.respond(None, error=(INVALID_REQUEST, "expected an object"))
+                continue
+            method = message.get("method")
+            if method == "exit":
+                return 0 if self.shutdown_requested else 1
+            self.dispatch(message)
+
+    def dispatch(self, message: dict) -> None:
+        method = message.get("method")
+        params = message.get("params") or {}
+        handler = getattr(self, "on_" + (method or "").replace("/", "_"), None)
+
+        if "id" not in message:
+            # Notifications have no response to carry an error, so it is
+            # logged to the client instead.
+            if handler is not None:
+                try:
+                    handler(params)
+                except HANDLER_ERRORS as e:
+                    self.log(f"{method}: {e!r}")
+            return
+
+        if handler is None:
+            self.respond(message["id"], error=(METHOD_NOT_FOUND, f"{method}"))
+            return
+        try:
+            result = handler(params)
+        except HANDLER_ERRORS as e:
+            self.respond(message["id"], error=(INVALID_PARAMS, str(e)))
+            return
+        self.respond(message["id"], result)
+
+    def respond(
+        self, request_id, result=None, error: tuple[int, str] | None = None
+    ) -> None:
+        message = {"jsonrpc": "2.0", "id": request_id}
+        if error is None:
+            message["result"] = result
+        else:
+            message["error"] = {"code": error[0], "message": error[1]}
+        write_message(self.writer, message)
+
+    def log(self, message: str) -> None:
+        write_message(
+            self.writer,
+            {
+                "jsonrpc": "2.0",
+                "method": "window/logMessage",
+                "params": {"type": LOG_ERROR, "message": message},
+            },
+        )
+
+    def on_initialize(self, params: dict) -> dict:
+        self.root = _uri_path(params.get("rootUri"))
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": INCREMENTAL_SYNC},
+                "documentFormattingProvider": True,
+                "documentRangeFormattingProvider": True,
+            },
+            "serverInfo": {"name": "formdt"},
+        }
+
+    def on_shutdown(self, params: dict) -> None:
+        self.shutdown_requested = True
+
+    def on_textDocument_didOpen(self, params: dict) -> None:
+        document = params["textDocument"]
+        self.documents[document["uri"]] = Document(document["text"])
+
+    def on_textDocument_didChange(self, params: dict) -> None:
+        document = self.documents[params["textDocument"]["uri"]]
+        for change in params["contentChanges"]:
+            document.apply_change(change)
+
+    def on_textDocument_didClose(self, params: dict) -> None:
+        self.documents.pop(params["textDocument"]["uri"], None)
+
+    def on_textDocument_formatting(self, params: dict) -> list[dict]:
+        document = self.documents[params["textDocument"]["uri"]]
+        text = document.text
+        formatted = self.format_text(
+            text, self.config_for(params["textDocument"]["uri"])
+        )
+        if formatted == text:
+            return []
+        edit = diff_lines(document.lines, formatted.split("\n"))
+        return [document.text_edit(edit)]
+
+    def on_textDocument_rangeFormatting(self, params: dict) -> list[dict]:
+        document = self.documents[params["textDocument"]["uri"]]
+        start, end = params["range"]["start"], params["range"]["end"]
+        end_line = end["line"] + (1 if end["character"] > 0 else 0)
+        edit = format_markdown_range(
+            document.text,
+            start["line"],
+            max(end_line, start["line"] + 1),
+            self.config_for(params["textDocument"]["uri"]),
+        )
+        if edit.start_line == edit.end_line and not edit.lines:
+            return []
+        return [document.text_edit(edit)]
+
+    def config_for(self, uri: str) -> Config:
+        # An explicit config wins; otherwise each document gets the config of
+        # its own directory, or of the workspace root for unsaved documents.
+        if self.config is not None:
+            return self.config
+        path = _uri_path(uri)
+        if path is not None:
+            return self.resolver.for_path(path)
+        if self.root is not None:
+            return self.resolver.for_directory(self.root)
+        return Config()
+
+    def format_text(self, text: str, config: Config | None = None) -> str:
+        return self.segments.format(text, config or self.config or Config())
+
+
+def _uri_path(uri: str | None) -> Path | None:
+    if not uri or not uri.startswith("file:"):
+        return None
+    return Path(unquote(urlparse(uri).path))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="formdt lsp", description="Run a Language Server Protocol server"
+    )
+    parser.add_argument(
+        "--stdio", action="store_true", help="Communicate over stdio (the default)"
+    )
+    parser.parse_args(argv)
+
+    server = LanguageServer(sys.stdin.buffer, sys.stdout.buffer)
+    return server.run()
@@ -0,0 +1,90 @@
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .cache import _load, get_cache_dir
+from .fileio import atomic_write
+
+MEMO_BYTES = 32 * 1024 * 1024
+# Charged per entry on top of its text, for the tuple, list and dict slot.
+ENTRY_OVERHEAD = 200
+
+MemoKey = tuple[str, int, str, int, bool]
+
+
+class ParagraphMemo:
+    # Wrapped lines of recently formatted paragraphs, keyed by the text and
+    # everything that decides how it wraps: width, wrap mode, token limit
+    # and how width is measured. Boilerplate that recurs across documents,
+    # such as license paragraphs, is tokenized and wrapped once. Entries are
+    # charged the length of their text and lines, and the least recently
+    # used are evicted once that exceeds max_bytes. Safe to share between
+    # threads.
+    def __init__(self, max_bytes: int = MEMO_BYTES, path: Path | None = None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.entries: OrderedDict[MemoKey, list[str]] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def read(
+        cls, cache_dir: Path | None = None, max_bytes: int = MEMO_BYTES
+    ) -> "ParagraphMemo":
+        memo = cls(max_bytes, (cache_dir or get_cache_dir()) / "memo.pickle")
+        for key, lines in _load(memo.path).items():
+            memo.put(key, lines)
+        return memo
+
+    def get(self, key: MemoKey) -> list[str] | None:
+        with self.lock:
+            lines = self.entries.get(key)
+            if lines is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return lines
+
+    def put(self, key: MemoKey, lines: list[str]) -> None:
+        size = _size(key, lines)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= _size(key, old)
+            self.entries[key] = lines
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                evicted, evicted_lines = self.entries.popitem(last=False)
+                self.bytes -= _size(evicted, evicted_lines)
+                self.evictions += 1
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def write(self) -> None:
+        # Saved least recently used first, so reading it back keeps the order.
+        if self.path is None:
+            return
+        with self.lock:
+            data = pickle.dumps(dict(self.entries), protocol=pickle.HIGHEST_PROTOCOL)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, data)
+
+
+def _size(key: MemoKey, lines: list[str]) -> int:
+    return len(key[0]) + sum(map(len, lines)) + ENTRY_OVERHEAD
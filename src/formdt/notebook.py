@@ -1,7 +1,10 @@
 import json
+import re
 from pathlib import Path
 
+from . import stats as _stats
 from .config import Config
+from .fileio import write_if_changed
 from .formatter import format_markdown
 
 
@@ -38,7 +41,183 @@ def format_notebook(
     return notebook
 
 
-def write_notebook(notebook: dict, path: Path) -> None:
-    with open(path, "w") as f:
-        json.dump(notebook, f, indent=1, ensure_ascii=False)
-        f.write("\n")
+def write_notebook(notebook: dict, path: Path) -> bool:
+    data = json.dumps(notebook, indent=1, ensure_ascii=False) + "\n"
+    return write_if_changed(path, data.encode())
+
+
+WHITESPACE = re.compile(rb"[ \t\n\r]*")
+SCALAR = re.compile(rb"[^,\]}\s]+")
+BACKSLASH = ord("\\")
+
+
+def _skip_whitespace(data: bytes, pos: int) -> int:
+    return WHITESPACE.match(data, pos).end()
+
+
+def _skip_string(data: bytes, pos: int) -> int:
+    # bytes.find skips over large base64 outputs far faster than a regex.
+    end = data.find(b'"', pos + 1)
+    while end >= 0:
+        escape = end - 1
+        while data[escape] == BACKSLASH:
+            escape -= 1
+        if (end - escape) % 2:
+            return end + 1
+        end = data.find(b'"', end + 1)
+    raise ValueError(f"unterminated string at byte {pos}")
+
+
+def _expect(data: bytes, pos: int, char: bytes) -> int:
+    pos = _skip_whitespace(data, pos)
+    if data[pos : pos + 1] != char:
+        raise ValueError(f"expected {char.decode()!r} at byte {pos}")
+    return pos + 1
+
+
+def _skip_value(data: bytes, pos: int) -> int:
+    pos = _skip_whitespace(data, pos)
+    first = data[pos : pos + 1]
+    if first == b'"':
+        return _skip_string(data, pos)
+    if first == b"{":
+        close = pos + 1
+        for _key, _start, close in _members(data, pos):
+            pass
+        return _expect(data, close, b"}")
+    if first == b"[":
+        close = pos + 1
+        for _start, close in _items(data, pos):
+            pass
+        return _expect(data, close, b"]")
+    match = SCALAR.match(data, pos)
+    if match is None:
+        raise ValueError(f"invalid JSON value at byte {pos}")
+    return match.end()
+
+
+def _members(data: bytes, pos: int):
+    # Yields (key, value_start, value_end) for each member of the object
+    # starting at pos, without decoding any values.
+    pos = _expect(data, pos, b"{")
+    pos = _skip_whitespace(data, pos)
+    if data[pos : pos + 1] == b"}":
+        return
+    while True:
+        pos = _skip_whitespace(data, pos)
+        if data[pos : pos + 1] != b'"':
+            raise ValueError(f"expected object key at byte {pos}")
+        end = _skip_string(data, pos)
+        key = data[pos:end]
+        pos = _expect(data, end, b":")
+        start = _skip_whitespace(data, pos)
+        end = _skip_value(data, start)
+        yield key, start, end
+        pos = _skip_whitespace(data, end)
+        if data[pos : pos + 1] != b",":
+            return
+        pos += 1
+
+
+def _items(data: bytes, pos: int):
+    pos = _expect(data, pos, b"[")
+    pos = _skip_whitespace(data, pos)
+    if data[pos : pos + 1] == b"]":
+        return
+    while True:
+        start = _skip_whitespace(data, pos)
+        end = _skip_value(data, start)
+        yield start, end
+        pos = _skip_whitespace(data, end)
+        if data[pos : pos + 1] != b",":
+            return
+        pos += 1
+
+
+def _encode_source(value: list[str] | str, data: bytes, start: int, end: int) -> bytes:
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False).encode()
+    if not value:
+        return b"[]"
+
+    # Lay the new list out the way the original one was.
+    spans = list(_items(data, start))
+    if spans:
+        item_indent = data[start + 1 : spans[0][0]]
+        close_indent = data[spans[-1][1] : end - 1]
+    else:
+        # Empty list: indent one level past the "source" key, as nbformat does.
+        line_start = data.rfind(b"\n", 0, start) + 1
+        key_indent = _skip_whitespace(data, line_start) - line_start
+        item_indent = b"\n" + b" " * (key_indent + 1)
+        close_indent = b"\n" + b" " * key_indent
+    if len(spans) > 1:
+        separator = data[spans[0][1] : spans[1][0]]
+    elif b"\n" in item_indent:
+        separator = b"," + item_indent
+    else:
+        separator = b", "
+
+    items = [json.dumps(item, ensure_ascii=False).encode() for item in value]
+    return b"[" + item_indent + separator.join(items) + close_indent + b"]"
+
+
+def _cell_sources(data: bytes):
+    # Yields (index, cell_type, source_start, source_end) for every cell.
+    for key, start, end in _members(data, 0):
+        if key != b'"cells"':
+            continue
+        for index, (cell_start, _cell_end) in enumerate(_items(data, start)):
+            cell_type = None
+            source = None
+            for cell_key, value_start, value_end in _members(data, cell_start):
+                if cell_key == b'"cell_type"':
+                    cell_type = json.loads(data[value_start:value_end])
+                elif cell_key == b'"source"':
+                    source = (value_start, value_end)
+            if source is not None:
+                yield index, cell_type, source[0], source[1]
+
+
+def format_notebook_bytes(
+    data: bytes,
+    config: Config,
+    cells: list[int] | None = None,
+    all_markdown: bool = False,
+) -> bytes:
+    if not all_markdown and cells is None:
+        return data
+
+    stats = _stats.current()
+    sources = _cell_sources(data)
+    if stats is not None:
+        sources = stats.timed("notebook.scan", sources)
+
+    pieces = []
+    position = 0
+    for index, cell_type, start, end in sources:
+        if cell_type != "markdown":
+            continue
+        if cells is not None and index not in cells:
+            continue
+
+        source = json.loads(data[start:end])
+        text = "".join(source) if isinstance(source, list) else source
+        formatted = format_markdown(text, config)
+        if isinstance(source, list):
+            formatted = formatted.splitlines(keepends=True)
+        if stats is not None:
+            stats.count("cells")
+        if formatted == source:
+            continue
+        if stats is not None:
+            stats.count("cells_changed")
+
+        pieces.append(data[position:start])
+        pieces.append(_encode_source(formatted, data, start, end))
+        position = end
+
+    if not pieces:
+        return data
+    pieces.append(data[position:])
+    return b"".join(pieces)
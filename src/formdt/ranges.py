@@ -0,0 +1,224 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import astuple, dataclass
+from difflib import SequenceMatcher
+
+from .config import Config
+from .formatter import format_markdown
+from .lexer import Kind, classify
+
+SEGMENT_CACHE_SIZE = 4096
+SINGLE_LINE_BLOCKS = frozenset({Kind.BLANK, Kind.HEADING, Kind.LIST})
+BLOCK_STARTS = SINGLE_LINE_BLOCKS | {Kind.FENCE, Kind.MATH}
+
+
+@dataclass
+class Edit:
+    start_line: int
+    end_line: int
+    lines: list[str]
+
+    def apply(self, text: str) -> str:
+        lines = text.split("\n")
+        lines[self.start_line : self.end_line] = self.lines
+        return "\n".join(lines)
+
+
+def _marker_candidates(text: str) -> Iterator[tuple[int, bool]]:
+    fence = text.find("```")
+    math = text.find("$$")
+    while fence >= 0 or math >= 0:
+        if math < 0 or 0 <= fence < math:
+            yield fence, True
+            fence = text.find("```", fence + 3)
+        else:
+            yield math, False
+            math = text.find("$$", math + 2)
+
+
+def scan_regions(text: str) -> list[tuple[int, int]]:
+    # Offsets of the opening and closing marker lines of every fence and math
+    # block. An unclosed block runs to len(text).
+    regions = []
+    opener = closer = None
+    for position, is_fence in _marker_candidates(text):
+        line_start = text.rfind("\n", 0, position) + 1
+        if is_fence:
+            if position != line_start:
+                continue
+        elif text[line_start:position].strip():
+            continue
+        if closer is None:
+            opener = position
+            closer = "```" if is_fence else "$$"
+        elif (closer == "```") == is_fence:
+            regions.append((opener, line_start))
+            closer = None
+    if closer is not None:
+        regions.append((opener, len(text)))
+    return regions
+
+
+def split_segments(text: str) -> list[str]:
+    # An empty line outside fences and math blocks always starts a fresh
+    # block, so the text can be formatted piecewise at the newline before
+    # each one.
+    regions = iter(scan_regions(text))
+    region = next(regions, None)
+    segments = []
+    start = 0
+    cut = text.find("\n\n")
+    while cut >= 0:
+        while region is not None and cut > region[1]:
+            region = next(regions, None)
+        if region is None or cut < region[0]:
+            segments.append(text[start:cut])
+            start = cut + 1
+        cut = text.find("\n\n", cut + 1)
+    segments.append(text[start:])
+    return segments
+
+
+class SegmentCache:
+    # Formats text segment by segment, remembering the most recent results,
+    # so after an edit only the segments that changed are formatted again.
+    def __init__(self, size: int = SEGMENT_CACHE_SIZE):
+        self.size = size
+        self.segments: OrderedDict[tuple, str] = OrderedDict()
+
+    def format(self, text: str, config: Config) -> str:
+        key = astuple(config)
+        formatted = []
+        for segment in split_segments(text):
+            result = self.segments.get((segment, key))
+            if result is None:
+                result = format_markdown(segment, config)
+                self.segments[(segment, key)] = result
+                if len(self.segments) > self.size:
+                    self.segments.popitem(last=False)
+            else:
+                self.segments.move_to_end((segment, key))
+            formatted.append(result)
+        return "\n".join(formatted)
+
+
+class BlockBoundaries:
+    def __init__(self, text: str, lines: list[str] | None = None):
+        self.lines = text.split("\n") if lines is None else lines
+        self.opens: list[int] = []
+        self.closes: list[int] = []
+
+        line_no = 0
+        position = 0
+        for opener, closer in scan_regions(text):
+            line_no += text.count("\n", position, opener)
+            self.opens.append(line_no)
+            line_no += text.count("\n", opener, closer)
+            self.closes.append(min(line_no, len(self.lines) - 1))
+            position = closer
+
+    def enclosing_region(self, line: int) -> tuple[int, int] | None:
+        index = bisect_right(self.opens, line) - 1
+        if index >= 0 and line <= self.closes[index]:
+            return self.opens[index], self.closes[index]
+        return None
+
+    def is_boundary(self, line: int) -> bool:
+        if line <= 0 or line >= len(self.lines):
+            return True
+        region = self.enclosing_region(line)
+        if region is not None:
+            return region[0] == line
+        if self.enclosing_region(line - 1) is not None:
+            return True
+        if classify(self.lines[line]) in BLOCK_STARTS:
+            return True
+        return classify(self.lines[line - 1]) in SINGLE_LINE_BLOCKS
+
+    def widen(self, start_line: int, end_line: int) -> tuple[int, int]:
+        start = max(0, min(start_line, len(self.lines)))
+        end = max(start + 1, min(end_line, len(self.lines)))
+
+        region = self.enclosing_region(start)
+        if region is not None:
+            start = region[0]
+        while not self.is_boundary(start):
+            start -= 1
+
+        region = self.enclosing_region(end - 1)
+        if region is not None:
+            end = max(end, region[1] + 1)
+        while not self.is_boundary(end):
+            end += 1
+        return start, end
+
+
+def _common_prefix(a: list[str], b: list[str], limit: int) -> int:
+    # Binary search with slice comparisons keeps the scan in C.
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[low:mid] == b[low:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def diff_lines(old: list[str], new: list[str], offset: int = 0) -> Edit:
+    limit = min(len(old), len(new))
+    prefix = _common_prefix(old, new, limit)
+    suffix = _common_prefix(old[::-1], new[::-1], limit - prefix)
+    return Edit(
+        offset + prefix,
+        offset + len(old) - suffix,
+        new[prefix : len(new) - suffix],
+    )
+
+
+def _hunk_range(start: int, length: int) -> str:
+    if length == 1:
+        return str(start + 1)
+    return f"{start + 1 if length else start},{length}"
+
+
+def unified_diff(old: list[str], new: list[str], path: str, context: int = 3) -> str:
+    # Only the changed span, trimmed of its common prefix and suffix and
+    # padded with context, goes through SequenceMatcher; hunk headers are
+    # shifted back to file line numbers.
+    edit = diff_lines(old, new)
+    if edit.start_line == edit.end_line and not edit.lines:
+        return ""
+    start = max(0, edit.start_line - context)
+    old_end = min(len(old), edit.end_line + context)
+    new_end = edit.start_line + len(edit.lines) + old_end - edit.end_line
+    old, new = old[start:old_end], new[start:new_end]
+
+    if path.startswith("/"):
+        lines = [f"--- {path}", f"+++ {path}"]
+    else:
+        lines = [f"--- a/{path}", f"+++ b/{path}"]
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    for group in matcher.get_grouped_opcodes(context):
+        first, last = group[0], group[-1]
+        old_range = _hunk_range(start + first[1], last[2] - first[1])
+        new_range = _hunk_range(start + first[3], last[4] - first[3])
+        lines.append(f"@@ -{old_range} +{new_range} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                lines.extend(" " + line for line in old[i1:i2])
+                continue
+            lines.extend("-" + line for line in old[i1:i2])
+            lines.extend("+" + line for line in new[j1:j2])
+    return "\n".join(lines)
+
+
+def format_markdown_range(
+    text: str, start_line: int, end_line: int, config: Config | None = None
+) -> Edit:
+    boundaries = BlockBoundaries(text)
+    start, end = boundaries.widen(start_line, end_line)
+    old = boundaries.lines[start:end]
+    new = format_markdown("\n".join(old), config).split("\n")
+    return diff_lines(old, new, start)
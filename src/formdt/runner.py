@@ -0,0 +1,397 @@
+import codecs
+import hashlib
+import os
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+from . import stats as _stats
+from .cache import Cache, digest
+from .config import Config, ConfigResolver
+from .fileio import atomic_write, commit, replacing
+from .formatter import format_markdown, format_markdown_stream
+from .notebook import format_notebook_bytes
+from .ranges import unified_diff
+from .verify import is_formatted, verify
+
+MAX_BATCH_SIZE = 64
+BATCHES_PER_WORKER = 4
+CHUNK_SIZE = 1 << 18
+
+
+@dataclass
+class Options:
+    write: bool = False
+    cells: list[int] | None = None
+    all_markdown: bool = False
+    profile: bool = False
+    check: bool = False
+    diff: bool = False
+    # Where to print a markdown file's formatted text as it is produced,
+    # instead of returning it whole in FileResult.output.
+    output: TextIO | None = None
+
+
+@dataclass
+class FileResult:
+    path: Path
+    bytes_in: int = 0
+    bytes_out: int = 0
+    changed: bool = False
+    cached: bool = False
+    output: str | None = None
+    error: str | None = None
+    digest: str | None = None
+    stats: _stats.Stats | None = None
+    seconds: float = 0.0
+
+
+@dataclass
+class Summary:
+    files: int = 0
+    changed: int = 0
+    cached: int = 0
+    errors: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    seconds: float = 0.0
+
+    def add(self, result: FileResult) -> None:
+        self.files += 1
+        self.bytes_in += result.bytes_in
+        self.bytes_out += result.bytes_out
+        if result.error is not None:
+            self.errors += 1
+        elif result.changed:
+            self.changed += 1
+        elif result.cached:
+            self.cached += 1
+
+    def finish(self) -> None:
+        self.seconds = time.perf_counter() - self.started
+
+    def as_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "changed": self.changed,
+            "cached": self.cached,
+            "errors": self.errors,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "seconds": round(self.seconds, 6),
+        }
+
+    def __str__(self) -> str:
+        files = "file" if self.files == 1 else "files"
+        text = (
+            f"formdt: {self.files} {files} ({self.changed} changed, "
+            f"{self.cached} cached), "
+            f"{self.bytes_in:,} bytes in {self.seconds:.2f}s"
+        )
+        if self.errors:
+            text += f", {self.errors} failed"
+        return text
+
+
+def _decode(data: bytes) -> str:
+    text = data.decode()
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+class _HashingReader:
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.size = 0
+        self.carriage_return = False
+
+    def __iter__(self) -> Iterator[str]:
+        for raw in self.f:
+            self.hash.update(raw)
+            self.size += len(raw)
+            line = raw.decode()
+            if line.endswith("\r\n"):
+                line = line[:-2] + "\n"
+            yield line
+
+    def lines(self) -> Iterator[str]:
+        # The lines without their endings, as str.split("\n") gives them,
+        # decoded a chunk at a time.
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        tail = ""
+        while chunk := self.f.read(CHUNK_SIZE):
+            self.hash.update(chunk)
+            self.size += len(chunk)
+            text = tail + decoder.decode(chunk)
+            if "\r" in text:
+                self.carriage_return = True
+            lines = text.split("\n")
+            tail = lines.pop()
+            yield from lines
+        yield tail + decoder.decode(b"", final=True)
+
+
+def rewrite_markdown(path: Path, config: Config) -> tuple[int, int, str, str]:
+    # Streams the formatted file into a temporary file, which only replaces
+    # the original when the contents differ.
+    out_hash = hashlib.blake2b(digest_size=16)
+    size = 0
+    with open(path, "rb") as src, replacing(path) as dst:
+        reader = _HashingReader(src)
+        separator = b""
+        for line in format_markdown_stream(reader, config):
+            chunk = separator + line.encode()
+            dst.write(chunk)
+            out_hash.update(chunk)
+            size += len(chunk)
+            separator = b"\n"
+        before, after = reader.hash.hexdigest(), out_hash.hexdigest()
+        if before != after:
+            commit(dst, path)
+    return reader.size, size, before, after
+
+
+def print_markdown(
+    path: Path, config: Config, output: TextIO
+) -> tuple[int, int, str, str]:
+    # Like rewrite_markdown, but prints the formatted file, ending it with a
+    # newline as print() ends every other result.
+    out_hash = hashlib.blake2b(digest_size=16)
+    size = 0
+    with open(path, "rb") as src:
+        reader = _HashingReader(src)
+        separator = ""
+        for line in format_markdown_stream(reader, config):
+            chunk = separator + line
+            output.write(chunk)
+            encoded = chunk.encode()
+            out_hash.update(encoded)
+            size += len(encoded)
+            separator = "\n"
+    output.write("\n")
+    return reader.size, size, reader.hash.hexdigest(), out_hash.hexdigest()
+
+
+def format_file(
+    path: Path, config: Config, options: Options, data: bytes | None = None
+) -> FileResult:
+    # data, when given, is formatted in place of the file's current contents.
+    start = time.perf_counter()
+    if not options.profile:
+        result = _format_file(path, config, options, data)
+        result.seconds = time.perf_counter() - start
+        return result
+    with _stats.collect() as stats:
+        result = _format_file(path, config, options, data)
+    result.seconds = time.perf_counter() - start
+    stats.count("files")
+    stats.count("bytes_in", result.bytes_in)
+    stats.count("bytes_out", result.bytes_out)
+    result.stats = stats
+    return result
+
+
+def _format_file(
+    path: Path, config: Config, options: Options, data: bytes | None
+) -> FileResult:
+    result = FileResult(path)
+    if data is None and not path.exists():
+        result.error = f"File not found: {path}"
+        return result
+
+    try:
+        if data is None and path.suffix != ".ipynb" and options.write:
+            # Most files are already formatted; confirming that is cheaper
+            # than streaming them through a temporary file. Lines are read
+            # as they are verified, so memory stays bounded by the longest.
+            with open(path, "rb") as f, _stats.timer("verify"):
+                reader = _HashingReader(f)
+                verified = verify(reader.lines(), config) is True
+            if verified and not reader.carriage_return:
+                result.bytes_in = result.bytes_out = reader.size
+                result.digest = reader.hash.hexdigest()
+                return result
+            with _stats.timer("rewrite"):
+                result.bytes_in, result.bytes_out, before, after = rewrite_markdown(
+                    path, config
+                )
+            result.changed = before != after
+            result.digest = after
+            return result
+
+        if data is None and path.suffix != ".ipynb" and options.output is not None:
+            with _stats.timer("print"):
+                result.bytes_in, result.bytes_out, before, after = print_markdown(
+                    path, config, options.output
+                )
+            result.changed = before != after
+            if not result.changed:
+                result.digest = after
+            return result
+
+        if data is None:
+            with _stats.timer("read"):
+                data = path.read_bytes()
+        result.bytes_in = len(data)
+
+        if path.suffix == ".ipynb":
+            encoded = format_notebook_bytes(
+                data, config, cells=options.cells, all_markdown=options.all_markdown
+            )
+            output = _decode(encoded).removesuffix("\n")
+        elif options.check and not options.diff:
+            with _stats.timer("verify"):
+                result.changed = b"\r" in data or not is_formatted(
+                    _decode(data), config
+                )
+            if not result.changed:
+                result.bytes_out = len(data)
+                result.digest = digest(data)
+            return result
+        elif _verified(data, config):
+            output = _decode(data)
+            encoded = data
+        else:
+            output = format_markdown(_decode(data), config)
+            encoded = output.encode()
+
+        result.changed = encoded != data
+        if options.write and result.changed:
+            with _stats.timer("write"):
+                atomic_write(path, encoded)
+    except (OSError, ValueError) as e:
+        result.error = f"{path}: {e}"
+        return result
+
+    result.bytes_out = len(encoded)
+    if options.write or not result.changed:
+        result.digest = digest(encoded)
+    if options.diff:
+        if result.changed:
+            old = _decode(data).split("\n")
+            result.output = unified_diff(old, _decode(encoded).split("\n"), str(path))
+    elif not options.write and not options.check:
+        result.output = output
+    return result
+
+
+def _verified(data: bytes, config: Config) -> bool:
+    if b"\r" in data:
+        return False
+    with _stats.timer("verify"):
+        return verify(data.decode().split("\n"), config) is True
+
+
+def _cached_result(path: Path, options: Options) -> FileResult:
+    result = FileResult(path, cached=True)
+    try:
+        if options.write or options.check or options.diff:
+            result.bytes_in = result.bytes_out = path.stat().st_size
+        elif options.output is not None and path.suffix != ".ipynb":
+            result.bytes_in = result.bytes_out = path.stat().st_size
+            with open(path, encoding="utf-8") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    options.output.write(chunk)
+            options.output.write("\n")
+        else:
+            data = path.read_bytes()
+            result.bytes_in = result.bytes_out = len(data)
+            result.output = _decode(data)
+            if path.suffix == ".ipynb":
+                result.output = result.output.removesuffix("\n")
+    except (OSError, ValueError) as e:
+        result.error = f"{path}: {e}"
+    return result
+
+
+def _format_batch(
+    batch: list[tuple[Path, Config]], options: Options
+) -> list[FileResult]:
+    return [format_file(path, config, options) for path, config in batch]
+
+
+def _batches(items: list, jobs: int) -> Iterator[list]:
+    size = -(-len(items) // (jobs * BATCHES_PER_WORKER))
+    size = max(1, min(MAX_BATCH_SIZE, size))
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def default_jobs() -> int:
+    return os.process_cpu_count() or 1
+
+
+def _run(
+    files: list[tuple[Path, Config]], options: Options, jobs: int | None
+) -> Iterator[FileResult]:
+    if not files:
+        return
+    if jobs is None:
+        jobs = default_jobs()
+    jobs = max(1, min(jobs, len(files)))
+
+    if jobs == 1:
+        for path, config in files:
+            yield format_file(path, config, options)
+        return
+
+    # Imported here: multiprocessing is slow to import, and runs over a single
+    # file or a fully cached tree never start a pool.
+    from concurrent.futures import ProcessPoolExecutor
+
+    batches = list(_batches(files, jobs))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(_format_batch, batches, [options] * len(batches))
+        yield from chain.from_iterable(results)
+
+
+def run(
+    paths: list[Path],
+    config: Config | ConfigResolver,
+    options: Options,
+    jobs: int | None = None,
+    cache: Cache | None = None,
+) -> Iterator[FileResult]:
+    # A ConfigResolver gives each file the configuration of its directory.
+    files: list[tuple[Path, Config | None]] = []
+    errors = {}
+    for path in paths:
+        if not isinstance(config, ConfigResolver):
+            files.append((path, config))
+            continue
+        try:
+            files.append((path, config.for_path(path)))
+        except (OSError, ValueError, TypeError) as e:
+            errors[path] = f"{path}: invalid configuration: {e}"
+            files.append((path, None))
+
+    cached = [
+        cache is not None
+        and file_config is not None
+        and cache.is_formatted(path, file_config)
+        for path, file_config in files
+    ]
+    todo = [
+        file
+        for file, is_cached in zip(files, cached)
+        if not is_cached and file[1] is not None
+    ]
+    results = _run(todo, options, jobs)
+    for (path, file_config), is_cached in zip(files, cached):
+        if file_config is None:
+            yield FileResult(path, error=errors[path])
+        elif is_cached:
+            yield _cached_result(path, options)
+        else:
+            result = next(results)
+            if cache is not None and result.digest is not None:
+                cache.mark(result.path, result.digest, file_config)
+            yield result
+    if cache is not None:
+        cache.write()
@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import signal
+import socketserver
+import stat
+import sys
+from dataclasses import asdict, fields
+from functools import lru_cache
+from pathlib import Path
+
+from .config import Config, ConfigResolver, load_config
+from .daemon import get_socket_path, request
+from .formatter import format_markdown
+from .memo import MEMO_BYTES, ParagraphMemo
+
+RESULT_CACHE_SIZE = 1024
+
+
+def _config_from(overrides: dict, base: Config) -> Config:
+    known = {field.name for field in fields(Config)}
+    values = asdict(base)
+    values.update((k, v) for k, v in overrides.items() if k in known)
+    return Config(**values)
+
+
+@lru_cache(maxsize=RESULT_CACHE_SIZE)
+def _format_cached(
+    text: str, config_items: tuple, memo: ParagraphMemo | None = None
+) -> str:
+    return format_markdown(text, Config(**dict(config_items)), memo)
+
+
+def handle_request(
+    request: dict, base: Config, memo: ParagraphMemo | None = None
+) -> dict:
+    if request.get("ping"):
+        return {"pong": True}
+    if request.get("stats"):
+        return {"memo": None if memo is None else memo.as_dict()}
+    text = request.get("text")
+    if not isinstance(text, str):
+        return {"error": "request must contain a 'text' string"}
+    directory = request.get("directory")
+    if isinstance(directory, str):
+        # Configuration files are read per request rather than memoized,
+        # since they may change while the daemon runs.
+        base = ConfigResolver().for_directory(Path(directory))
+    config = _config_from(request.get("config") or {}, base)
+    items = tuple(sorted(asdict(config).items()))
+    return {"text": _format_cached(text, items, memo)}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                response = handle_request(
+                    json.loads(line), self.server.config, self.server.memo
+                )
+            except (OSError, ValueError, TypeError) as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, config: Config, memo: ParagraphMemo | None = None):
+        self.config = config
+        self.memo = memo
+        super().__init__(str(path), _Handler)
+
+    def server_bind(self) -> None:
+        super().server_bind()
+        os.chmod(self.server_address, 0o600)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def _is_running(path: Path) -> bool:
+    return request({"ping": True}, path) is not None
+
+
+def _check_directory(directory: Path) -> None:
+    # Whoever can write to the directory can replace the socket, so it must
+    # be this user's, or shared only the way the sticky /tmp is.
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = directory.stat()
+    shared = info.st_mode & 0o022 and not info.st_mode & stat.S_ISVTX
+    if info.st_uid not in (os.getuid(), 0) or shared:
+        raise RuntimeError(f"{directory} can be written by other users")
+
+
+def serve(path: Path, config: Config, memo: ParagraphMemo | None = None) -> Server:
+    _check_directory(path.parent)
+    if path.exists():
+        if _is_running(path):
+            raise RuntimeError(f"formdt daemon already running on {path}")
+        path.unlink()
+    return Server(path, config, memo)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="formdt daemon",
+        description="Serve formatting requests on a local Unix socket",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="Socket path (default: $FORMDT_SOCKET or a per-user runtime path)",
+    )
+    parser.add_argument(
+        "--memo-bytes",
+        type=int,
+        default=MEMO_BYTES,
+        help="Memory for remembering wrapped paragraphs across requests; 0 turns "
+        "it off (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--persist-memo",
+        action="store_true",
+        help="Load remembered paragraphs from the cache directory at start and "
+        "save them there on exit",
+    )
+    args = parser.parse_args(argv)
+    path = args.socket or get_socket_path()
+
+    memo = None
+    if args.persist_memo:
+        memo = ParagraphMemo.read(max_bytes=args.memo_bytes)
+    elif args.memo_bytes > 0:
+        memo = ParagraphMemo(args.memo_bytes)
+
+    try:
+        server = serve(path, load_config(), memo)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"formdt daemon listening on {path}", file=sys.stderr)
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if memo is not None:
+                memo.write()
+    return 0
@@ -0,0 +1,150 @@
+import argparse
+import hashlib
+import heapq
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+from .runner import Summary
+
+# Splits a file set between the nodes of a CI matrix without coordination.
+# Every node discovers the same files, so each computes the whole assignment
+# and keeps its own part. Files are dealt out largest first, each to the
+# shard with the least work so far, which keeps every shard within one file
+# of an even split; equal sizes are ordered by a hash of the path, so the
+# assignment does not depend on where the repository is checked out.
+
+# Work charged per file on top of its size, for opening and verifying it.
+FILE_COST = 4096
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    index, _, count = value.partition("/")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"shard {value} is not between 1/{count} and {count}")
+    return index, count
+
+
+def assign(paths: list[Path], count: int) -> list[list[Path]]:
+    order = []
+    for path in paths:
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = 0
+        key = hashlib.blake2b(path.as_posix().encode(), digest_size=8).digest()
+        order.append((-size - FILE_COST, key, path))
+    order.sort()
+
+    shards: list[list[Path]] = [[] for _ in range(count)]
+    loads = [(0, i) for i in range(count)]
+    for cost, _, path in order:
+        load, i = loads[0]
+        shards[i].append(path)
+        heapq.heapreplace(loads, (load - cost, i))
+    return shards
+
+
+def select(paths: list[Path], index: int, count: int) -> list[Path]:
+    # The paths of shard index (from 1), in the order they were given.
+    chosen = set(assign(paths, count)[index - 1])
+    return [path for path in paths if path in chosen]
+
+
+def build_report(
+    summary: Summary, records: list[dict], shard: tuple[int, int], check: bool
+) -> dict:
+    return {
+        "shard": list(shard),
+        "check": check,
+        "summary": summary.as_dict(),
+        "files": records,
+    }
+
+
+def merge(reports: list[dict]) -> tuple[dict, list[str]]:
+    # The combined report, and what keeps the reports from covering every
+    # shard exactly once.
+    problems = []
+    counts = sorted({report["shard"][1] for report in reports})
+    if len(counts) > 1:
+        problems.append(f"reports are from different shard counts: {counts}")
+    elif counts:
+        count = counts[0]
+        seen = Counter(report["shard"][0] for report in reports)
+        for index in range(1, count + 1):
+            if index not in seen:
+                problems.append(f"missing shard {index}/{count}")
+            elif seen[index] > 1:
+                problems.append(f"shard {index}/{count} reported {seen[index]} times")
+
+    summary = Summary()
+    records = []
+    for report in reports:
+        part = report["summary"]
+        summary.files += part["files"]
+        summary.changed += part["changed"]
+        summary.cached += part["cached"]
+        summary.errors += part["errors"]
+        summary.bytes_in += part["bytes_in"]
+        summary.bytes_out += part["bytes_out"]
+        # Shards run side by side, so the gate takes as long as the slowest.
+        summary.seconds = max(summary.seconds, part["seconds"])
+        records.extend(report["files"])
+    check = any(report["check"] for report in reports)
+    return build_report(summary, records, (1, 1), check), problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="formdt merge-reports",
+        description="Combine the --report json files of a sharded run into one "
+        "pass or fail result",
+    )
+    parser.add_argument("reports", type=Path, nargs="+", metavar="report")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        metavar="FILE",
+        help="Write the combined report to FILE",
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="Print only errors, not the files that would change or the summary",
+    )
+    args = parser.parse_args(argv)
+
+    reports = []
+    for path in args.reports:
+        try:
+            reports.append(json.loads(path.read_text()))
+        except (OSError, ValueError) as e:
+            print(f"Error: {path}: {e}", file=sys.stderr)
+            return 1
+    try:
+        merged, problems = merge(reports)
+    except (KeyError, IndexError, TypeError) as e:
+        print(f"Error: not a formdt --report json file: {e!r}", file=sys.stderr)
+        return 1
+
+    for problem in problems:
+        print(f"Error: {problem}", file=sys.stderr)
+    for record in merged["files"]:
+        if record["status"] == "error":
+            print(f"Error: {record['error']}", file=sys.stderr)
+        elif record["status"] == "changed" and merged["check"] and not args.quiet:
+            print(f"would reformat {record['path']}", file=sys.stderr)
+    if args.output is not None:
+        args.output.write_text(json.dumps(merged, indent=2) + "\n")
+
+    summary = merged["summary"]
+    if not args.quiet:
+        print(Summary(**summary), file=sys.stderr)
+    if problems or summary["errors"] or (merged["check"] and summary["changed"]):
+        return 1
+    return 0
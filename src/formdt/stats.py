@@ -0,0 +1,91 @@
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+# Instrumentation is off unless a collect() block is active, so the
+# formatter only pays for one ContextVar lookup per call.
+_current: ContextVar["Stats | None"] = ContextVar("formdt_stats", default=None)
+
+
+@dataclass
+class Stats:
+    counts: Counter[str] = field(default_factory=Counter)
+    seconds: Counter[str] = field(default_factory=Counter)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counts[name] += n
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+    def timed(self, name: str, items: Iterable) -> Iterator:
+        # Charges the time spent producing each item to name.
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter()
+            item = next(iterator, _DONE)
+            self.seconds[name] += time.perf_counter() - start
+            if item is _DONE:
+                return
+            yield item
+
+    def counted(self, name: str, items: Iterable) -> Iterator:
+        for item in items:
+            self.counts[name] += 1
+            yield item
+
+    def merge(self, other: "Stats") -> None:
+        self.counts.update(other.counts)
+        self.seconds.update(other.seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "seconds": dict(sorted(self.seconds.items())),
+            "counts": dict(sorted(self.counts.items())),
+        }
+
+    def __str__(self) -> str:
+        width = max(map(len, [*self.seconds, *self.counts, "counter"]))
+        rows = [f"{'stage':<{width}} {'seconds':>12}"]
+        rows.extend(
+            f"{name:<{width}} {value:>12.4f}"
+            for name, value in sorted(self.seconds.items())
+        )
+        rows.append("")
+        rows.append(f"{'counter':<{width}} {'count':>12}")
+        rows.extend(
+            f"{name:<{width}} {value:>12,}"
+            for name, value in sorted(self.counts.items())
+        )
+        return "\n".join(rows)
+
+
+_DONE = object()
+
+
+def current() -> Stats | None:
+    return _current.get()
+
+
+@contextmanager
+def collect(stats: Stats | None = None) -> Iterator[Stats]:
+    stats = Stats() if stats is None else stats
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def timer(name: str) -> AbstractContextManager:
+    # For coarse stages such as file I/O; hot loops check current() once.
+    stats = _current.get()
+    return nullcontext() if stats is None else stats.timer(name)
@@ -0,0 +1,167 @@
+from collections.abc import Iterable
+from itertools import zip_longest
+
+from .config import Config
+from .formatter import _tokenize, format_markdown_stream
+from .lexer import (
+    CALLOUT_PATTERN,
+    LIST_PATTERN,
+    PARAGRAPH_BREAKS,
+    VERBATIM,
+    Kind,
+    classify,
+)
+from .width import display_width
+
+# Decides whether text is a fixed point of greedy wrapping without
+# formatting it. Lines are walked in the lexer's block structure and each
+# paragraph is held to what greedy wrapping guarantees: prefixes are exactly
+# the ones the formatter writes, tokens are joined by single spaces, a line
+# with more than one token fits, and no line could take the first token of
+# the next. Only lines containing links or inline math are tokenized.
+
+
+def is_formatted(text: str, config: Config | None = None) -> bool:
+    if config is None:
+        config = Config()
+    lines = text.split("\n")
+    verified = verify(lines, config)
+    if verified is None:
+        # Fence and math blocks come out of the stream as several lines.
+        formatted = (
+            line
+            for piece in format_markdown_stream(lines, config)
+            for line in piece.split("\n")
+        )
+        return all(a == b for a, b in zip_longest(lines, formatted))
+    return verified
+
+
+def verify(lines: Iterable[str], config: Config) -> bool | None:
+    # None when only the formatter can tell: optimal wrapping, or a link or
+    # math span that may continue onto the next line.
+    if config.wrap_mode != "greedy":
+        return None
+    # Widths add up over tokens and spaces, so a line can be measured whole.
+    measure = display_width if config.display_width else len
+
+    lines = iter(lines)
+    line = next(lines, None)
+    kind = None if line is None else classify(line)
+
+    while line is not None:
+        if kind is Kind.FENCE:
+            for line in lines:
+                if line.startswith("```"):
+                    break
+        elif kind is Kind.MATH:
+            for line in lines:
+                if line.lstrip().startswith("$$"):
+                    break
+        elif kind in VERBATIM:
+            pass
+        elif kind is Kind.LIST:
+            # A list item is a block of its own, so it must fit on one line.
+            prefix = LIST_PATTERN.match(line).group(0)
+            body = line[len(prefix) :]
+            if len(body) <= config.max_block_length:
+                first = _first_token(body, config.max_token_length)
+                if first is None:
+                    return False
+                if first < len(body) and (
+                    measure(body) > config.line_length - len(prefix)
+                ):
+                    return False
+        else:
+            # Sizes follow the lexer, which passes a paragraph longer than
+            # max_block_length through as it is, so a paragraph that breaks
+            # a rule is read on until it either ends or proves that long.
+            prefix = ""
+            size = len(line)
+            if kind is Kind.CALLOUT:
+                match = CALLOUT_PATTERN.match(line)
+                prefix = match.group(1) + " "
+                size -= match.end()
+            width = config.line_length - len(prefix)
+            content = line[len(prefix) :]
+            first = None
+            if line.startswith(prefix) and size <= config.max_block_length:
+                first = _first_token(content, config.max_token_length)
+            failed = first is None
+
+            line = None
+            for next_line in lines if size <= config.max_block_length else ():
+                next_kind = classify(next_line)
+                if next_kind in PARAGRAPH_BREAKS:
+                    line, kind = next_line, next_kind
+                    break
+                size += 1 + len(next_line)
+                if prefix and next_line.startswith(">"):
+                    size -= CALLOUT_PATTERN.match(next_line).end()
+                if size > config.max_block_length:
+                    break
+                if failed:
+                    continue
+                if not next_line.startswith(prefix):
+                    failed = True
+                    continue
+                if ("[" in content or "$" in content) and _is_open(content):
+                    return None
+                next_content = next_line[len(prefix) :]
+                next_first = _first_token(next_content, config.max_token_length)
+                failed = (
+                    next_first is None
+                    or not content
+                    or not next_content
+                    or (first < len(content) and measure(content) > width)
+                    or measure(content) + 1 + measure(next_content[:next_first])
+                    <= width
+                )
+                content, first = next_content, next_first
+
+            if size > config.max_block_length:
+                for line in lines:
+                    kind = classify(line)
+                    if kind in PARAGRAPH_BREAKS:
+                        break
+                else:
+                    line = None
+                continue
+            if failed or (first < len(content) and measure(content) > width):
+                return False
+            continue
+
+        line = next(lines, None)
+        kind = None if line is None else classify(line)
+
+    return True
+
+
+def _first_token(content: str, max_token_length: int) -> int | None:
+    # Length of the first token, or None unless content is its tokens joined
+    # by single spaces. A single token has the length of the whole content.
+    if "[" in content or ("$" in content and "$$" in content):
+        tokens = _tokenize(content, max_token_length)
+        if " ".join(tokens) != content:
+            return None
+        return len(tokens[0]) if tokens else 0
+    if content.isprintable():
+        # The space is the only printable whitespace character.
+        if content.startswith(" ") or content.endswith(" ") or "  " in content:
+            return None
+    elif " ".join(content.split()) != content:
+        return None
+    first = content.find(" ")
+    return len(content) if first < 0 else first
+
+
+def _is_open(content: str) -> bool:
+    # Whether a link or inline math span could run into the next line, in
+    # which case the joined paragraph tokenizes differently from its lines.
+    if content.rfind("[") > content.rfind("]"):
+        return True
+    target = content.rfind("](")
+    if target >= 0 and content.rfind(")") < target:
+        return True
+    math = content.rfind("$$")
+    return math >= 0 and content.find("$", math + 2) < 0
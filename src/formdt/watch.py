@@ -0,0 +1,233 @@
+import ctypes
+import os
+import select
+import struct
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from .cache import digest
+from .config import ConfigResolver
+from .discovery import is_excluded, iter_directories, iter_files
+from .fileio import atomic_write
+from .ranges import SegmentCache
+from .runner import FileResult, Options, format_file
+from .verify import verify
+
+DEBOUNCE = 0.1
+POLL_INTERVAL = 0.5
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then len bytes of name
+
+
+class InotifyWatcher:
+    # Linux inotify through ctypes. Every searched directory gets a watch;
+    # files named directly are watched through their parent directory.
+    def __init__(self, paths: list[Path]):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = paths
+        self.directories: dict[int, Path] = {}
+        self.searched: set[int] = set()
+        self.files = {path for path in paths if not path.is_dir()}
+        try:
+            for path in self.files:
+                self._watch(path.parent, searched=False)
+            for directory in iter_directories(paths):
+                self._watch(directory)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch(self, directory: Path, searched: bool = True) -> None:
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+        self.directories[wd] = directory
+        if searched:
+            self.searched.add(wd)
+
+    def changes(self, timeout: float | None) -> set[Path]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        changed: set[Path] = set()
+        while ready:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            self._parse(data, changed)
+        return changed
+
+    def _parse(self, data: bytes, changed: set[Path]) -> None:
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, so anything may have changed.
+                changed.update(iter_files(self.paths))
+                continue
+            directory = self.directories.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.directories[wd]
+                self.searched.discard(wd)
+                continue
+
+            path = directory / name
+            searched = wd in self.searched
+            if mask & IN_ISDIR:
+                if searched and not is_excluded(path, is_dir=True):
+                    for subdirectory in iter_directories([path]):
+                        try:
+                            self._watch(subdirectory)
+                        except OSError:
+                            pass  # removed again already
+                    changed.update(iter_files([path]))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                if path in self.files or (searched and not is_excluded(path)):
+                    changed.add(path)
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    # Compares the mtime and size of every file between scans, for systems
+    # without inotify or filesystems that do not report changes.
+    def __init__(self, paths: list[Path], interval: float = POLL_INTERVAL):
+        self.paths = paths
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for path in iter_files(self.paths):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def changes(self, timeout: float | None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval
+            if deadline is not None:
+                wait = max(0.0, min(wait, deadline - time.monotonic()))
+            time.sleep(wait)
+            snapshot = self._scan()
+            changed = {
+                path
+                for path, signature in snapshot.items()
+                if self.snapshot.get(path) != signature
+            }
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(paths: list[Path]) -> InotifyWatcher | PollingWatcher:
+    try:
+        return InotifyWatcher(paths)
+    except (AttributeError, OSError):
+        return PollingWatcher(paths)
+
+
+def debounced(watcher: InotifyWatcher | PollingWatcher, delay: float) -> set[Path]:
+    # Waits for a change, then until none arrive for delay seconds, so a
+    # burst of saves is formatted once.
+    changed: set[Path] = set()
+    while not changed:
+        changed = watcher.changes(None)
+    while more := watcher.changes(delay):
+        changed |= more
+    return changed
+
+
+class Session:
+    # State kept between edits: the digest of each file as last formatted,
+    # so our own writes and repeated saves are skipped without formatting,
+    # the per-directory configs, and the formatted segments of each file,
+    # so an edit only reformats the paragraphs that changed.
+    def __init__(self, resolver: ConfigResolver, options: Options):
+        self.resolver = resolver
+        self.options = options
+        self.known: dict[Path, str] = {}
+        self.segments = SegmentCache()
+
+    def update(self, path: Path) -> FileResult | None:
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            self.known.pop(path, None)
+            return None
+        except OSError as e:
+            return FileResult(path, error=f"{path}: {e}")
+        if self.known.get(path) == digest(data):
+            return None
+
+        result = self._format(path, data)
+        if result.digest is not None:
+            self.known[path] = result.digest
+        return result
+
+    def _format(self, path: Path, data: bytes) -> FileResult:
+        try:
+            config = self.resolver.for_path(path)
+        except (OSError, ValueError, TypeError) as e:
+            return FileResult(path, error=f"{path}: invalid configuration: {e}")
+        if path.suffix == ".ipynb" or b"\r" in data:
+            return format_file(path, config, self.options, data)
+
+        result = FileResult(path, bytes_in=len(data))
+        try:
+            text = data.decode()
+            encoded = data
+            if verify(text.split("\n"), config) is not True:
+                encoded = self.segments.format(text, config).encode()
+            result.changed = encoded != data
+            if result.changed:
+                atomic_write(path, encoded)
+        except (OSError, ValueError) as e:
+            result.error = f"{path}: {e}"
+            return result
+        result.bytes_out = len(encoded)
+        result.digest = digest(encoded)
+        return result
+
+
+def watch(
+    paths: list[Path],
+    session: Session,
+    report: Callable[[FileResult], None],
+    debounce: float = DEBOUNCE,
+) -> None:
+    # Runs until interrupted, formatting each file as it is saved.
+    watcher = open_watcher(paths)
+    try:
+        while True:
+            for path in sorted(debounced(watcher, debounce)):
+                result = session.update(path)
+                if result is not None:
+                    report(result)
+    finally:
+        watcher.close()
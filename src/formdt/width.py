@@ -0,0 +1,107 @@
+from array import array
+from bisect import bisect_right
+
+from . import width_table
+
+# Display width of a character: 2 for East Asian Wide and Fullwidth
+# characters, which include most emoji, 0 for combining marks, format
+# characters and Hangul medial and final jamo, and 1 for everything else.
+# The widths come from a table of ranges generated from unicodedata, since
+# asking unicodedata per character would slow down wrapping.
+
+STARTS = array("I", (int(start, 16) for start in width_table.STARTS.split()))
+WIDTHS = bytes(map(int, width_table.WIDTHS))
+CACHE_CHARS = 65536
+CACHE_WORDS = 32768
+CACHED_WORD_LENGTH = 32
+
+
+class _Columns(dict):
+    # str.translate table from a code point to the character repeated once
+    # per column. Each distinct character is looked up once; the number
+    # remembered is bounded so that text using every code point cannot grow
+    # it further.
+    def __missing__(self, code_point: int) -> str:
+        columns = chr(code_point) * WIDTHS[bisect_right(STARTS, code_point) - 1]
+        if len(self) < CACHE_CHARS:
+            self[code_point] = columns
+        return columns
+
+
+class _WordWidths(dict):
+    # Words recur, so the widths of short ones are remembered and a
+    # paragraph's widths come from dict lookups made in C.
+    def __missing__(self, word: str) -> int:
+        width = display_width(word)
+        if len(word) <= CACHED_WORD_LENGTH and len(self) < CACHE_WORDS:
+            self[word] = width
+        return width
+
+
+_columns = _Columns()
+_word_widths = _WordWidths()
+
+
+def columns(text: str) -> str:
+    # text with every character repeated as many times as the columns it
+    # takes, so that lengths and offsets in it are display widths.
+    if text.isascii():
+        return text
+    return text.translate(_columns)
+
+
+def display_width(text: str) -> int:
+    return len(columns(text))
+
+
+def token_widths(tokens: list[str]) -> list[int]:
+    return list(map(_word_widths.__getitem__, tokens))
+
+
+def _width(code_point: int) -> int:
+    import unicodedata
+
+    char = chr(code_point)
+    if unicodedata.east_asian_width(char) in ("W", "F"):
+        return 2
+    if code_point == 0xAD:  # soft hyphen, shown where the line breaks
+        return 1
+    if unicodedata.category(char) in ("Mn", "Me", "Cf") or (
+        0x1160 <= code_point <= 0x11FF
+    ):
+        return 0
+    return 1
+
+
+def generate() -> str:
+    import unicodedata
+
+    starts = []
+    widths = []
+    for code_point in range(0x110000):
+        width = _width(code_point)
+        if not widths or width != widths[-1]:
+            starts.append(code_point)
+            widths.append(width)
+
+    lines = [
+        f"# Generated by python -m formdt.width from Unicode "
+        f"{unicodedata.unidata_version}; do not edit.",
+        f'UNICODE_VERSION = "{unicodedata.unidata_version}"',
+        "# Code points from STARTS[i] up to STARTS[i + 1], in hex, have the",
+        "# width in digit i of WIDTHS.",
+        "STARTS = (",
+    ]
+    for i in range(0, len(starts), 12):
+        chunk = " ".join(f"{start:X}" for start in starts[i : i + 12])
+        lines.append(f'    "{chunk} "')
+    lines.append(")")
+    lines.append("WIDTHS = (")
+    for i in range(0, len(widths), 64):
+        lines.append(f'    "{"".join(map(str, widths[i : i + 64]))}"')
+    lines.append(")")
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    print(generate(), end="")
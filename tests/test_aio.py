@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from formdt import Config, format_markdown
+from formdt.aio import (
+    AsyncFormatter,
+    _chunks,
+    format_many_async,
+    format_markdown_async,
+)
+
+TEXT = "\n\n".join(
+    [
+        "One\ntwo three",
+        "```\nkept\n\n  as is\n```",
+        "> quoted\n> text",
+        "- item",
+        "Last\nparagraph",
+    ]
+    * 20
+)
+
+
+class TestChunks:
+    def test_chunks_format_like_the_whole_text(self):
+        config = Config(line_length=20)
+        chunks = _chunks(TEXT, 50)
+
+        assert len(chunks) > 1
+        formatted = "\n".join(format_markdown(chunk, config) for chunk in chunks)
+        assert formatted == format_markdown(TEXT, config)
+
+
+class TestAsyncFormatter:
+    def test_matches_sync_formatter(self):
+        async def main():
+            async with AsyncFormatter(chunk_size=100) as formatter:
+                return await formatter.format(TEXT)
+
+        assert asyncio.run(main()) == format_markdown(TEXT)
+
+    def test_module_functions(self, monkeypatch):
+        executor = ThreadPoolExecutor(1)
+        monkeypatch.setattr("formdt.aio._executor", executor)
+
+        async def main():
+            one = await format_markdown_async("a\nb", Config(line_length=1))
+            many = await format_many_async(["a\nb", "c"])
+            return one, many
+
+        assert asyncio.run(main()) == ("a\nb", ["a b", "c"])
+        executor.shutdown()
+
+    def test_format_many_keeps_order(self):
+        texts = [f"item {i}\nnext" for i in range(50)]
+
+        async def main():
+            async with AsyncFormatter(max_pending=3, max_queued=1) as formatter:
+                return await formatter.format_many(texts)
+
+        assert asyncio.run(main()) == [f"item {i} next" for i in range(50)]
+
+    def test_timeout_frees_slot_when_work_finishes(self):
+        release = threading.Event()
+        executor = ThreadPoolExecutor(1)
+        executor.submit(release.wait)
+
+        async def main():
+            formatter = AsyncFormatter(executor=executor, max_pending=1)
+            with pytest.raises(TimeoutError):
+                await formatter.format("text", timeout=0.05)
+            assert formatter.slots.locked()
+            release.set()
+            return await formatter.format("a\nb", timeout=5)
+
+        assert asyncio.run(main()) == "a b"
+        executor.shutdown()
+
+    def test_rejects_requests_beyond_queue_depth(self):
+        release = threading.Event()
+        executor = ThreadPoolExecutor(1)
+        executor.submit(release.wait)
+
+        async def main():
+            formatter = AsyncFormatter(executor=executor, max_pending=1, max_queued=1)
+            running = asyncio.create_task(formatter.format("a"))
+            queued = asyncio.create_task(formatter.format("b"))
+            await asyncio.sleep(0.01)
+            with pytest.raises(asyncio.QueueFull):
+                await formatter.format("c")
+            release.set()
+            return await asyncio.gather(running, queued)
+
+        assert asyncio.run(main()) == ["a", "b"]
+        executor.shutdown()
@@ -0,0 +1,42 @@
+from formdt import Config, format_many, format_markdown
+from formdt.batch import CHUNK_ITEMS, _chunks
+
+TEXTS = [
+    f"Item {i}\nwith a line that is long enough to wrap somewhere" for i in range(50)
+]
+
+
+class TestChunks:
+    def test_groups_by_count_and_size(self):
+        chunks = list(_chunks(["x"] * (CHUNK_ITEMS + 1)))
+        assert [len(chunk) for chunk in chunks] == [CHUNK_ITEMS, 1]
+
+        chunks = list(_chunks(["x" * 200_000, "y" * 100_000, "z"]))
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+
+
+class TestFormatMany:
+    def test_matches_format_markdown_in_order(self):
+        config = Config(line_length=30)
+        expected = [format_markdown(text, config) for text in TEXTS]
+
+        assert list(format_many(TEXTS, config)) == expected
+
+    def test_consumes_input_lazily(self):
+        consumed = []
+
+        def texts():
+            for text in TEXTS:
+                consumed.append(text)
+                yield text
+
+        results = format_many(texts())
+        next(results)
+
+        assert len(consumed) == 1
+
+    def test_fans_out_to_processes(self):
+        config = Config(line_length=30)
+        expected = [format_markdown(text, config) for text in TEXTS]
+
+        assert list(format_many(TEXTS, config, workers=2)) == expected
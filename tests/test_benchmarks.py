@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.bench import compare, main, measure
+from benchmarks.corpus import CORPORA, generate
+from benchmarks.latency import measure as measure_latency
+from benchmarks.scaling import ADVERSARIAL, RUNS, growth
+from benchmarks.shard import imbalance, slowest, write_tree
+from formdt.shard import assign
+
+
+def report(**metrics) -> dict:
+    result = {"mb_per_s": 10.0, "lines_per_s": 1000.0, "peak_rss_mb": 50.0}
+    result.update(metrics)
+    return {"results": {"prose": result}}
+
+
+class TestCorpus:
+    def test_generators_are_seeded(self):
+        for name in CORPORA:
+            assert generate(name, 0.01) == generate(name, 0.01)
+            assert generate(name, 0.01, seed=1) != generate(name, 0.01)
+
+    def test_notebook_is_valid_json(self):
+        notebook = json.loads(generate("notebook", 0.1))
+
+        assert {cell["cell_type"] for cell in notebook["cells"]} == {"markdown", "code"}
+
+
+class TestMeasure:
+    def test_reports_throughput_and_memory(self):
+        result = measure("prose", 0.01, repeat=1)
+
+        assert result["bytes"] > 0
+        assert result["mb_per_s"] > 0
+        assert result["lines_per_s"] > 0
+        assert result["peak_rss_mb"] > 0
+
+
+class TestLatency:
+    def test_reports_percentiles(self):
+        result = asyncio.run(measure_latency(1024, huge=1, small=20, scale=0.01))
+
+        assert 0 < result["p50_ms"] <= result["p99_ms"] <= result["max_ms"]
+
+
+@pytest.mark.timing
+class TestScaling:
+    def test_adversarial_inputs_take_linear_time(self):
+        # A quadratic step would give an exponent near 2.
+        for name in ADVERSARIAL:
+            for run in RUNS:
+                assert growth(name, run, 10_000, factor=4, repeat=5) < 1.5, (name, run)
+
+
+class TestShard:
+    def test_shards_are_balanced(self, tmp_path):
+        paths = write_tree(tmp_path, 200)
+        shards = assign(paths, 4)
+
+        assert imbalance(shards) < 1.1
+        assert slowest(shards, repeat=1) > 0
+
+
+class TestCompare:
+    def test_within_threshold(self):
+        assert compare(report(), report(mb_per_s=9.5), 0.1) == []
+
+    def test_flags_slower_throughput(self):
+        regressions = compare(report(), report(lines_per_s=800.0), 0.1)
+
+        assert regressions == ["prose.lines_per_s: 1,000.00 -> 800.00 (-20.0%)"]
+
+    def test_flags_higher_memory(self):
+        regressions = compare(report(), report(peak_rss_mb=60.0), 0.1)
+
+        assert regressions == ["prose.peak_rss_mb: 50.00 -> 60.00 (-20.0%)"]
+
+    def test_compare_command_exit_status(self, tmp_path, capsys):
+        baseline = tmp_path / "baseline.json"
+        current = tmp_path / "current.json"
+        baseline.write_text(json.dumps(report()))
+        current.write_text(json.dumps(report(mb_per_s=5.0)))
+
+        assert main(["compare", str(baseline), str(baseline)]) == 0
+        assert main(["compare", str(baseline), str(current), "--threshold", "0.6"]) == 0
+        assert main(["compare", str(baseline), str(current)]) == 1
+        assert "Regression: prose.mb_per_s" in capsys.readouterr().out
@@ -0,0 +1,98 @@
+import os
+
+from formdt.cache import Cache, MAX_ENTRIES, digest, fingerprint
+from formdt.config import Config
+
+
+CONFIG = Config()
+
+
+class TestFingerprint:
+    def test_depends_on_options(self):
+        assert fingerprint([0], False) == fingerprint([0], False)
+        assert fingerprint([0], False) != fingerprint([1], False)
+
+    def test_config_fingerprint_is_stable(self):
+        assert Config().fingerprint == Config().fingerprint
+        assert Config().fingerprint != Config(line_length=100).fingerprint
+
+
+class TestCache:
+    def test_marked_file_is_formatted_after_reload(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("text")
+        cache = Cache.read("k", tmp_path)
+        cache.mark(path, digest(b"text"), CONFIG)
+        cache.write()
+
+        assert Cache.read("k", tmp_path).is_formatted(path, CONFIG)
+        assert not Cache.read("other", tmp_path).is_formatted(path, CONFIG)
+
+    def test_other_config_invalidates_entry(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("text")
+        cache = Cache.read("k", tmp_path)
+        cache.mark(path, digest(b"text"), CONFIG)
+        cache.write()
+
+        assert not Cache.read("k", tmp_path).is_formatted(path, Config(line_length=9))
+
+    def test_size_change_invalidates_entry(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("text")
+        cache = Cache.read("k", tmp_path)
+        cache.mark(path, digest(b"text"), CONFIG)
+        cache.write()
+
+        path.write_text("longer text")
+
+        assert not Cache.read("k", tmp_path).is_formatted(path, CONFIG)
+
+    def test_touched_file_with_same_content_is_formatted(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("text")
+        cache = Cache.read("k", tmp_path)
+        cache.mark(path, digest(b"text"), CONFIG)
+        cache.write()
+
+        os.utime(path, (1, 1))
+        assert Cache.read("k", tmp_path).is_formatted(path, CONFIG)
+
+        path.write_text("TEXT")
+        os.utime(path, (2, 2))
+        assert not Cache.read("k", tmp_path).is_formatted(path, CONFIG)
+
+    def test_concurrent_writers_are_merged(self, tmp_path):
+        a, b = tmp_path / "a.md", tmp_path / "b.md"
+        a.write_text("a")
+        b.write_text("b")
+        first = Cache.read("k", tmp_path)
+        second = Cache.read("k", tmp_path)
+
+        first.mark(a, digest(b"a"), CONFIG)
+        first.write()
+        second.mark(b, digest(b"b"), CONFIG)
+        second.write()
+
+        cache = Cache.read("k", tmp_path)
+        assert cache.is_formatted(a, CONFIG)
+        assert cache.is_formatted(b, CONFIG)
+
+    def test_evicts_oldest_entries(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("formdt.cache.MAX_ENTRIES", 2)
+        cache = Cache.read("k", tmp_path)
+        for name in "abc":
+            path = tmp_path / f"{name}.md"
+            path.write_text(name)
+            cache.mark(path, digest(name.encode()), CONFIG)
+        cache.write()
+
+        cache = Cache.read("k", tmp_path)
+        assert len(cache.entries) == 2
+        assert not cache.is_formatted(tmp_path / "a.md", CONFIG)
+        assert MAX_ENTRIES > 2
+
+    def test_corrupt_cache_file_is_ignored(self, tmp_path):
+        (tmp_path / "cache.k.pickle").write_bytes(b"not a pickle")
+
+        assert Cache.read("k", tmp_path).entries == {}
@@ -0,0 +1,183 @@
+import io
+import json
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from formdt.cli import main
+from formdt.config import Config
+from formdt.server import serve
+
+
+@pytest.fixture(autouse=True)
+def no_daemon(tmp_path, monkeypatch):
+    # Keeps a daemon running on the machine out of these tests.
+    monkeypatch.setenv("FORMDT_SOCKET", str(tmp_path / "formdt.sock"))
+
+
+@pytest.fixture
+def running_daemon(tmp_path):
+    server = serve(tmp_path / "formdt.sock", Config())
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestCheck:
+    def test_exit_status(self, tmp_path, capsys):
+        clean = tmp_path / "clean.md"
+        clean.write_text("Clean.\n")
+        dirty = tmp_path / "dirty.md"
+        dirty.write_text("Dirty\nfile.\n")
+
+        assert main([str(clean), "--check", "--no-cache", "-q"]) == 0
+        assert main([str(tmp_path), "--check", "--no-cache", "-q"]) == 1
+        assert capsys.readouterr().out == ""
+        assert dirty.read_text() == "Dirty\nfile.\n"
+
+    def test_rejects_write(self, tmp_path, capsys):
+        with pytest.raises(SystemExit):
+            main([str(tmp_path), "--check", "--write"])
+
+    def test_not_answered_by_daemon(self, tmp_path, capsys, running_daemon):
+        path = tmp_path / "dirty.md"
+        path.write_text("Dirty\nfile.\n")
+
+        assert main([str(path), "--check", "--no-cache", "-q"]) == 1
+        assert capsys.readouterr().out == ""
+
+    def test_stdin(self, capsys, monkeypatch):
+        monkeypatch.setattr("sys.stdin", io.StringIO("Dirty\nfile.\n"))
+        assert main(["--check", "-"]) == 1
+
+        monkeypatch.setattr("sys.stdin", io.StringIO("Dirty\nfile.\n"))
+        assert main(["--diff", "-"]) == 0
+        assert "+Dirty file." in capsys.readouterr().out
+
+        monkeypatch.setattr("sys.stdin", io.StringIO("Clean.\n"))
+        assert main(["--check", "-"]) == 0
+        assert capsys.readouterr().out == ""
+
+    def test_rejects_report_on_stdin(self, capsys):
+        with pytest.raises(SystemExit):
+            main(["--report", "jsonl", "-"])
+
+
+class TestReport:
+    def test_jsonl_records(self, tmp_path, capsys):
+        (tmp_path / "a.md").write_text("One\ntwo\n")
+        (tmp_path / "b.md").write_text("Fine.\n")
+        report = tmp_path / "report.jsonl"
+
+        main(
+            [
+                str(tmp_path),
+                "--check",
+                "--no-cache",
+                "-q",
+                "--report",
+                "jsonl",
+                "--report-file",
+                str(report),
+            ]
+        )
+
+        records = [json.loads(line) for line in report.read_text().splitlines()]
+        assert [(r["path"], r["status"]) for r in records] == [
+            (str(tmp_path / "a.md"), "changed"),
+            (str(tmp_path / "b.md"), "unchanged"),
+        ]
+        assert records[0]["bytes_in"] == 8
+        assert records[0]["seconds"] >= 0
+
+    def test_report_replaces_stdout_output(self, tmp_path, capsys):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo\n")
+
+        main([str(path), "--no-cache", "-q", "--report", "jsonl"])
+
+        [line] = capsys.readouterr().out.splitlines()
+        assert json.loads(line)["status"] == "changed"
+
+
+class TestOutput:
+    def test_single_file_is_printed_as_it_is_formatted(
+        self, tmp_path, capsys, monkeypatch
+    ):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo\n")
+        monkeypatch.setattr("formdt.runner.format_markdown", None)
+
+        assert main([str(path), "--no-cache", "-q"]) == 0
+        assert capsys.readouterr().out == "One two\n\n"
+
+
+class TestWatch:
+    def test_formats_then_watches(self, tmp_path, capsys, monkeypatch):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo\n")
+        sessions = []
+
+        def watch(paths, session, report):
+            sessions.append(session)
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr("formdt.watch.watch", watch)
+
+        assert main([str(tmp_path), "--watch", "--no-cache", "-q"]) == 0
+        assert path.read_text() == "One two\n"
+        assert list(sessions[0].known) == [path]
+
+    def test_rejects_check(self, tmp_path, capsys):
+        with pytest.raises(SystemExit):
+            main([str(tmp_path), "--watch", "--check"])
+
+
+class TestDaemon:
+    def test_formats_file_with_its_directory_config(
+        self, tmp_path, capsys, monkeypatch, running_daemon
+    ):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / ".formdt").write_text(json.dumps({"line_length": 8}))
+        path = docs / "a.md"
+        path.write_text("one two three\n")
+        main([str(path), "--no-daemon", "--no-cache", "-q"])
+        expected = capsys.readouterr().out
+        monkeypatch.setattr("formdt.cli._format_paths", None)
+
+        assert main([str(path)]) == 0
+        assert capsys.readouterr().out == expected
+        assert expected.startswith("one two\nthree\n")
+
+    def test_formats_stdin(self, capsys, monkeypatch, running_daemon):
+        monkeypatch.setattr("sys.stdin", io.StringIO("one two\nthree\n"))
+        monkeypatch.setattr("formdt.cli._format_paths", None)
+
+        assert main(["-l", "8", "-"]) == 0
+        assert capsys.readouterr().out == "one two\nthree\n"
+
+    def test_falls_back_when_daemon_is_gone(self, tmp_path, capsys, monkeypatch):
+        (tmp_path / "formdt.sock").write_text("")
+        monkeypatch.setattr("sys.stdin", io.StringIO("one two\nthree\n"))
+
+        assert main(["-l", "8", "-"]) == 0
+        assert capsys.readouterr().out == "one two\nthree\n"
+
+    def test_client_does_not_import_formatter(self):
+        code = (
+            "import sys, formdt.cli, formdt.daemon; "
+            "print(sorted(m for m in sys.modules if m.startswith('formdt')))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+
+        assert output.strip() == "['formdt', 'formdt.cli', 'formdt.daemon']"
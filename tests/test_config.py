@@ -1,5 +1,7 @@
 import json
+import pytest
 from formdt import load_config, Config
+from formdt.config import ConfigResolver
 
 
 class TestConfig:
@@ -24,3 +26,76 @@ class TestConfig:
 
         config = load_config(config_file)
         assert config.line_length == 80
+
+    def test_load_config_reads_wrap_mode(self, tmp_path):
+        config_file = tmp_path / ".formdt"
+        config_file.write_text(json.dumps({"wrap_mode": "optimal"}))
+
+        config = load_config(config_file)
+        assert config.wrap_mode == "optimal"
+
+    def test_rejects_unknown_wrap_mode(self):
+        with pytest.raises(ValueError, match="wrap_mode"):
+            Config(wrap_mode="fastest")
+
+    def test_load_config_reads_pyproject_table(self, tmp_path):
+        pyproject = tmp_path / "pyproject.toml"
+        pyproject.write_text("[tool.formdt]\nline-length = 100\n")
+
+        assert load_config(pyproject).line_length == 100
+
+    def test_fingerprint_follows_values(self):
+        assert Config().fingerprint == Config().fingerprint
+        assert Config().fingerprint != Config(line_length=100).fingerprint
+
+
+class TestConfigResolver:
+    def test_nearest_config_wins(self, tmp_path):
+        (tmp_path / ".formdt").write_text(json.dumps({"line_length": 100}))
+        nested = tmp_path / "docs" / "api"
+        nested.mkdir(parents=True)
+        (tmp_path / "docs" / ".formdt").write_text(json.dumps({"line_length": 60}))
+
+        resolver = ConfigResolver()
+
+        assert resolver.for_path(tmp_path / "README.md").line_length == 100
+        assert resolver.for_path(nested / "index.md").line_length == 60
+
+    def test_reads_pyproject_when_no_formdt_file(self, tmp_path):
+        (tmp_path / "pyproject.toml").write_text(
+            '[project]\nname = "x"\n\n[tool.formdt]\nwrap-mode = "optimal"\n'
+        )
+
+        config = ConfigResolver().for_directory(tmp_path)
+
+        assert config.wrap_mode == "optimal"
+
+    def test_pyproject_without_table_is_skipped(self, tmp_path):
+        (tmp_path / ".formdt").write_text(json.dumps({"line_length": 100}))
+        nested = tmp_path / "package"
+        nested.mkdir()
+        (nested / "pyproject.toml").write_text('[project]\nname = "x"\n')
+
+        assert ConfigResolver().for_directory(nested).line_length == 100
+
+    def test_directories_are_read_once(self, tmp_path, monkeypatch):
+        (tmp_path / ".formdt").write_text(json.dumps({"line_length": 100}))
+        nested = tmp_path / "a" / "b"
+        nested.mkdir(parents=True)
+        resolver = ConfigResolver()
+        resolver.for_directory(nested)
+
+        def fail(*args):
+            raise AssertionError("read twice")
+
+        monkeypatch.setattr("formdt.config._read_directory", fail)
+
+        assert resolver.for_directory(tmp_path / "a").line_length == 100
+        assert resolver.for_path(nested / "c.md").line_length == 100
+
+    def test_overrides_apply_to_every_directory(self, tmp_path):
+        (tmp_path / ".formdt").write_text(json.dumps({"line_length": 100}))
+
+        resolver = ConfigResolver(line_length=40)
+
+        assert resolver.for_directory(tmp_path).line_length == 40
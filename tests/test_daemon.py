@@ -0,0 +1,129 @@
+import json
+import os
+import stat
+import threading
+
+import pytest
+
+from formdt.config import Config
+from formdt.daemon import format_via_daemon, get_socket_path, request
+from formdt.memo import ParagraphMemo
+from formdt.server import handle_request, serve
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    path = tmp_path / "formdt.sock"
+    server = serve(path, Config(line_length=20))
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestHandleRequest:
+    def test_formats_text_with_config_overrides(self):
+        response = handle_request(
+            {"text": "one two three", "config": {"line_length": 8}}, Config()
+        )
+
+        assert response == {"text": "one two\nthree"}
+
+    def test_ignores_unknown_config_keys(self):
+        response = handle_request({"text": "a\nb", "config": {"bogus": 1}}, Config())
+
+        assert response == {"text": "a b"}
+
+    def test_rejects_missing_text(self):
+        assert "error" in handle_request({}, Config())
+
+    def test_reads_config_of_directory(self, tmp_path):
+        (tmp_path / ".formdt").write_text(json.dumps({"line_length": 8}))
+        request = {"text": "one two three", "directory": str(tmp_path)}
+
+        assert handle_request(request, Config()) == {"text": "one two\nthree"}
+
+        request["config"] = {"line_length": 80}
+        assert handle_request(request, Config()) == {"text": "one two three"}
+
+    def test_reports_memo_stats(self):
+        memo = ParagraphMemo()
+        handle_request({"text": "one two\n\none two"}, Config(), memo)
+
+        stats = handle_request({"stats": True}, Config(), memo)["memo"]
+
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+class TestDaemon:
+    def test_client_round_trip(self, socket_path):
+        result = format_via_daemon(
+            "alpha beta gamma delta", {"line_length": 10}, socket_path
+        )
+
+        assert result == "alpha beta\ngamma\ndelta"
+
+    def test_concurrent_clients(self, socket_path):
+        results = [None] * 8
+
+        def work(i):
+            results[i] = format_via_daemon(f"item {i}\nline", path=socket_path)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [f"item {i} line" for i in range(8)]
+
+    def test_refuses_to_start_twice(self, socket_path):
+        with pytest.raises(RuntimeError):
+            serve(socket_path, Config())
+
+    def test_client_returns_none_without_daemon(self, tmp_path):
+        assert request({"ping": True}, tmp_path / "missing.sock") is None
+        assert format_via_daemon("text", path=tmp_path / "missing.sock") is None
+
+    def test_stale_socket_is_replaced(self, tmp_path):
+        path = tmp_path / "stale.sock"
+        path.write_text("")
+
+        server = serve(path, Config())
+        server.server_close()
+
+        assert not path.exists()
+
+
+class TestSocketPermissions:
+    def test_default_path_is_in_a_private_directory(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("FORMDT_SOCKET", raising=False)
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+        path = get_socket_path()
+
+        server = serve(path, Config())
+        server.server_close()
+
+        assert path.parent == tmp_path / f"formdt-{os.getuid()}"
+        assert stat.S_IMODE(path.parent.stat().st_mode) == 0o700
+
+    def test_socket_is_private(self, socket_path):
+        assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+
+    def test_client_refuses_shared_socket(self, socket_path):
+        socket_path.chmod(0o666)
+
+        assert format_via_daemon("text", path=socket_path) is None
+
+    def test_refuses_shared_directory(self, tmp_path):
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        shared.chmod(0o777)
+
+        with pytest.raises(RuntimeError):
+            serve(shared / "formdt.sock", Config())
@@ -0,0 +1,94 @@
+from pathlib import Path
+
+from formdt.discovery import is_excluded, iter_directories, iter_files
+
+
+def touch(path: Path, text: str = "") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+class TestIterFiles:
+    def test_finds_markdown_and_notebooks_recursively(self, tmp_path):
+        touch(tmp_path / "a.md")
+        touch(tmp_path / "docs" / "b.ipynb")
+        touch(tmp_path / "docs" / "c.txt")
+
+        found = list(iter_files([tmp_path]))
+
+        assert found == [tmp_path / "a.md", tmp_path / "docs" / "b.ipynb"]
+
+    def test_skips_vcs_and_node_modules(self, tmp_path):
+        touch(tmp_path / ".git" / "x.md")
+        touch(tmp_path / "node_modules" / "pkg" / "README.md")
+        touch(tmp_path / "keep.md")
+
+        assert list(iter_files([tmp_path])) == [tmp_path / "keep.md"]
+
+    def test_respects_gitignore(self, tmp_path):
+        touch(tmp_path / ".gitignore", "build/\n*.generated.md\n!keep.generated.md\n")
+        touch(tmp_path / "build" / "out.md")
+        touch(tmp_path / "a.generated.md")
+        touch(tmp_path / "keep.generated.md")
+        touch(tmp_path / "sub" / ".gitignore", "/local.md\n")
+        touch(tmp_path / "sub" / "local.md")
+        touch(tmp_path / "sub" / "other.md")
+
+        found = list(iter_files([tmp_path]))
+
+        assert found == [tmp_path / "keep.generated.md", tmp_path / "sub" / "other.md"]
+
+    def test_wildcards_stay_within_a_directory(self, tmp_path):
+        touch(tmp_path / ".gitignore", "docs/*.md\n**/drafts/*.md\n")
+        touch(tmp_path / "docs" / "a.md")
+        touch(tmp_path / "docs" / "sub" / "b.md")
+        touch(tmp_path / "x" / "drafts" / "c.md")
+        touch(tmp_path / "x" / "drafts" / "y" / "d.md")
+
+        found = list(iter_files([tmp_path]))
+
+        assert found == [
+            tmp_path / "docs" / "sub" / "b.md",
+            tmp_path / "x" / "drafts" / "y" / "d.md",
+        ]
+
+    def test_applies_gitignore_from_repository_root(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        touch(tmp_path / ".gitignore", "docs/drafts/\n")
+        touch(tmp_path / "docs" / "drafts" / "wip.md")
+        touch(tmp_path / "docs" / "guide.md")
+
+        found = list(iter_files([tmp_path / "docs"]))
+
+        assert found == [tmp_path / "docs" / "guide.md"]
+
+    def test_explicit_files_are_always_included_once(self, tmp_path):
+        touch(tmp_path / ".gitignore", "*.md\n")
+        path = touch(tmp_path / "ignored.md")
+
+        assert list(iter_files([path, path])) == [path]
+
+
+class TestIterDirectories:
+    def test_yields_searched_directories(self, tmp_path):
+        touch(tmp_path / ".gitignore", "build/\n")
+        touch(tmp_path / "docs" / "api" / "a.md")
+        touch(tmp_path / "build" / "b.md")
+        touch(tmp_path / "node_modules" / "c.md")
+
+        found = list(iter_directories([tmp_path, tmp_path / "docs" / "api" / "a.md"]))
+
+        assert found == [tmp_path, tmp_path / "docs", tmp_path / "docs" / "api"]
+
+
+class TestIsExcluded:
+    def test_matches_what_a_search_would_skip(self, tmp_path):
+        touch(tmp_path / ".gitignore", "build/\n*.generated.md\n")
+
+        assert is_excluded(tmp_path / "a.generated.md")
+        assert is_excluded(tmp_path / "a.txt")
+        assert is_excluded(tmp_path / "build", is_dir=True)
+        assert is_excluded(tmp_path / ".git", is_dir=True)
+        assert not is_excluded(tmp_path / "a.md")
+        assert not is_excluded(tmp_path / "docs", is_dir=True)
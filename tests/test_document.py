@@ -0,0 +1,53 @@
+import pickle
+
+from formdt import Config, Document, format_markdown, parse, render
+
+TEXT = """# Title
+
+A paragraph with [a link](https://example.com/a b) and $$x + y$$ math
+that goes on for a while.
+
+- a list item that is long enough to wrap at a narrow width
+> a callout
+> continued
+
+```python
+code   stays
+```
+"""
+
+
+class TestParse:
+    def test_stores_one_record_per_block(self):
+        document = parse("# Title\n\nOne\ntwo\n- item")
+
+        assert len(document) == 4
+        assert document.prefixes == ["", "", "", "- "]
+        assert document.texts[2] == "One\ntwo"
+
+    def test_links_stay_single_tokens(self):
+        document = parse("see [a b](c) now")
+
+        assert document.texts == ["see\n[a b](c)\nnow"]
+
+
+class TestRender:
+    def test_matches_format_markdown_at_any_width(self):
+        document = parse(TEXT)
+
+        for line_length in (20, 40, 80, 120):
+            for wrap_mode in ("greedy", "optimal"):
+                config = Config(line_length=line_length, wrap_mode=wrap_mode)
+                assert render(document, config) == format_markdown(TEXT, config)
+
+    def test_empty_blocks(self):
+        for text in ("", "- ", "> ", "\n\n"):
+            assert render(parse(text)) == format_markdown(text)
+
+    def test_document_pickles(self):
+        document = parse(TEXT)
+        restored = pickle.loads(pickle.dumps(document))
+
+        assert isinstance(restored, Document)
+        assert restored == document
+        assert render(restored) == render(document)
@@ -0,0 +1,72 @@
+import os
+
+from formdt.fileio import atomic_write, commit, replacing, write_if_changed
+
+
+class TestAtomicWrite:
+    def test_replaces_contents_and_keeps_mode(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("old")
+        os.chmod(path, 0o640)
+
+        atomic_write(path, b"new")
+
+        assert path.read_bytes() == b"new"
+        assert path.stat().st_mode & 0o777 == 0o640
+        assert os.listdir(tmp_path) == ["a.md"]
+
+    def test_writes_through_symlink(self, tmp_path):
+        real = tmp_path / "real.md"
+        real.write_text("old")
+        (tmp_path / "docs").mkdir()
+        link = tmp_path / "docs" / "link.md"
+        link.symlink_to("../real.md")
+
+        atomic_write(link, b"new")
+
+        assert link.is_symlink()
+        assert real.read_bytes() == b"new"
+        assert os.listdir(tmp_path / "docs") == ["link.md"]
+
+    def test_creates_missing_file(self, tmp_path):
+        atomic_write(tmp_path / "a.md", b"new")
+
+        assert (tmp_path / "a.md").read_bytes() == b"new"
+
+    def test_uncommitted_file_is_removed(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("old")
+
+        with replacing(path) as f:
+            f.write(b"new")
+
+        assert path.read_text() == "old"
+        assert os.listdir(tmp_path) == ["a.md"]
+
+    def test_committed_file_replaces_original(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("old")
+
+        with replacing(path) as f:
+            f.write(b"new")
+            commit(f, path)
+
+        assert path.read_text() == "new"
+        assert os.listdir(tmp_path) == ["a.md"]
+
+
+class TestWriteIfChanged:
+    def test_skips_identical_contents(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("same")
+        os.utime(path, (0, 0))
+
+        assert not write_if_changed(path, b"same")
+        assert path.stat().st_mtime == 0
+
+    def test_writes_different_contents(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("old")
+
+        assert write_if_changed(path, b"new")
+        assert path.read_text() == "new"
@@ -1,4 +1,9 @@
-from formdt import format_markdown, Config
+import io
+import random
+
+from formdt import format_markdown, format_markdown_stream, Config
+from formdt.config import MAX_TOKEN_LENGTH
+from formdt.formatter import TOKEN_PATTERN, _scan_tokens, _tokenize
 
 
 class TestLineWrapping:
@@ -225,3 +230,114 @@ class TestImageMarkdown:
         lines = result.split("\n")
         for line in lines:
             assert line != "!"
+
+
+class TestStreaming:
+    def test_stream_matches_format_markdown(self):
+        config = Config(line_length=30)
+        text = (
+            "# Title\n\nA paragraph that is long enough to wrap\nacross lines.\n\n"
+            "```\ncode   stays\n```\n- a list item that also needs wrapping\n"
+        )
+        lines = io.StringIO(text)
+
+        assert "\n".join(format_markdown_stream(lines, config)) == format_markdown(
+            text, config
+        )
+
+    def test_stream_accepts_split_lines(self):
+        text = "One\ntwo\n\nThree"
+        result = list(format_markdown_stream(text.split("\n")))
+
+        assert result == ["One two", "", "Three"]
+
+    def test_stream_emits_blocks_before_input_is_exhausted(self):
+        consumed = []
+
+        def lines():
+            for line in ["First paragraph.", "", "Second.", "", "Third."]:
+                consumed.append(line)
+                yield line
+
+        stream = format_markdown_stream(lines())
+
+        assert next(stream) == "First paragraph."
+        assert consumed == ["First paragraph.", ""]
+
+    def test_stream_emits_long_code_fences_in_pieces(self):
+        consumed = []
+
+        def lines():
+            for line in ["```"] + ["x" * 10] * 100:
+                consumed.append(line)
+                yield line
+
+        stream = format_markdown_stream(lines(), Config(max_block_length=50))
+
+        assert next(stream) == "\n".join(consumed[:-1])
+        assert len(consumed) < 10
+
+
+class TestInlineTokens:
+    def test_punctuation_stays_attached_to_links(self):
+        config = Config(line_length=80)
+        text = "See [the docs](https://example.com), or ![logo](logo.png)."
+
+        assert format_markdown(text, config) == text
+
+    def test_link_inside_display_math_is_not_duplicated(self):
+        config = Config(line_length=80)
+        text = "Before $$ [a](b) $$ after."
+
+        assert format_markdown(text, config) == text
+
+    def test_link_with_spaces_is_never_split(self):
+        config = Config(line_length=20)
+        text = "word " * 5 + "[a link with spaces](https://example.com/x) tail"
+        result = format_markdown(text, config)
+
+        assert "[a link with spaces](https://example.com/x)" in result.split("\n")
+
+    def test_unclosed_link_syntax_wraps_as_words(self):
+        config = Config(line_length=10)
+        text = "[not a link and $ signs"
+        result = format_markdown(text, config)
+
+        assert result == "[not a\nlink and $\nsigns"
+
+
+class TestLimits:
+    def test_long_paragraph_passes_through(self):
+        config = Config(line_length=10, max_block_length=20)
+        text = "one  two three\nfour five six\nseven\n\neight nine\nten"
+
+        assert format_markdown(text, config) == (
+            "one  two three\nfour five six\nseven\n\neight nine\nten"
+        )
+
+    def test_long_callout_keeps_its_prefixes(self):
+        config = Config(line_length=10, max_block_length=5)
+        text = ">one two\n>  three\nfour"
+
+        assert format_markdown(text, config) == text
+
+    def test_long_list_item_passes_through(self):
+        config = Config(line_length=10, max_block_length=10)
+
+        assert format_markdown("- one two three  four", config) == (
+            "- one two three  four"
+        )
+
+    def test_long_link_wraps_at_its_spaces(self):
+        text = "[a link with spaces](x)"
+
+        assert _tokenize(text, 100) == [text]
+        assert _tokenize(text, 10) == ["[a", "link", "with", "spaces](x)"]
+
+    def test_tokens_match_token_pattern(self):
+        rng = random.Random(0)
+        for _ in range(10_000):
+            text = "".join(rng.choices("ab!$[]() ", k=rng.randint(0, 20)))
+            expected = TOKEN_PATTERN.findall(text)
+            assert _tokenize(text) == expected
+            assert _scan_tokens(text, MAX_TOKEN_LENGTH) == expected
@@ -0,0 +1,118 @@
+import subprocess
+
+import pytest
+
+from formdt import Config
+from formdt.cli import main
+from formdt.git import BlobReader, changed_files, format_staged, repository_root
+from formdt.runner import Options
+
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.email", "test@example.com")
+    git(tmp_path, "config", "user.name", "Test")
+    (tmp_path / "a.md").write_text("One\ntwo\n")
+    (tmp_path / "b.md").write_text("Three\nfour\n")
+    (tmp_path / "code.py").write_text("x = 1\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    return tmp_path
+
+
+class TestChangedFiles:
+    def test_staged_lists_only_staged_markdown(self, repo):
+        (repo / "a.md").write_text("Changed\n")
+        (repo / "b.md").write_text("Changed\n")
+        (repo / "code.py").write_text("x = 2\n")
+        git(repo, "add", "a.md", "code.py")
+
+        assert changed_files(staged=True, cwd=repo) == ["a.md"]
+
+    def test_since_ref_includes_working_tree_changes(self, repo):
+        (repo / "docs").mkdir()
+        (repo / "docs" / "c.md").write_text("New\n")
+        git(repo, "add", "docs")
+        git(repo, "commit", "-q", "-m", "docs")
+        (repo / "b.md").write_text("Changed\n")
+
+        assert changed_files("HEAD~1", cwd=repo) == ["b.md", "docs/c.md"]
+        assert changed_files("HEAD~1", paths=["docs"], cwd=repo) == ["docs/c.md"]
+
+    def test_outside_repository(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            repository_root(tmp_path)
+
+
+class TestBlobReader:
+    def test_reads_staged_contents(self, repo):
+        (repo / "a.md").write_text("Staged\n")
+        git(repo, "add", "a.md")
+        (repo / "a.md").write_text("Unstaged\n")
+
+        with BlobReader(repo) as blobs:
+            assert blobs.read(":a.md") == b"Staged\n"
+            assert blobs.read(":b.md") == b"Three\nfour\n"
+            assert blobs.read(":missing.md") is None
+            assert blobs.read(":not staged.md") is None
+            assert blobs.read(":a.md") == b"Staged\n"
+
+
+class TestFormatStaged:
+    def test_formats_staged_contents(self, repo, monkeypatch):
+        monkeypatch.chdir(repo)
+        (repo / "a.md").write_text("Staged\nlines\n")
+        git(repo, "add", "a.md")
+        (repo / "a.md").write_text("Unstaged\n")
+
+        [result] = format_staged(["a.md"], repo, Config(), Options())
+
+        assert result.output == "Staged lines\n"
+        assert result.changed
+
+    def test_writes_when_working_tree_is_clean(self, repo, monkeypatch):
+        monkeypatch.chdir(repo)
+
+        results = list(format_staged(["a.md"], repo, Config(), Options(write=True)))
+
+        assert results[0].error is None
+        assert (repo / "a.md").read_text() == "One two\n"
+
+    def test_refuses_to_overwrite_unstaged_changes(self, repo, monkeypatch):
+        monkeypatch.chdir(repo)
+        (repo / "a.md").write_text("Unstaged\nedit\n")
+
+        [result] = format_staged(["a.md"], repo, Config(), Options(write=True))
+
+        assert result.error == "a.md: has unstaged changes, not written"
+        assert (repo / "a.md").read_text() == "Unstaged\nedit\n"
+
+
+class TestCli:
+    def test_staged_formats_only_staged_files(self, repo, monkeypatch, capsys):
+        monkeypatch.chdir(repo)
+        (repo / "a.md").write_text("Five\nsix\n")
+        (repo / "b.md").write_text("Seven\neight\n")
+        git(repo, "add", "a.md")
+
+        assert main(["--staged", "-w", "-q"]) == 0
+
+        assert (repo / "a.md").read_text() == "Five six\n"
+        assert (repo / "b.md").read_text() == "Seven\neight\n"
+
+    def test_changed_since_reads_working_tree(self, repo, monkeypatch, capsys):
+        monkeypatch.chdir(repo)
+        (repo / "b.md").write_text("Seven\neight\n")
+
+        assert main(["--changed-since", "HEAD", "--no-cache", "-q"]) == 0
+
+        assert capsys.readouterr().out == "Seven eight\n\n"
+
+    def test_requires_paths_without_git_mode(self, capsys):
+        with pytest.raises(SystemExit):
+            main([])
@@ -0,0 +1,83 @@
+from formdt.lexer import Block, Kind, classify, lex_blocks
+
+
+class TestClassify:
+    def test_classifies_each_line_kind(self):
+        assert classify("") == Kind.BLANK
+        assert classify("   ") == Kind.BLANK
+        assert classify("plain text") == Kind.TEXT
+        assert classify("## Heading") == Kind.HEADING
+        assert classify("```python") == Kind.FENCE
+        assert classify("  $$ x") == Kind.MATH
+        assert classify("- item") == Kind.LIST
+        assert classify("  12. item") == Kind.LIST
+        assert classify("> quote") == Kind.CALLOUT
+        assert classify("> [!note]") == Kind.ADMONITION
+
+    def test_near_misses_are_text(self):
+        assert classify("#hashtag") == Kind.TEXT
+        assert classify("  ```indented fence") == Kind.TEXT
+        assert classify("$5 price") == Kind.TEXT
+        assert classify("-dash") == Kind.TEXT
+        assert classify("2024 was a year") == Kind.TEXT
+        assert classify("  > indented quote") == Kind.TEXT
+
+
+class TestLexBlocks:
+    def test_joins_paragraph_lines(self):
+        blocks = list(lex_blocks(["One", "two", "", "Three"]))
+
+        assert blocks == [
+            Block(Kind.TEXT, "One two"),
+            Block(Kind.BLANK, ""),
+            Block(Kind.TEXT, "Three"),
+        ]
+
+    def test_paragraph_stops_at_structural_lines(self):
+        blocks = list(lex_blocks(["Text", "- item", "# Head", "```", "x", "```"]))
+
+        assert [b.kind for b in blocks] == [
+            Kind.TEXT,
+            Kind.LIST,
+            Kind.HEADING,
+            Kind.FENCE,
+        ]
+        assert blocks[1] == Block(Kind.LIST, "item", "- ")
+
+    def test_fence_is_one_block(self):
+        lines = ["```", "# not a heading", "- not a list", "```", "$$", "x", "$$"]
+
+        assert list(lex_blocks(lines)) == [
+            Block(Kind.FENCE, "```\n# not a heading\n- not a list\n```"),
+            Block(Kind.MATH, "$$\nx\n$$"),
+        ]
+
+    def test_long_fence_is_split_into_pieces(self):
+        lines = ["```"] + ["x" * 10] * 100
+
+        blocks = list(lex_blocks(lines, max_block_length=50))
+
+        assert all(b.kind == Kind.FENCE for b in blocks)
+        assert all(len(b.text) <= 50 + 11 for b in blocks)
+        assert "\n".join(b.text for b in blocks) == "\n".join(lines)
+
+    def test_callout_continuations_drop_their_prefix(self):
+        blocks = list(lex_blocks(["> one", "> two", "three"]))
+
+        assert blocks == [Block(Kind.CALLOUT, "one two three", "> ")]
+
+    def test_trailing_newline_yields_final_blank_line(self):
+        blocks = list(lex_blocks(["a\n", "b\n"]))
+
+        assert blocks == [Block(Kind.TEXT, "a b"), Block(Kind.BLANK, "")]
+
+    def test_paragraph_over_the_limit_is_raw(self):
+        blocks = list(lex_blocks(["> one", "> two", "three", "", "four"], 8))
+
+        assert blocks == [
+            Block(Kind.RAW, "> one"),
+            Block(Kind.RAW, "> two"),
+            Block(Kind.RAW, "three"),
+            Block(Kind.BLANK, ""),
+            Block(Kind.TEXT, "four"),
+        ]
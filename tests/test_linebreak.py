@@ -0,0 +1,89 @@
+import random
+
+from formdt import Config, format_markdown
+from formdt.linebreak import wrap_optimal
+
+
+def cost(lines: list[str], line_length: int, tokens: int) -> int:
+    overflow = (line_length + 1) ** 2 * (tokens + 1)
+    total = 0
+    for i, line in enumerate(lines):
+        slack = line_length - len(line)
+        if slack < 0:
+            total -= slack * overflow
+        elif i < len(lines) - 1:
+            total += slack * slack
+    return total
+
+
+def quadratic_optimum(tokens: list[str], line_length: int) -> int:
+    n = len(tokens)
+    best = [0] + [None] * n
+    for j in range(1, n + 1):
+        best[j] = min(
+            best[i] + cost([" ".join(tokens[i:j])], line_length, n)
+            if j == n
+            else best[i] + cost([" ".join(tokens[i:j]), ""], line_length, n)
+            for i in range(j)
+        )
+    return best[n]
+
+
+class TestWrapOptimal:
+    def test_matches_quadratic_dynamic_program(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            line_length = rng.randint(-3, 20)
+            tokens = [
+                "x" * rng.choice((1, 1, 2, 3, 5, 8, 25))
+                for _ in range(rng.randint(1, 20))
+            ]
+
+            lines = wrap_optimal(tokens, line_length)
+
+            # Below one column, as under a wide list prefix, nothing fits
+            # beside a token, so every token gets a line of its own.
+            if line_length <= 1:
+                assert lines == tokens
+            line_length = max(line_length, 1)
+            assert " ".join(lines).split() == tokens
+            assert cost(lines, line_length, len(tokens)) == quadratic_optimum(
+                tokens, line_length
+            )
+
+    def test_balances_lines_that_greedy_leaves_ragged(self):
+        tokens = "aaa bb cc ddddd".split()
+
+        assert wrap_optimal(tokens, 6) == ["aaa", "bb cc", "ddddd"]
+
+    def test_long_token_gets_its_own_line(self):
+        tokens = ["a", "b" * 12, "c"]
+
+        assert wrap_optimal(tokens, 5) == ["a", "b" * 12, "c"]
+
+    def test_empty_and_single_token(self):
+        assert wrap_optimal([], 10) == [""]
+        assert wrap_optimal(["word"], 2) == ["word"]
+
+
+class TestWrapMode:
+    def test_greedy_is_default(self):
+        text = "aaa bb cc ddddd"
+
+        assert format_markdown(text, Config(line_length=6)) == "aaa bb\ncc\nddddd"
+
+    def test_prefix_wider_than_line(self):
+        text = "10. aa bb cc dd ee ff"
+        greedy = format_markdown(text, Config(line_length=2))
+
+        assert format_markdown(text, Config(line_length=2, wrap_mode="optimal")) == (
+            greedy
+        )
+
+    def test_optimal_mode_wraps_paragraphs_and_lists(self):
+        config = Config(line_length=8, wrap_mode="optimal")
+        text = "aaa bb cc ddddd\n\n- aaa bb cc ddddd"
+
+        assert format_markdown(text, config) == (
+            "aaa bb\ncc ddddd\n\n- aaa\n  bb cc\n  ddddd"
+        )
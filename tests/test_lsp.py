@@ -0,0 +1,212 @@
+import io
+import json
+
+from formdt.config import Config
+from formdt.lsp import Document, LanguageServer, read_message, write_message
+
+URI = "file:///doc.md"
+
+
+def frame(message: dict) -> bytes:
+    stream = io.BytesIO()
+    write_message(stream, message)
+    return stream.getvalue()
+
+
+def run_session(messages: list[dict]) -> tuple[int, list[dict]]:
+    reader = io.BytesIO(b"".join(frame(m) for m in messages))
+    writer = io.BytesIO()
+    code = LanguageServer(reader, writer, Config(line_length=20)).run()
+    writer.seek(0)
+    responses = []
+    while (message := read_message(writer)) is not None:
+        responses.append(message)
+    return code, responses
+
+
+def change(line, start, end, text):
+    return {
+        "range": {
+            "start": {"line": line, "character": start},
+            "end": {"line": line, "character": end},
+        },
+        "text": text,
+    }
+
+
+class TestDocument:
+    def test_applies_incremental_changes(self):
+        document = Document("Hello world\nsecond line")
+        document.apply_change(change(0, 6, 11, "there"))
+        document.apply_change(
+            {
+                "range": {
+                    "start": {"line": 0, "character": 11},
+                    "end": {"line": 1, "character": 0},
+                },
+                "text": " ",
+            }
+        )
+
+        assert document.text == "Hello there second line"
+
+    def test_positions_are_utf16_code_units(self):
+        document = Document("😀 smile")
+        document.apply_change(change(0, 3, 8, "grin"))
+
+        assert document.text == "😀 grin"
+
+    def test_full_text_change_replaces_document(self):
+        document = Document("old")
+        document.apply_change({"text": "new\ntext"})
+
+        assert document.lines == ["new", "text"]
+
+
+class TestLanguageServer:
+    def test_formatting_returns_minimal_edit(self):
+        code, responses = run_session(
+            [
+                {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+                {
+                    "jsonrpc": "2.0",
+                    "method": "textDocument/didOpen",
+                    "params": {
+                        "textDocument": {
+                            "uri": URI,
+                            "text": "# Title\n\nOne\ntwo\n\nEnd.\n",
+                        }
+                    },
+                },
+                {
+                    "jsonrpc": "2.0",
+                    "id": 2,
+                    "method": "textDocument/formatting",
+                    "params": {"textDocument": {"uri": URI}},
+                },
+                {"jsonrpc": "2.0", "id": 3, "method": "shutdown"},
+                {"jsonrpc": "2.0", "method": "exit"},
+            ]
+        )
+
+        assert code == 0
+        capabilities = responses[0]["result"]["capabilities"]
+        assert capabilities["textDocumentSync"]["change"] == 2
+        assert responses[1]["result"] == [
+            {
+                "range": {
+                    "start": {"line": 2, "character": 0},
+                    "end": {"line": 4, "character": 0},
+                },
+                "newText": "One two\n",
+            }
+        ]
+
+    def test_formats_after_incremental_change(self):
+        server = LanguageServer(None, None, Config(line_length=20))
+        server.on_textDocument_didOpen(
+            {"textDocument": {"uri": URI, "text": "Short.\n\nAlso short."}}
+        )
+        params = {"textDocument": {"uri": URI}}
+        assert server.on_textDocument_formatting(params) == []
+
+        server.on_textDocument_didChange(
+            {
+                "textDocument": {"uri": URI},
+                "contentChanges": [change(2, 11, 11, " But now it is long.")],
+            }
+        )
+
+        edits = server.on_textDocument_formatting(params)
+        assert edits[0]["newText"] == "\nAlso short. But now\nit is long."
+
+    def test_range_formatting_only_touches_the_range(self):
+        server = LanguageServer(None, None, Config(line_length=80))
+        server.on_textDocument_didOpen(
+            {"textDocument": {"uri": URI, "text": "A\nb\n\nC\nd"}}
+        )
+
+        edits = server.on_textDocument_rangeFormatting(
+            {
+                "textDocument": {"uri": URI},
+                "range": {
+                    "start": {"line": 3, "character": 0},
+                    "end": {"line": 3, "character": 1},
+                },
+            }
+        )
+
+        assert len(edits) == 1
+        assert edits[0]["range"]["start"] == {"line": 2, "character": 0}
+        assert edits[0]["newText"] == "\nC d"
+
+    def test_unknown_request_is_an_error(self):
+        code, responses = run_session(
+            [
+                {"jsonrpc": "2.0", "id": 1, "method": "textDocument/hover"},
+                {"jsonrpc": "2.0", "method": "exit"},
+            ]
+        )
+
+        assert code == 1
+        assert responses[0]["error"]["code"] == -32601
+
+    def test_bad_notification_is_logged(self):
+        code, responses = run_session(
+            [
+                {
+                    "jsonrpc": "2.0",
+                    "method": "textDocument/didChange",
+                    "params": {
+                        "textDocument": {"uri": "file:///unopened.md"},
+                        "contentChanges": [{"text": "x"}],
+                    },
+                },
+                {"jsonrpc": "2.0", "id": 1, "method": "shutdown"},
+                {"jsonrpc": "2.0", "method": "exit"},
+            ]
+        )
+
+        assert code == 0
+        assert responses[0]["method"] == "window/logMessage"
+        assert "unopened.md" in responses[0]["params"]["message"]
+        assert responses[1] == {"jsonrpc": "2.0", "id": 1, "result": None}
+
+    def test_malformed_messages_are_answered_and_skipped(self):
+        bodies = [b"{not json", b'"\xff"', b"[1, 2]"]
+        frames = [b"Content-Length: %d\r\n\r\n%s" % (len(b), b) for b in bodies]
+        reader = io.BytesIO(
+            b"".join(frames)
+            + frame({"jsonrpc": "2.0", "id": 1, "method": "shutdown"})
+            + frame({"jsonrpc": "2.0", "method": "exit"})
+        )
+        writer = io.BytesIO()
+
+        code = LanguageServer(reader, writer, Config()).run()
+        writer.seek(0)
+        responses = [read_message(writer) for _ in range(4)]
+
+        assert code == 0
+        assert [r["error"]["code"] for r in responses[:3]] == [-32700, -32700, -32600]
+        assert all(r["id"] is None for r in responses[:3])
+        assert responses[3] == {"jsonrpc": "2.0", "id": 1, "result": None}
+
+    def test_messages_are_framed_with_content_length(self):
+        data = frame({"jsonrpc": "2.0", "id": 1, "result": "é"})
+        header, body = data.split(b"\r\n\r\n")
+
+        assert header == f"Content-Length: {len(body)}".encode()
+        assert json.loads(body)["result"] == "é"
+
+    def test_document_uses_config_of_its_directory(self, tmp_path):
+        (tmp_path / ".formdt").write_text('{"line_length": 10}')
+        uri = (tmp_path / "doc.md").as_uri()
+        server = LanguageServer(None, None)
+        server.on_initialize({})
+        server.on_textDocument_didOpen(
+            {"textDocument": {"uri": uri, "text": "one two three four"}}
+        )
+
+        edits = server.on_textDocument_formatting({"textDocument": {"uri": uri}})
+
+        assert edits[0]["newText"] == "one two\nthree four"
@@ -0,0 +1,54 @@
+from formdt import Config, ParagraphMemo, format_markdown
+from formdt.memo import ENTRY_OVERHEAD
+
+TEXT = "one two three four five six\n\n> one two three four five six\n\n- one two"
+
+
+class TestParagraphMemo:
+    def test_same_output_as_without_memo(self):
+        memo = ParagraphMemo()
+        for config in (Config(line_length=10), Config(10, "optimal"), Config(12)):
+            assert format_markdown(TEXT, config, memo) == format_markdown(TEXT, config)
+            assert format_markdown(TEXT, config, memo) == format_markdown(TEXT, config)
+
+    def test_keys_on_width(self):
+        memo = ParagraphMemo()
+        format_markdown(TEXT, Config(line_length=10), memo)
+        format_markdown(TEXT, Config(line_length=10), memo)
+
+        # The callout paragraph is two columns narrower than the plain one.
+        assert (memo.hits, memo.misses) == (3, 3)
+        assert memo.as_dict()["hit_rate"] == 0.5
+
+    def test_evicts_least_recently_used(self):
+        memo = ParagraphMemo(max_bytes=2 * (ENTRY_OVERHEAD + 4))
+        memo.put(("a", 80, "greedy", 1, False), ["a"])
+        memo.put(("b", 80, "greedy", 1, False), ["b"])
+        memo.get(("a", 80, "greedy", 1, False))
+        memo.put(("c", 80, "greedy", 1, False), ["c"])
+
+        assert [key[0] for key in memo.entries] == ["a", "c"]
+        assert memo.evictions == 1
+        assert memo.bytes == 2 * (ENTRY_OVERHEAD + 2)
+
+    def test_skips_entries_over_budget(self):
+        memo = ParagraphMemo(max_bytes=ENTRY_OVERHEAD)
+        memo.put(("long text", 80, "greedy", 1, False), ["long", "text"])
+
+        assert not memo.entries
+
+    def test_persists(self, tmp_path):
+        memo = ParagraphMemo.read(tmp_path)
+        format_markdown(TEXT, Config(line_length=10), memo)
+        memo.write()
+
+        loaded = ParagraphMemo.read(tmp_path)
+
+        assert loaded.entries == memo.entries
+        assert loaded.bytes == memo.bytes
+        assert loaded.hits == 0
+
+    def test_ignores_corrupt_file(self, tmp_path):
+        (tmp_path / "memo.pickle").write_bytes(b"not a pickle")
+
+        assert not ParagraphMemo.read(tmp_path).entries
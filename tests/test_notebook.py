@@ -1,10 +1,11 @@
 import json
+import os
 import tempfile
 from pathlib import Path
 
 
 from formdt.config import Config
-from formdt.notebook import format_notebook
+from formdt.notebook import format_notebook, format_notebook_bytes, write_notebook
 
 
 def create_test_notebook(cells: list[dict]) -> Path:
@@ -108,6 +109,83 @@ class TestNotebookFormatting:
 
         assert result["cells"][0]["source"] == ["This line should remain unchanged."]
 
+    def test_write_notebook_only_writes_changes(self, tmp_path):
+        path = tmp_path / "a.ipynb"
+        notebook = {"cells": [], "metadata": {}}
+        assert write_notebook(notebook, path)
+        os.utime(path, (0, 0))
+
+        assert not write_notebook(notebook, path)
+        assert path.stat().st_mtime == 0
+
+        notebook["metadata"]["kernel"] = "python3"
+        assert write_notebook(notebook, path)
+        assert json.loads(path.read_text())["metadata"] == {"kernel": "python3"}
+
+
+def notebook_bytes(cells: list[dict], indent: int | None = 1) -> bytes:
+    notebook = {"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5}
+    return (json.dumps(notebook, indent=indent, ensure_ascii=False) + "\n").encode()
+
+
+class TestNotebookBytes:
+    def test_splices_only_changed_sources(self):
+        code = {
+            "cell_type": "code",
+            "execution_count": 1,
+            "metadata": {"tags": []},
+            "outputs": [{"output_type": "stream", "text": ['a "quoted" \\ line']}],
+            "source": ["print('hello')"],
+        }
+        data = notebook_bytes(
+            [
+                {"cell_type": "markdown", "metadata": {}, "source": ["one two three"]},
+                code,
+            ],
+            indent=2,
+        )
+
+        result = format_notebook_bytes(data, Config(line_length=8), all_markdown=True)
+
+        expected = data.replace(b'"one two three"', b'"one two\\n",\n        "three"')
+        assert result == expected
+        assert json.loads(result)["cells"][1] == code
+
+    def test_matches_nbformat_layout(self):
+        cells = [
+            {"cell_type": "markdown", "metadata": {}, "source": ["a b c d e f g h"]},
+            {"cell_type": "markdown", "metadata": {}, "source": "é è ê ë à"},
+        ]
+        data = notebook_bytes(cells)
+
+        result = format_notebook_bytes(data, Config(line_length=5), all_markdown=True)
+
+        notebook = json.loads(result)
+        assert notebook["cells"][0]["source"] == ["a b c\n", "d e f\n", "g h"]
+        assert notebook["cells"][1]["source"] == "é è ê\në à"
+        assert result == notebook_bytes(notebook["cells"])
+
+    def test_returns_input_when_unchanged(self):
+        data = notebook_bytes(
+            [{"cell_type": "markdown", "metadata": {}, "source": ["Short."]}]
+        )
+
+        assert format_notebook_bytes(data, Config(), all_markdown=True) is data
+        assert format_notebook_bytes(data, Config(line_length=1)) is data
+
+    def test_respects_cell_selection(self):
+        data = notebook_bytes(
+            [
+                {"cell_type": "markdown", "metadata": {}, "source": ["a b c"]},
+                {"cell_type": "markdown", "metadata": {}, "source": ["a b c"]},
+            ]
+        )
+
+        result = format_notebook_bytes(data, Config(line_length=1), cells=[1])
+
+        sources = [cell["source"] for cell in json.loads(result)["cells"]]
+        assert sources == [["a b c"], ["a\n", "b\n", "c"]]
+
 
 class TestLinkPreservation:
     def test_preserves_links_in_markdown(self):
@@ -0,0 +1,117 @@
+import difflib
+
+from formdt import Config, format_markdown
+from formdt.ranges import (
+    BlockBoundaries,
+    Edit,
+    SegmentCache,
+    format_markdown_range,
+    unified_diff,
+)
+
+DOCUMENT = "\n".join(
+    [
+        "# Title",  # 0
+        "",  # 1
+        "First paragraph that is",  # 2
+        "long enough to wrap.",  # 3
+        "",  # 4
+        "```",  # 5
+        "code   line",  # 6
+        "```",  # 7
+        "Second paragraph",  # 8
+        "continues here.",  # 9
+        "- item one",  # 10
+        "- item two",  # 11
+    ]
+)
+
+
+class TestWiden:
+    def test_widens_to_enclosing_paragraph(self):
+        assert BlockBoundaries(DOCUMENT).widen(3, 4) == (2, 4)
+
+    def test_widens_to_enclosing_code_fence(self):
+        assert BlockBoundaries(DOCUMENT).widen(6, 7) == (5, 8)
+
+    def test_paragraph_after_fence_starts_a_block(self):
+        assert BlockBoundaries(DOCUMENT).widen(9, 10) == (8, 10)
+
+    def test_list_items_are_their_own_blocks(self):
+        assert BlockBoundaries(DOCUMENT).widen(11, 12) == (11, 12)
+
+    def test_unclosed_fence_extends_to_end(self):
+        text = "Intro\n\n```\ncode\nmore"
+        assert BlockBoundaries(text).widen(3, 4) == (2, 5)
+
+
+class TestFormatMarkdownRange:
+    def test_formats_only_the_enclosing_block(self):
+        config = Config(line_length=30)
+        text = "Long first paragraph that needs wrapping.\n\nOne\ntwo"
+
+        edit = format_markdown_range(text, 2, 3, config)
+
+        assert edit == Edit(2, 4, ["One two"])
+        assert edit.apply(text) == (
+            "Long first paragraph that needs wrapping.\n\nOne two"
+        )
+
+    def test_returns_empty_edit_when_already_formatted(self):
+        text = "Already formatted.\n\nSecond."
+
+        edit = format_markdown_range(text, 0, 1)
+
+        assert edit.start_line == edit.end_line
+        assert edit.lines == []
+
+    def test_matches_full_formatting_for_the_widened_block(self):
+        config = Config(line_length=20)
+        edit = format_markdown_range(DOCUMENT, 2, 3, config)
+
+        assert (
+            edit.apply(DOCUMENT).split("\n")[2:5]
+            == format_markdown(DOCUMENT, config).split("\n")[2:5]
+        )
+
+
+class TestUnifiedDiff:
+    def test_matches_difflib(self):
+        old = ["a", "b", "c", "d", "e", "f", "g", "h"]
+        new = ["a", "b", "c", "X", "e", "f", "g", "h"]
+
+        expected = difflib.unified_diff(old, new, "a/x.md", "b/x.md", lineterm="")
+
+        assert unified_diff(old, new, "x.md") == "\n".join(expected)
+
+    def test_hunks_use_file_line_numbers(self):
+        old = [str(i) for i in range(1000)]
+        new = old[:500] + ["new"] + old[501:]
+
+        diff = unified_diff(old, new, "x.md").split("\n")
+
+        assert diff[2] == "@@ -498,7 +498,7 @@"
+        assert diff[3:] == [
+            " 497",
+            " 498",
+            " 499",
+            "-500",
+            "+new",
+            " 501",
+            " 502",
+            " 503",
+        ]
+
+    def test_no_changes(self):
+        assert unified_diff(["a"], ["a"], "x.md") == ""
+
+
+class TestSegmentCache:
+    def test_matches_format_markdown_and_evicts(self):
+        config = Config(line_length=20)
+        text = "one two three four five six\n\n# Title\n\nseven eight nine ten eleven"
+        cache = SegmentCache(size=2)
+
+        assert cache.format(text, config) == format_markdown(text, config)
+        assert len(cache.segments) == 2
+        assert cache.format(text, config) == format_markdown(text, config)
@@ -0,0 +1,305 @@
+import io
+import os
+
+from formdt.cache import Cache, digest
+from formdt.config import Config, ConfigResolver
+from formdt.runner import (
+    Options,
+    Summary,
+    format_file,
+    print_markdown,
+    rewrite_markdown,
+    run,
+)
+
+
+class TestFormatFile:
+    def test_returns_output_without_writing(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo")
+
+        result = format_file(path, Config(), Options())
+
+        assert result.output == "One two"
+        assert result.changed
+        assert path.read_text() == "One\ntwo"
+
+    def test_writes_when_requested(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo")
+
+        result = format_file(path, Config(), Options(write=True))
+
+        assert result.output is None
+        assert path.read_text() == "One two"
+
+    def test_leaves_formatted_notebook_untouched(self, tmp_path):
+        path = tmp_path / "a.ipynb"
+        path.write_text('{"cells": [{"cell_type": "markdown", "source": ["Hi."]}]}')
+        os.utime(path, (0, 0))
+
+        result = format_file(path, Config(), Options(write=True, all_markdown=True))
+
+        assert not result.changed
+        assert path.stat().st_mtime == 0
+
+    def test_leaves_formatted_markdown_untouched(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("Already formatted.\n")
+        os.utime(path, (0, 0))
+        inode = path.stat().st_ino
+
+        result = format_file(path, Config(), Options(write=True))
+
+        assert not result.changed
+        assert result.digest is not None
+        assert path.stat().st_mtime == 0
+        assert path.stat().st_ino == inode
+
+    def test_verifies_in_chunks(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("formdt.runner.CHUNK_SIZE", 3)
+        path = tmp_path / "a.md"
+        data = "Ünïcödé wörds.\n\n漢字 split across chunks.\n".encode()
+        path.write_bytes(data)
+
+        result = format_file(path, Config(), Options(write=True))
+
+        assert not result.changed
+        assert result.bytes_in == len(data)
+        assert result.digest == digest(data)
+
+    def test_rewrites_carriage_returns(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_bytes(b"Already formatted.\r\n")
+
+        result = format_file(path, Config(), Options(write=True))
+
+        assert result.changed
+        assert path.read_bytes() == b"Already formatted.\n"
+
+    def test_reports_missing_file(self, tmp_path):
+        result = format_file(tmp_path / "missing.md", Config(), Options())
+
+        assert result.error == f"File not found: {tmp_path / 'missing.md'}"
+
+
+class TestCheckAndDiff:
+    def test_check_reports_change_without_output(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo")
+
+        result = format_file(path, Config(), Options(check=True))
+
+        assert result.changed
+        assert result.output is None
+        assert result.digest is None
+
+    def test_check_marks_formatted_file(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("One two\n")
+
+        result = format_file(path, Config(), Options(check=True))
+
+        assert not result.changed
+        assert result.digest is not None
+
+    def test_check_stops_at_first_difference(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo\n\n" + "Fine.\n\n" * 1000)
+
+        result = format_file(path, Config(), Options(check=True, profile=True))
+
+        assert result.changed
+        assert result.stats.counts["lines"] < 10
+
+    def test_diff_output(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo\n")
+
+        result = format_file(path, Config(), Options(diff=True))
+
+        assert result.output.split("\n")[2:] == [
+            "@@ -1,3 +1,2 @@",
+            "-One",
+            "-two",
+            "+One two",
+            " ",
+        ]
+
+
+class TestRun:
+    def test_parallel_run_preserves_order(self, tmp_path):
+        paths = []
+        for i in range(10):
+            path = tmp_path / f"{i}.md"
+            path.write_text(f"File {i}\nline")
+            paths.append(path)
+
+        results = list(run(paths, Config(), Options(), jobs=3))
+
+        assert [r.path for r in results] == paths
+        assert [r.output for r in results] == [f"File {i} line" for i in range(10)]
+
+    def test_summary_counts_files_and_bytes(self, tmp_path):
+        paths = [tmp_path / "a.md", tmp_path / "b.md"]
+        paths[0].write_text("Short.")
+        paths[1].write_text("Two\nlines")
+
+        summary = Summary()
+        for result in run(paths, Config(), Options(), jobs=1):
+            summary.add(result)
+        summary.finish()
+
+        assert summary.files == 2
+        assert summary.changed == 1
+        assert summary.bytes_in == 15
+        assert str(summary).startswith(
+            "formdt: 2 files (1 changed, 0 cached), 15 bytes"
+        )
+
+    def test_each_directory_gets_its_own_config(self, tmp_path):
+        (tmp_path / ".formdt").write_text('{"line_length": 80}')
+        (tmp_path / "narrow").mkdir()
+        (tmp_path / "narrow" / ".formdt").write_text('{"line_length": 10}')
+        paths = [tmp_path / "a.md", tmp_path / "narrow" / "b.md"]
+        for path in paths:
+            path.write_text("one two three four")
+
+        results = list(run(paths, ConfigResolver(), Options(), jobs=1))
+
+        assert [r.output for r in results] == [
+            "one two three four",
+            "one two\nthree four",
+        ]
+
+    def test_invalid_config_is_reported_per_file(self, tmp_path):
+        (tmp_path / "bad").mkdir()
+        (tmp_path / "bad" / ".formdt").write_text('{"wrap_mode": "fastest"}')
+        paths = [tmp_path / "bad" / "a.md", tmp_path / "b.md"]
+        for path in paths:
+            path.write_text("Text.")
+
+        results = list(run(paths, ConfigResolver(), Options(), jobs=1))
+
+        assert "invalid configuration" in results[0].error
+        assert results[1].output == "Text."
+
+
+class TestCachedRun:
+    def test_skips_files_known_to_be_formatted(self, tmp_path, monkeypatch):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo")
+        cache = Cache.read("test", tmp_path / "cache")
+
+        first = list(run([path], Config(), Options(write=True), cache=cache))
+        calls = []
+        monkeypatch.setattr(
+            "formdt.runner.format_file", lambda *args: calls.append(args)
+        )
+        second = list(
+            run(
+                [path],
+                Config(),
+                Options(write=True),
+                cache=Cache.read("test", tmp_path / "cache"),
+            )
+        )
+
+        assert first[0].changed and not first[0].cached
+        assert second[0].cached
+        assert calls == []
+
+    def test_cached_file_is_still_printed(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("Already formatted.")
+        cache_dir = tmp_path / "cache"
+
+        list(run([path], Config(), Options(), cache=Cache.read("k", cache_dir)))
+        result = next(
+            run([path], Config(), Options(), cache=Cache.read("k", cache_dir))
+        )
+
+        assert result.cached
+        assert result.output == "Already formatted."
+
+    def test_cached_file_is_copied_to_output(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("Already formatted.")
+        cache_dir = tmp_path / "cache"
+        output = io.StringIO()
+
+        list(run([path], Config(), Options(), cache=Cache.read("k", cache_dir)))
+        [result] = run(
+            [path], Config(), Options(output=output), cache=Cache.read("k", cache_dir)
+        )
+
+        assert result.cached
+        assert result.output is None
+        assert output.getvalue() == "Already formatted.\n"
+
+
+class TestRewriteMarkdown:
+    def test_unchanged_file_is_not_replaced(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("Already formatted.\n")
+        os.utime(path, (0, 0))
+        inode = path.stat().st_ino
+
+        _, _, before, after = rewrite_markdown(path, Config())
+
+        assert before == after
+        assert path.stat().st_ino == inode
+        assert path.stat().st_mtime == 0
+        assert os.listdir(tmp_path) == ["a.md"]
+
+    def test_streams_into_file_and_preserves_mode(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo\n")
+        path.chmod(0o640)
+
+        bytes_in, bytes_out, before, after = rewrite_markdown(path, Config())
+
+        assert path.read_text() == "One two\n"
+        assert (bytes_in, bytes_out) == (8, 8)
+        assert before != after
+        assert path.stat().st_mode & 0o777 == 0o640
+        assert [p.name for p in tmp_path.iterdir()] == ["a.md"]
+
+    def test_formats_symlink_target(self, tmp_path):
+        real = tmp_path / "real.md"
+        real.write_text("One\ntwo\n")
+        (tmp_path / "docs").mkdir()
+        link = tmp_path / "docs" / "link.md"
+        link.symlink_to("../real.md")
+
+        [result] = run([link], Config(), Options(write=True), jobs=1)
+
+        assert result.changed
+        assert link.is_symlink()
+        assert real.read_text() == "One two\n"
+
+
+class TestPrintMarkdown:
+    def test_prints_formatted_text(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo\n")
+        output = io.StringIO()
+
+        bytes_in, bytes_out, before, after = print_markdown(path, Config(), output)
+
+        assert output.getvalue() == "One two\n\n"
+        assert (bytes_in, bytes_out) == (8, 8)
+        assert before != after
+        assert after == digest(b"One two\n")
+
+    def test_format_file_prints_instead_of_returning(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("Already formatted.\n")
+        output = io.StringIO()
+
+        result = format_file(path, Config(), Options(output=output))
+
+        assert result.output is None
+        assert not result.changed
+        assert result.digest == digest(b"Already formatted.\n")
+        assert output.getvalue() == "Already formatted.\n\n"
@@ -0,0 +1,158 @@
+import json
+import random
+
+import pytest
+
+from formdt.cli import main
+from formdt.shard import FILE_COST, assign, merge, parse_shard, select
+
+
+def make_files(directory, sizes):
+    paths = []
+    for i, size in enumerate(sizes):
+        path = directory / f"{i:03}.md"
+        path.write_text("x" * size)
+        paths.append(path)
+    return paths
+
+
+def report(index, count, changed=0, errors=0, check=True):
+    summary = {
+        "files": 1,
+        "changed": changed,
+        "cached": 0,
+        "errors": errors,
+        "bytes_in": 10,
+        "bytes_out": 10,
+        "seconds": float(index),
+    }
+    return {
+        "shard": [index, count],
+        "check": check,
+        "summary": summary,
+        "files": [{"path": f"{index}.md", "status": "unchanged"}],
+    }
+
+
+class TestParseShard:
+    def test_index_and_count(self):
+        assert parse_shard("2/4") == (2, 4)
+
+    @pytest.mark.parametrize("value", ["0/4", "5/4", "1/0", "2", "a/b"])
+    def test_rejects_invalid(self, value):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+
+class TestAssign:
+    def test_every_file_in_exactly_one_shard(self, tmp_path):
+        paths = make_files(tmp_path, range(0, 2000, 37))
+
+        shards = assign(paths, 4)
+
+        assert sorted(path for part in shards for path in part) == paths
+
+    def test_independent_of_discovery_order(self, tmp_path):
+        paths = make_files(tmp_path, [100] * 20 + [5000, 3000])
+        shuffled = paths[:]
+        random.Random(0).shuffle(shuffled)
+
+        assert assign(paths, 3) == assign(shuffled, 3)
+
+    def test_balanced_by_size(self, tmp_path):
+        rng = random.Random(0)
+        sizes = [int(rng.paretovariate(1.2) * 500) for _ in range(200)]
+        paths = make_files(tmp_path, sizes)
+
+        loads = [
+            sum(path.stat().st_size + FILE_COST for path in part)
+            for part in assign(paths, 4)
+        ]
+
+        assert max(loads) - min(loads) <= max(sizes) + FILE_COST
+
+    def test_select_keeps_order(self, tmp_path):
+        paths = make_files(tmp_path, [300, 100, 200, 400])
+
+        parts = [select(paths, i, 2) for i in (1, 2)]
+
+        assert sorted(parts[0] + parts[1]) == paths
+        assert all(part == sorted(part) for part in parts)
+
+
+class TestMerge:
+    def test_sums_shards(self):
+        merged, problems = merge([report(1, 2), report(2, 2, changed=1)])
+
+        assert problems == []
+        assert merged["shard"] == [1, 1]
+        assert merged["summary"]["files"] == 2
+        assert merged["summary"]["changed"] == 1
+        assert merged["summary"]["seconds"] == 2.0
+        assert len(merged["files"]) == 2
+
+    def test_missing_and_duplicate_shards(self):
+        _, problems = merge([report(1, 3), report(1, 3)])
+
+        assert problems == [
+            "shard 1/3 reported 2 times",
+            "missing shard 2/3",
+            "missing shard 3/3",
+        ]
+
+    def test_mismatched_counts(self):
+        _, problems = merge([report(1, 2), report(1, 3)])
+
+        assert problems == ["reports are from different shard counts: [2, 3]"]
+
+
+class TestMergeReports:
+    def test_sharded_check(self, tmp_path, capsys):
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        for i in range(6):
+            (docs / f"{i}.md").write_text("Fine.\n\n" * i + "Fine.\n")
+        (docs / "dirty.md").write_text("Dirty\nfile.\n")
+        reports = [tmp_path / f"shard-{i}.json" for i in (1, 2, 3)]
+
+        statuses = [
+            main(
+                [
+                    str(docs),
+                    "--check",
+                    "--no-cache",
+                    "-q",
+                    "--shard",
+                    f"{i}/3",
+                    "--report",
+                    "json",
+                    "--report-file",
+                    str(path),
+                ]
+            )
+            for i, path in enumerate(reports, 1)
+        ]
+        documents = [json.loads(path.read_text()) for path in reports]
+
+        assert sorted(statuses) == [0, 0, 1]
+        assert sum(doc["summary"]["files"] for doc in documents) == 7
+        assert main(["merge-reports", *map(str, reports)]) == 1
+        assert f"would reformat {docs / 'dirty.md'}" in capsys.readouterr().err
+        assert main(["merge-reports", "-q", *map(str, reports[:2])]) == 1
+        assert "missing shard 3/3" in capsys.readouterr().err
+
+    def test_passes_when_clean(self, tmp_path, capsys):
+        paths = [tmp_path / "1.json", tmp_path / "2.json"]
+        for i, path in enumerate(paths, 1):
+            path.write_text(json.dumps(report(i, 2)))
+        output = tmp_path / "merged.json"
+
+        assert main(["merge-reports", *map(str, paths), "-o", str(output)]) == 0
+        assert json.loads(output.read_text())["summary"]["files"] == 2
+        assert "formdt: 2 files" in capsys.readouterr().err
+
+    def test_rejects_other_json(self, tmp_path, capsys):
+        path = tmp_path / "other.json"
+        path.write_text("{}")
+
+        assert main(["merge-reports", str(path)]) == 1
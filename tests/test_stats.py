@@ -0,0 +1,92 @@
+from formdt import format_markdown
+from formdt.config import Config
+from formdt.runner import Options, format_file
+from formdt.stats import Stats, collect, current
+
+
+class TestCollect:
+    def test_disabled_by_default(self):
+        assert current() is None
+
+    def test_records_blocks_lines_and_tokens(self):
+        text = "# Title\n\nOne two\nthree.\n\n- item [a link](x)\n\n```\ncode\n```"
+
+        with collect() as stats:
+            format_markdown(text, Config())
+
+        assert current() is None
+        assert stats.counts["lines"] == 10
+        assert stats.counts["blocks.heading"] == 1
+        assert stats.counts["blocks.text"] == 1
+        assert stats.counts["blocks.list"] == 1
+        assert stats.counts["blocks.fence"] == 1
+        assert stats.counts["tokens"] == 5
+        assert {"lex", "tokenize", "wrap", "blocks.text"} <= set(stats.seconds)
+
+    def test_nested_collect_is_separate(self):
+        with collect() as outer:
+            with collect() as inner:
+                format_markdown("a b", Config())
+            assert current() is outer
+
+        assert inner.counts["tokens"] == 2
+        assert not outer.counts
+
+
+class TestStats:
+    def test_merge_adds_counts_and_times(self):
+        a = Stats()
+        a.count("files")
+        a.seconds["read"] += 0.5
+        b = Stats()
+        b.count("files", 2)
+        b.seconds["read"] += 0.25
+
+        a.merge(b)
+
+        assert a.as_dict() == {"seconds": {"read": 0.75}, "counts": {"files": 3}}
+
+    def test_table(self):
+        stats = Stats()
+        stats.count("tokens", 1234)
+        stats.seconds["wrap"] += 0.5
+
+        assert str(stats).split("\n") == [
+            "stage        seconds",
+            "wrap          0.5000",
+            "",
+            "counter        count",
+            "tokens         1,234",
+        ]
+
+
+class TestProfiledRun:
+    def test_file_result_carries_stats(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("One\ntwo")
+
+        result = format_file(path, Config(), Options(profile=True))
+
+        assert result.stats.counts["files"] == 1
+        assert result.stats.counts["bytes_in"] == 7
+        assert result.stats.counts["lines"] == 2
+        assert "read" in result.stats.seconds
+
+    def test_notebook_cells_are_counted(self, tmp_path):
+        path = tmp_path / "a.ipynb"
+        path.write_text(
+            '{"cells": [{"cell_type": "markdown", "source": ["a\\n", "b"]},'
+            ' {"cell_type": "markdown", "source": ["c"]}]}'
+        )
+
+        result = format_file(path, Config(), Options(all_markdown=True, profile=True))
+
+        assert result.stats.counts["cells"] == 2
+        assert result.stats.counts["cells_changed"] == 1
+        assert "notebook.scan" in result.stats.seconds
+
+    def test_unprofiled_result_has_no_stats(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("One")
+
+        assert format_file(path, Config(), Options()).stats is None
@@ -0,0 +1,81 @@
+import random
+
+from formdt import Config, format_markdown, is_formatted
+from formdt.verify import verify
+
+
+def check(text: str, line_length: int = 20) -> bool | None:
+    return verify(text.split("\n"), Config(line_length=line_length))
+
+
+class TestVerify:
+    def test_accepts_formatted_paragraphs(self):
+        text = "one two three four\nfive six\n\n# Heading\n\n> quoted text here\n> and more\n"
+        assert check(text) is True
+
+    def test_rejects_line_that_could_take_next_word(self):
+        assert check("one two\nthree") is False
+
+    def test_rejects_overlong_line(self):
+        assert check("one two three four five six") is False
+
+    def test_accepts_overlong_single_token(self):
+        assert check("a" * 30 + "\nnext") is True
+
+    def test_rejects_extra_spaces(self):
+        assert check("one  two") is False
+        assert check("trailing ") is False
+        assert check("one\ttwo") is False
+
+    def test_rejects_wrong_callout_prefix(self):
+        assert check(">quoted") is False
+        assert check("> one two three four\n>> five") is False
+
+    def test_list_items_must_fit_on_one_line(self):
+        assert check("- short item") is True
+        assert check("- an item that is much too long") is False
+
+    def test_paragraphs_over_the_block_limit_are_not_checked(self):
+        config = Config(line_length=20, max_block_length=20)
+
+        assert verify("one  two\nthree four five six".split("\n"), config) is True
+        assert verify("one  two\nthree".split("\n"), config) is False
+
+    def test_measures_display_width(self):
+        config = Config(line_length=14, display_width=True)
+
+        assert verify(["日本語 日本語", "日本語"], config) is True
+        assert verify(["日本語 日本語 日本語"], config) is False
+
+    def test_fences_are_not_checked(self):
+        assert check("```\nan  unformatted   line that is long\n```") is True
+
+    def test_links_are_atomic(self):
+        assert check("see [a link](https://example.com/x) now", 80) is True
+        assert check("see\n[a link](u)", 80) is False
+
+    def test_span_across_lines_is_undecided(self):
+        assert check("see [a\nlink](u) now", 7) is None
+
+    def test_optimal_wrapping_is_undecided(self):
+        config = Config(wrap_mode="optimal")
+        assert verify(["text"], config) is None
+        assert is_formatted("text", config)
+        assert is_formatted("```\na  b\n```\ntext", config)
+        assert not is_formatted("```\na  b\n```\ntext\nmore", config)
+
+    def test_agrees_with_formatter(self):
+        rng = random.Random(0)
+        words = ["a", "word", "[link](u v)", "$$x y$$", "- item", "> quote", "  ", "#"]
+        for _ in range(2000):
+            lines = [
+                " ".join(rng.choices(words, k=rng.randint(0, 6)))
+                for _ in range(rng.randint(1, 5))
+            ]
+            text = "\n".join(lines)
+            config = Config(line_length=rng.randint(5, 30))
+            if rng.random() < 0.5:
+                text = format_markdown(text, config)
+            expected = format_markdown(text, config) == text
+            assert verify(text.split("\n"), config) in (expected, None)
+            assert is_formatted(text, config) == expected
@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+from formdt.config import ConfigResolver
+from formdt.runner import Options
+from formdt.watch import InotifyWatcher, PollingWatcher, Session, debounced
+
+LONG = "word " * 30 + "\n"
+
+
+class FakeWatcher:
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    def changes(self, timeout):
+        return self.batches.pop(0) if self.batches else set()
+
+
+class TestDebounced:
+    def test_collects_a_burst_of_changes(self, tmp_path):
+        a, b = tmp_path / "a.md", tmp_path / "b.md"
+        watcher = FakeWatcher([set(), {a}, {b}, {a}, set(), {b}])
+
+        assert debounced(watcher, 0.1) == {a, b}
+        assert watcher.batches == [{b}]
+
+
+class TestPollingWatcher:
+    def test_reports_changed_and_new_files(self, tmp_path):
+        (tmp_path / "a.md").write_text("a\n")
+        (tmp_path / "b.md").write_text("b\n")
+        watcher = PollingWatcher([tmp_path], interval=0.01)
+
+        (tmp_path / "a.md").write_text("changed\n")
+        (tmp_path / "c.md").write_text("c\n")
+        (tmp_path / "d.txt").write_text("d\n")
+
+        assert watcher.changes(1.0) == {tmp_path / "a.md", tmp_path / "c.md"}
+        assert watcher.changes(0.05) == set()
+
+
+class TestInotifyWatcher:
+    @pytest.fixture
+    def watcher(self, tmp_path):
+        (tmp_path / ".gitignore").write_text("ignored.md\n")
+        try:
+            watcher = InotifyWatcher([tmp_path])
+        except (AttributeError, OSError):
+            pytest.skip("inotify is not available")
+        yield watcher
+        watcher.close()
+
+    def test_reports_saved_files(self, tmp_path, watcher):
+        (tmp_path / "a.md").write_text("a\n")
+        (tmp_path / "ignored.md").write_text("a\n")
+        (tmp_path / "a.txt").write_text("a\n")
+
+        assert debounced(watcher, 0.05) == {tmp_path / "a.md"}
+
+    def test_watches_new_directories(self, tmp_path, watcher):
+        (tmp_path / "docs").mkdir()
+        assert watcher.changes(1.0) == set()
+
+        (tmp_path / "docs" / "a.md").write_text("a\n")
+
+        assert watcher.changes(1.0) == {tmp_path / "docs" / "a.md"}
+
+    def test_blocks_until_a_change(self, tmp_path, watcher):
+        timer = threading.Timer(0.05, (tmp_path / "a.md").write_text, ["a\n"])
+        timer.start()
+
+        assert debounced(watcher, 0.05) == {tmp_path / "a.md"}
+        timer.join()
+
+
+class TestSession:
+    def test_formats_changed_files_once(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text(LONG)
+        session = Session(ConfigResolver(line_length=40), Options(write=True))
+
+        result = session.update(path)
+        assert result.changed
+        formatted = path.read_text()
+        assert max(len(line) for line in formatted.splitlines()) <= 40
+
+        # Our own write is seen as an event too; it is skipped unread.
+        inode = path.stat().st_ino
+        assert session.update(path) is None
+        assert path.stat().st_ino == inode
+
+        path.write_text(formatted + "\n" + LONG)
+        result = session.update(path)
+        assert result.changed
+        assert path.read_text().startswith(formatted)
+
+    def test_leaves_formatted_files_untouched(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("short\n")
+        session = Session(ConfigResolver(), Options(write=True))
+
+        inode = path.stat().st_ino
+        result = session.update(path)
+
+        assert not result.changed
+        assert path.stat().st_ino == inode
+
+    def test_forgets_deleted_files(self, tmp_path):
+        path = tmp_path / "a.md"
+        path.write_text("short\n")
+        session = Session(ConfigResolver(), Options(write=True))
+        session.update(path)
+
+        path.unlink()
+
+        assert session.update(path) is None
+        assert path not in session.known
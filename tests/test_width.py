@@ -0,0 +1,65 @@
+import unicodedata
+from pathlib import Path
+
+import pytest
+
+from formdt import Config, format_markdown
+from formdt import width_table
+from formdt.width import (
+    CACHE_WORDS,
+    _word_widths,
+    display_width,
+    generate,
+    token_widths,
+)
+
+
+class TestDisplayWidth:
+    def test_widths(self):
+        assert display_width("hello") == 5
+        assert display_width("日本語") == 6
+        assert display_width("한국어") == 6
+        assert display_width("ＡＢ") == 4
+        assert display_width("😀") == 2
+        assert display_width("é") == 1
+        assert display_width("a\u200bb") == 2
+        assert display_width("") == 0
+
+    def test_token_widths(self):
+        assert token_widths(["a", "日本", "😀x"]) == [1, 4, 3]
+
+    def test_word_cache_is_bounded(self):
+        token_widths([f"日{i}" for i in range(CACHE_WORDS + 10)])
+        token_widths(["日" * 100])
+
+        assert len(_word_widths) <= CACHE_WORDS
+        assert "日" * 100 not in _word_widths
+
+    @pytest.mark.skipif(
+        unicodedata.unidata_version != width_table.UNICODE_VERSION,
+        reason="table generated from another Unicode version",
+    )
+    def test_table_is_generated(self):
+        assert generate() == Path(width_table.__file__).read_text()
+
+
+class TestDisplayWidthWrapping:
+    def test_wide_characters_count_twice(self):
+        text = "日本語 日本語 日本語"
+
+        assert format_markdown(text, Config(line_length=14)) == text
+        assert format_markdown(text, Config(line_length=14, display_width=True)) == (
+            "日本語 日本語\n日本語"
+        )
+
+    def test_optimal_wrapping(self):
+        config = Config(line_length=10, wrap_mode="optimal", display_width=True)
+
+        assert format_markdown("aa 日本 bb 語 cc", config) == "aa 日本 bb\n語 cc"
+
+    def test_ascii_is_unchanged(self):
+        text = "one two three four five six seven"
+
+        assert format_markdown(text, Config(10, display_width=True)) == (
+            format_markdown(text, Config(10))
+        )